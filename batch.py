@@ -0,0 +1,149 @@
+"""
+Recherche en lot, sans interface Qt.
+
+Lit une requête par ligne (fichier ou "-" pour stdin; les lignes JSON `{"query": ...}`
+sont aussi acceptées) et écrit chaque résultat au fil de l'eau en JSONL:
+    {"query", "engine", "rank", "title", "link", "snippet", "latency"}
+
+Usage:
+    python batch.py queries.txt > results.jsonl
+    cat queries.txt | python batch.py - --engines DuckDuckGo Yahoo --concurrency 8 --rate 2
+
+Les requêtes ne sont jamais toutes chargées en mémoire: au plus `concurrency * 2`
+appels de scrapers sont en attente à un instant donné. Un résumé (débit, latences)
+est écrit sur stderr à la fin.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from services import tracing
+from services.cache import cached_scraper
+from services.engines import get_registry, enabled_engines
+from services.ratelimit import RateLimiter
+from services.replay import install_from_env
+
+
+def read_queries(stream):
+    """Requêtes non vides du flux, une par ligne (les lignes commençant par "#" sont ignorées)."""
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                line = str(json.loads(line).get("query") or "").strip()
+            except (ValueError, AttributeError):
+                pass
+            if not line:
+                continue
+        yield line
+
+
+def _percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_batch(queries, engines: list, out, concurrency: int = 4, rate: float = 1.0, use_cache: bool = False) -> dict:
+    """
+    Exécute chaque requête sur chaque moteur et écrit les résultats dans `out` dès qu'ils arrivent.
+    `rate` limite les appels par seconde et par moteur. Retourne les statistiques du lot.
+    """
+    registry = get_registry()
+    scrapers = {name: cached_scraper(name, registry[name]) if use_cache else registry[name] for name in engines}
+    limiters = {name: RateLimiter(rate) for name in engines}
+    stats = {"queries": 0, "calls": 0, "results": 0, "empty": 0}
+    latencies = []
+
+    def call(query, engine):
+        limiters[engine].acquire()
+        start = time.monotonic()
+        with tracing.request_context(tracing.begin_request(f"{engine}: {query}")):
+            results = scrapers[engine](query)
+        return query, engine, results, time.monotonic() - start
+
+    def write(future):
+        query, engine, results, latency = future.result()
+        stats["calls"] += 1
+        latencies.append(latency)
+        if not results:
+            stats["empty"] += 1
+        for rank, result in enumerate(results, start=1):
+            out.write(json.dumps({
+                "query": query,
+                "engine": engine,
+                "rank": rank,
+                "title": result.get("title", ""),
+                "link": result.get("link", ""),
+                "snippet": result.get("snippet", ""),
+                "latency": round(latency, 4),
+            }, ensure_ascii=False) + "\n")
+        stats["results"] += len(results)
+        out.flush()
+
+    start = time.monotonic()
+    window = max(1, concurrency) * 2
+    pending = set()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch") as executor:
+        for query in queries:
+            stats["queries"] += 1
+            for engine in engines:
+                # Fenêtre bornée: on ne lit la suite de l'entrée qu'une fois des appels terminés
+                while len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write(future)
+                pending.add(executor.submit(call, query, engine))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                write(future)
+    elapsed = time.monotonic() - start
+    stats.update(
+        elapsed_s=round(elapsed, 3),
+        calls_per_s=round(stats["calls"] / elapsed, 2) if elapsed else 0.0,
+        latency_p50=round(_percentile(latencies, 0.5), 4),
+        latency_p95=round(_percentile(latencies, 0.95), 4),
+    )
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recherche en lot (JSONL sur stdout)")
+    parser.add_argument("input", help='fichier de requêtes, ou "-" pour stdin')
+    parser.add_argument("--engines", nargs="+", help="moteurs de config/scrapers.json (défaut: moteurs activés)")
+    parser.add_argument("--concurrency", type=int, default=4, help="appels de scrapers simultanés (défaut: 4)")
+    parser.add_argument("--rate", type=float, default=1.0, help="appels par seconde et par moteur, 0 = illimité (défaut: 1)")
+    parser.add_argument("--cache", action="store_true", help="passer par le cache de résultats partagé avec l'interface")
+    parser.add_argument("--trace", metavar="FICHIER", help="exporter une trace Chrome des appels")
+    args = parser.parse_args(argv)
+
+    install_from_env()
+    registry = get_registry()
+    engines = args.engines or enabled_engines()
+    unknown = [name for name in engines if name not in registry]
+    if unknown:
+        parser.error(f"moteurs inconnus: {', '.join(unknown)} (disponibles: {', '.join(registry)})")
+    if args.trace:
+        tracing.set_enabled(True)
+
+    stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    try:
+        stats = run_batch(read_queries(stream), engines, sys.stdout, args.concurrency, args.rate, args.cache)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    if args.trace:
+        tracing.export_chrome_trace(args.trace)
+    print(json.dumps(stats), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
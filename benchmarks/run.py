@@ -0,0 +1,229 @@
+"""
+Benchmarks hors ligne des chemins critiques (scraping, parsing, rendu).
+
+Usage (depuis la racine du dépôt):
+    python benchmarks/run.py                    # mesure et compare à baseline.json
+    python benchmarks/run.py --save-baseline    # enregistre la mesure comme référence
+    python benchmarks/run.py --filter parse_    # sous-ensemble par nom
+
+Le réseau n'est jamais utilisé: les scrapers reçoivent les pages de `fixtures/`.
+Les débits de baseline.json sont propres à la machine qui les a enregistrés:
+sur une autre machine, enregistrer d'abord sa propre référence (--save-baseline)
+avant de comparer.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services import formatter, render, search  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SIZES = ("small", "large")
+
+BENCHMARKS = {}
+
+
+def bench(name):
+    """
+    Enregistre une fabrique retournant la fonction à mesurer (ou None si indisponible).
+    La fabrique est appelée juste avant la mesure: la préparation (fixtures, choix du
+    parseur) y est faite une fois, hors de la boucle chronométrée.
+    """
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+def fixture(name: str, binary: bool = False):
+    with open(os.path.join(FIXTURES, name), "rb" if binary else "r", encoding=None if binary else "utf-8") as file:
+        return file.read()
+
+
+class _StubResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.text = content.decode("utf-8")
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+
+for _size in SIZES:
+    for _engine, _scraper in (("duckduckgo", "scrape_duckduckgo"), ("yahoo", "scrape_yahoo")):
+        @bench(f"{_scraper}/{_size}")
+        def _scrape(engine=_engine, scraper=_scraper, size=_size):
+            response = _StubResponse(fixture(f"{engine}_{size}.html", binary=True))
+            search.set_parser()
+
+            def run():
+                # Transport de remplacement le temps d'un appel: les autres benchmarks gardent le réseau normal
+                search.set_transport(lambda url, timeout: response)
+                try:
+                    return getattr(search, scraper)("python asyncio")
+                finally:
+                    search.set_transport(None)
+            return run
+
+        for _parser in search.available_parsers():
+            @bench(f"parse_{_engine}[{_parser}]/{_size}")
+            def _parse(engine=_engine, parser=_parser, size=_size):
+                markup = fixture(f"{engine}_{size}.html", binary=True)
+                parse = getattr(search, f"parse_{engine}")
+                search.set_parser(parser)
+                return lambda: parse(markup)
+
+
+@bench("_ddg_extract_url/direct")
+def _extract_direct():
+    href = "https://example.com/path?a=1&b=2"
+    return lambda: search._ddg_extract_url(href)
+
+
+@bench("_ddg_extract_url/redirect")
+def _extract_redirect():
+    href = "//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fpath%3Fa%3D1%26b%3D2&rut=abcdef0123456789"
+    return lambda: search._ddg_extract_url(href)
+
+
+def _results(size: str):
+    search.set_parser("html.parser")
+    first = search.parse_duckduckgo(fixture(f"duckduckgo_{size}.html"))
+    second = search.parse_yahoo(fixture(f"yahoo_{size}.html", binary=True))
+    search.set_parser()
+    return first, second
+
+
+for _size in SIZES:
+    @bench(f"generate_results_html/{_size}")
+    def _render(size=_size):
+        first, second = _results(size)
+        return lambda: search.generate_results_html(first, second, "DuckDuckGo", "Yahoo")
+
+
+@bench("render_results/10x4")
+def _render_columns():
+    first, second = _results("large")
+    columns = [("DuckDuckGo", first), ("Yahoo", second), ("DuckDuckGo 2", first), ("Yahoo 2", second)]
+    return lambda: render.render_results(columns)
+
+
+@bench("render_results/escaping")
+def _render_escaping():
+    hostile = {
+        "title": "<script>alert('x')</script> & \"quotes\" " * 4,
+        "link": "https://example.com/?q=');alert(1);//&a=<b>&c=\"d\"",
+        "snippet": "<img src=x onerror=alert(1)> & ' \" < > " * 10,
+    }
+    columns = [("DuckDuckGo", [hostile] * 10), ("Yahoo", [hostile] * 10)]
+    return lambda: render.render_results(columns)
+
+
+for _size in SIZES:
+    @bench(f"format_model_text/{_size}")
+    def _format(size=_size):
+        text = fixture(f"model_answer_{size}.txt")
+        return lambda: formatter.format_model_text(text)
+
+    @bench(f"StreamFormatter/{_size}")
+    def _format_stream(size=_size):
+        text = fixture(f"model_answer_{size}.txt")
+        chunks = [text[i:i + 16] for i in range(0, len(text), 16)]
+
+        def run():
+            stream = formatter.StreamFormatter()
+            for chunk in chunks:
+                stream.feed(chunk)
+            stream.finish()
+            return stream.html
+        return run
+
+
+def measure(func, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """Meilleur débit sur `repeat` séries (ops/s) et pic d'allocation d'un appel (Kio)."""
+    func()  # échauffement (imports paresseux, caches de sélecteurs)
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or loops >= 1 << 20:
+            break
+        loops *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ops_per_sec": loops / best, "peak_kib": (peak - base) / 1024}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="ne lance que les benchmarks dont le nom contient ce texte")
+    parser.add_argument("--save-baseline", action="store_true", help="enregistre les résultats dans baseline.json")
+    parser.add_argument("--baseline", default=BASELINE, help="fichier de référence (défaut: %(default)s)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="baisse de débit tolérée (défaut: 25%%)")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<42} {'ops/s':>12} {'pic Kio':>9} {'vs base':>9}")
+    for name, factory in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        func = factory()
+        if func is None:
+            print(f"{name:<42} {'ignoré':>12}")
+            continue
+        stats = measure(func)
+        results[name] = stats
+        ref = baseline.get(name)
+        delta = ""
+        if ref:
+            ratio = stats["ops_per_sec"] / ref["ops_per_sec"]
+            delta = f"{(ratio - 1) * 100:+.0f}%"
+            if ratio < 1 - args.threshold:
+                regressions.append(name)
+                delta += " !"
+        print(f"{name:<42} {stats['ops_per_sec']:>12.0f} {stats['peak_kib']:>9.1f} {delta:>9}")
+
+    if args.save_baseline:
+        baseline.update({name: {k: round(v, 2) for k, v in stats.items()} for name, stats in results.items()})
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Référence enregistrée: {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"Régressions (> {args.threshold:.0%}): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
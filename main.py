@@ -1,11 +1,23 @@
+import os
 import sys
+from services import startup
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QPalette, QColor
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from ui.window import MainWindow
+from ui.assets import APP_STYLESHEET
+from services.replay import install_from_env
+startup.mark("imports")
 
 def main():
+    # Requis pour importer QtWebEngine après la création de QApplication (page de résultats différée)
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    # Icônes pré-rendues au ratio de pixels de l'écran (voir ui/assets.py)
+    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
     app = QApplication(sys.argv)
+    startup.mark("QApplication")
+    # Enregistrement/rejeu du réseau (DRICHSEARCH_REPLAY, voir services/replay.py)
+    install_from_env()
     app.setApplicationName("Drichsearch")
     # Thème sombre global
     app.setStyle("Fusion")
@@ -34,23 +46,15 @@ def main():
     dark_palette.setColor(QPalette.Disabled, QPalette.ButtonText, disabled_text)
     app.setPalette(dark_palette)
 
-    app.setStyleSheet(
-        """
-        QWidget { background-color: #121212; color: #eaeaea; }
-        QLineEdit { background-color: #1e1e1e; color: #eaeaea; border: 1px solid #3a3a3a; border-radius: 10px; padding: 6px 10px; }
-        QLineEdit:focus { border: 1px solid #4285F4; }
-        QTextEdit { background-color: #1e1e1e; color: #eaeaea; border: 1px solid #3a3a3a; border-radius: 8px; }
-        QComboBox { background-color: #1e1e1e; color: #eaeaea; border: 1px solid #3a3a3a; border-radius: 8px; padding: 4px 8px; }
-        QComboBox QAbstractItemView { background-color: #1e1e1e; color: #eaeaea; selection-background-color: #2a2a2a; }
-        QPushButton { background-color: #262626; color: #eaeaea; border: 1px solid #3a3a3a; border-radius: 10px; padding: 6px; }
-        QPushButton:hover { background-color: #2e2e2e; }
-        QPushButton:pressed { background-color: #333333; }
-        QSplitter::handle { background-color: #2a2a2a; }
-        QToolTip { background-color: #262626; color: #eaeaea; border: 1px solid #3a3a3a; }
-        """
-    )
-    main_window = MainWindow()
+    # Feuille de style partagée, appliquée une seule fois pour toute l'application
+    app.setStyleSheet(APP_STYLESHEET)
+    startup.mark("thème")
+    # DRICHSEARCH_EAGER_STARTUP=1: construit tout au démarrage (comparaison)
+    main_window = MainWindow(lazy=os.environ.get("DRICHSEARCH_EAGER_STARTUP") != "1")
+    startup.mark("MainWindow")
     main_window.show()
+    startup.mark("show")
+    QTimer.singleShot(0, lambda: startup.mark("premier tour de boucle"))
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
@@ -0,0 +1,194 @@
+"""
+Backend de recherche asynchrone (asyncio + httpx).
+
+Une seule boucle d'événements, dans un thread d'arrière-plan (`get_loop()`),
+exécute toutes les requêtes des moteurs: des dizaines de recherches concurrentes
+ne coûtent aucun thread supplémentaire. Chaque moteur a ses propres budgets
+(connexion, lecture, total: voir `EngineScraper`), et ses endpoints de secours
+sont lancés en parallèle si le premier tarde (`hedge_delay`). Le travail
+bloquant (analyse HTML, cache SQLite) passe par l'exécuteur par défaut de la
+boucle (`_offload`) pour ne pas retarder les autres moteurs.
+HTTP/2 est utilisé quand le paquet `h2` est installé.
+
+Le pont vers Qt est `services.dispatch.AsyncSearchWorker`.
+"""
+import asyncio
+import threading
+import time
+from services import search, tracing
+from services.cache import get_result_cache, claim_inflight, release_inflight
+
+try:
+    import h2  # noqa: F401  (requis par httpx pour HTTP/2)
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+# Connexions simultanées au plus, tous moteurs confondus
+MAX_CONNECTIONS = 64
+
+
+_loop = None
+_loop_lock = threading.Lock()
+_clients = {}
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Boucle partagée, démarrée à la demande dans un thread démon."""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="asearch", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def submit(coro):
+    """Planifie `coro` sur la boucle partagée; retourne un `concurrent.futures.Future`."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def get_client():
+    """Client httpx de la boucle courante (pool de connexions partagé par tous les moteurs)."""
+    import httpx
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = httpx.AsyncClient(
+            http2=HTTP2,
+            headers=search._DEFAULT_HEADERS,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS // 2),
+        )
+    return client
+
+
+async def close_client():
+    """Ferme le client de la boucle courante."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def _offload(func, *args):
+    """Exécute `func(*args)` (bloquant: analyse, SQLite) dans l'exécuteur de la boucle."""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+async def _fetch(scraper, url: str, request=None) -> str:
+    with tracing.span("fetch", request=request, url=url) as span:
+        if search._transport is not None:
+            # Enregistrement/rejeu (services/replay.py): transport synchrone, hors de la boucle
+            response = await _offload(search._transport, url, scraper.read_timeout)
+        else:
+            import httpx
+            timeout = httpx.Timeout(scraper.read_timeout, connect=scraper.connect_timeout, pool=scraper.connect_timeout)
+            response = await get_client().get(url, timeout=timeout)
+            span.set(http_version=response.http_version)
+        span.set(status=response.status_code)
+        response.raise_for_status()
+        return response.text
+
+
+async def _fetch_hedged(scraper, query: str, request=None) -> str:
+    """
+    Essaie les endpoints dans l'ordre, mais sans attendre l'échec du précédent:
+    si aucun n'a répondu après `hedge_delay`, le suivant est lancé en parallèle.
+    La première réponse valide gagne, les autres requêtes sont annulées.
+    """
+    endpoints = list(scraper.endpoints)
+    pending = set()
+    last_error = None
+    try:
+        while endpoints or pending:
+            if endpoints:
+                url = scraper.build_url(endpoints.pop(0), query)
+                pending.add(asyncio.ensure_future(_fetch(scraper, url, request)))
+            done, pending = await asyncio.wait(
+                pending, timeout=scraper.hedge_delay if endpoints else None, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+    raise last_error or RuntimeError(f"{scraper.name} unreachable")
+
+
+async def search_engine(scraper, query: str, request=None, use_cache: bool = True) -> list:
+    """
+    Résultats d'un moteur (liste vide en cas d'échec ou de budget total dépassé).
+    Comme `cached_scraper`, une requête déjà en vol pour le même moteur et la même
+    requête (préchargement, autre recherche) est attendue au lieu d'être refaite.
+    """
+    cache = get_result_cache() if use_cache else None
+    if cache is None:
+        return await _search_network(scraper, query, request)
+    cached = await _offload(cache.get, scraper.name, query)
+    if cached is not None:
+        tracing.instant("cache.hit", engine=scraper.name)
+        return cached
+    event, owner = claim_inflight(cache, scraper.name, query)
+    if not owner:
+        with tracing.span("cache.wait", request=request, engine=scraper.name):
+            # L'événement peut venir d'un thread (backend threadé): attente hors de la boucle
+            await _offload(event.wait, scraper.timeout)
+        cached = await _offload(cache.get, scraper.name, query)
+        if cached is not None:
+            return cached
+        # Échec du premier appelant (liste vide, non mise en cache): on retente
+        return await _search_network(scraper, query, request, cache)
+    try:
+        return await _search_network(scraper, query, request, cache)
+    finally:
+        release_inflight(cache, scraper.name, query, event)
+
+
+async def _search_network(scraper, query: str, request=None, cache=None) -> list:
+    with tracing.span("engine", request=request, engine=scraper.name):
+        try:
+            markup = await asyncio.wait_for(_fetch_hedged(scraper, query, request), scraper.timeout)
+            results = await _offload(scraper.parse_markup, markup, request)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return []
+    if cache is not None:
+        await _offload(cache.put, scraper.name, query, results)
+    return results
+
+
+async def iter_results(query: str, scrapers: dict, deadline: float = 15.0, request=None, use_cache: bool = True):
+    """
+    Générateur asynchrone de `(moteur, résultats)`, dans l'ordre d'arrivée.
+    S'arrête après `deadline` secondes: les moteurs en retard sont annulés et absents.
+    """
+    tasks = {
+        asyncio.ensure_future(search_engine(scraper, query, request, use_cache)): name
+        for name, scraper in scrapers.items()
+    }
+    pending = set(tasks)
+    end = time.monotonic() + deadline
+    try:
+        while pending:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield tasks[task], task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def search_all(query: str, scrapers: dict, deadline: float = 15.0, use_cache: bool = True) -> dict:
+    """Toutes les réponses reçues avant `deadline` (liste vide pour les moteurs hors délai)."""
+    results = {name: [] for name in scrapers}
+    async for name, engine_results in iter_results(query, scrapers, deadline, use_cache=use_cache):
+        results[name] = engine_results
+    return results
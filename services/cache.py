@@ -0,0 +1,281 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from services import tracing
+
+
+# Attente maximale d'une requête déjà en vol (secondes) quand le scraper n'a pas de budget
+# `timeout` propre; au-delà, l'appelant fait sa propre requête
+INFLIGHT_WAIT = 15.0
+
+# Durée de validité par moteur (secondes); DEFAULT_TTL pour les moteurs absents
+DEFAULT_TTL = 3600
+ENGINE_TTLS = {
+    "DuckDuckGo": 3600,
+    "Yahoo": 3600,
+}
+
+
+def default_cache_dir() -> str:
+    """
+    Dossier de cache utilisateur selon la plateforme
+    (surchargeable via la variable d'environnement DRICHSEARCH_CACHE_DIR).
+    """
+    override = os.environ.get("DRICHSEARCH_CACHE_DIR")
+    if override:
+        return override
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "Drichsearch")
+
+
+def normalize_query(query: str) -> str:
+    """Normalise une requête pour la clé de cache (casse et espaces)."""
+    return " ".join((query or "").lower().split())
+
+
+class ResultCache:
+    """
+    Cache à deux niveaux pour les résultats des scrapers (et toute valeur sérialisable en JSON):
+    - LRU en mémoire, borné à `memory_size` entrées;
+    - table SQLite persistante, bornée à `disk_size` lignes.
+    Clé: (moteur, requête normalisée). Chaque moteur a son propre TTL.
+    Les listes de résultats sont copiées à l'entrée et à la sortie (listes et
+    dictionnaires de premier niveau): modifier une réponse ne touche pas au cache.
+    """
+
+    def __init__(self, path: str = None, memory_size: int = 256, disk_size: int = 5000, ttls: dict = None, default_ttl: float = DEFAULT_TTL):
+        self.path = path if path is not None else os.path.join(default_cache_dir(), "results.sqlite3")
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.ttls = dict(ENGINE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        # Majorant du nombre de lignes sur disque: le vrai compte n'est relu qu'au-delà de `disk_size`
+        self._rows = 0
+        try:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " engine TEXT NOT NULL, query TEXT NOT NULL, payload TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, PRIMARY KEY (engine, query))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_stored_at ON results (stored_at)")
+            self._db.commit()
+        except Exception:
+            # Pas de disque disponible: le cache reste purement en mémoire
+            self._db = None
+        # Les entrées expirées des sessions précédentes sont retirées une fois, à l'ouverture
+        self.purge_expired()
+
+    def _ttl(self, engine: str) -> float:
+        # Pages suivantes ("DuckDuckGo#p2", voir services/pagination.py): TTL du moteur
+        return self.ttls.get(engine.split("#", 1)[0], self.default_ttl)
+
+    def get(self, engine: str, query: str):
+        """Retourne la liste de résultats en cache, ou None si absente/expirée."""
+        key = (engine, normalize_query(query))
+        now = time.time()
+        ttl = self._ttl(engine)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, results = entry
+                if now - stored_at <= ttl:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return _copy(results)
+                del self._memory[key]
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT payload, stored_at FROM results WHERE engine = ? AND query = ?", key
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is not None and now - row[1] <= ttl:
+                    results = json.loads(row[0])
+                    self._remember(key, row[1], results)
+                    self.stats["disk_hits"] += 1
+                    return _copy(results)
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, engine: str, query: str, results: list):
+        """Enregistre les résultats d'un moteur (les listes vides ne sont pas conservées)."""
+        if not results:
+            return
+        key = (engine, normalize_query(query))
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, _copy(results))
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (engine, query, payload, stored_at) VALUES (?, ?, ?, ?)",
+                    (key[0], key[1], json.dumps(results), now),
+                )
+                self._rows += 1
+                if self._rows > self.disk_size:
+                    # Éviction par taille: on supprime les entrées les plus anciennes
+                    count = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+                    if count > self.disk_size:
+                        self._db.execute(
+                            "DELETE FROM results WHERE rowid IN"
+                            " (SELECT rowid FROM results ORDER BY stored_at ASC LIMIT ?)",
+                            (count - self.disk_size,),
+                        )
+                    self._rows = min(count, self.disk_size)
+                self._db.commit()
+            except sqlite3.Error:
+                pass
+
+    def _remember(self, key, stored_at, results):
+        self._memory[key] = (stored_at, results)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def purge_expired(self):
+        """
+        Supprime du disque les entrées expirées: TTL du moteur (pages suivantes
+        "moteur#pN" comprises), `default_ttl` pour les autres.
+        """
+        if self._db is None:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                for engine, ttl in self.ttls.items():
+                    self._db.execute(
+                        "DELETE FROM results WHERE (engine = ? OR engine LIKE ? ESCAPE '\\') AND stored_at < ?",
+                        (engine, _like_prefix(engine) + "#%", now - ttl),
+                    )
+                known = list(self.ttls)
+                self._db.execute(
+                    "DELETE FROM results WHERE stored_at < ? AND substr(engine, 1, instr(engine || '#', '#') - 1)"
+                    f" NOT IN ({', '.join('?' * len(known))})",
+                    [now - self.default_ttl] + known,
+                )
+                self._db.commit()
+                self._rows = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            except sqlite3.Error:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM results")
+                    self._db.commit()
+                    self._rows = 0
+                except sqlite3.Error:
+                    pass
+
+    def hit_rate(self) -> float:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+
+def _copy(value):
+    """Copie d'une liste de résultats (les autres valeurs, ex: réponses texte, sont immuables)."""
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+def _like_prefix(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Instance partagée du cache de résultats (créée au premier appel)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache()
+    return _cache
+
+
+# Requêtes réseau en cours par (moteur, requête normalisée): un second appelant attend
+# le premier au lieu de refaire la même requête (ex: préchargement puis Entrée)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def claim_inflight(store: ResultCache, engine: str, query: str):
+    """
+    Réserve la requête réseau (moteur, requête): retourne `(événement, propriétaire)`.
+    Le propriétaire fait la requête puis appelle `release_inflight`; les autres
+    attendent l'événement et relisent le cache. Partagé par les backends threadé et asyncio.
+    """
+    key = (id(store), engine, normalize_query(query))
+    with _inflight_lock:
+        event = _inflight.get(key)
+        owner = event is None
+        if owner:
+            event = _inflight[key] = threading.Event()
+    return event, owner
+
+
+def release_inflight(store: ResultCache, engine: str, query: str, event: threading.Event):
+    with _inflight_lock:
+        _inflight.pop((id(store), engine, normalize_query(query)), None)
+    event.set()
+
+
+def cached_scraper(engine: str, scraper, cache: ResultCache = None):
+    """
+    Enveloppe un scraper `scraper(query) -> list` pour passer d'abord par le cache.
+    Les appels concurrents pour la même requête partagent une seule requête réseau;
+    un appelant n'attend la requête en vol que le budget du scraper (`timeout`,
+    sinon INFLIGHT_WAIT) avant de faire la sienne.
+    """
+    wait = getattr(scraper, "timeout", INFLIGHT_WAIT)
+
+    def fetch(store, query):
+        results = scraper(query)
+        store.put(engine, query, results)
+        return results
+
+    def run(query: str):
+        store = cache if cache is not None else get_result_cache()
+        results = store.get(engine, query)
+        if results is not None:
+            tracing.instant("cache.hit", engine=engine)
+            return results
+        event, owner = claim_inflight(store, engine, query)
+        if not owner:
+            with tracing.span("cache.wait", engine=engine):
+                event.wait(wait)
+            results = store.get(engine, query)
+            # Échec ou lenteur du premier appelant (rien en cache): on retente
+            return results if results is not None else fetch(store, query)
+        try:
+            return fetch(store, query)
+        finally:
+            release_inflight(store, engine, query, event)
+    run.__name__ = getattr(scraper, "__name__", "scraper")
+    return run
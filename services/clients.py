@@ -0,0 +1,150 @@
+"""
+Connexion aux Espaces Gradio, sans dépendance à Qt (utilisable par le mode lot et
+par services/replay.py): un client partagé par Espace, créé par `gradio_client.Client`
+ou par la fabrique installée avec `set_client_factory`.
+"""
+import threading
+import time
+from services import tracing
+
+
+DEFAULT_SPACE = "Drichdev/micro-btnet-user"
+
+
+# Fabrique de clients de remplacement (enregistrement/rejeu: voir services/replay.py);
+# None = `gradio_client.Client`
+_client_factory = None
+
+
+def set_client_factory(factory=None):
+    """Remplace la création des clients Gradio; les clients déjà connectés sont abandonnés."""
+    global _client_factory
+    _client_factory = factory
+    with _managers_lock:
+        for manager in _managers.values():
+            manager.reset()
+
+
+class ClientManager:
+    """
+    Client Gradio unique par Espace, partagé par tous les workers.
+    La connexion (poignée de main + schéma de l'API) n'est faite qu'une fois,
+    éventuellement à l'avance via `warm_up()`, et refaite après un échec.
+    """
+
+    def __init__(self, space_name: str):
+        self.space_name = space_name
+        self.stats = {"connects": 0, "connect_s": 0.0, "predicts": 0, "predict_s": 0.0, "failures": 0}
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    def warm_up(self):
+        """Connecte le client dans un thread d'arrière-plan (sans bloquer l'appelant)."""
+        if self._client is None:
+            threading.Thread(target=self._warm_up, name="gradio-warmup", daemon=True).start()
+
+    def _warm_up(self):
+        try:
+            self.get()
+        except Exception:
+            # La prochaine requête retentera la connexion
+            pass
+
+    def get(self):
+        """
+        Retourne le client connecté; attend une connexion en cours plutôt que d'en ouvrir une seconde.
+        `gradio_client` (lourd à importer) n'est chargé qu'à la première connexion.
+        """
+        with self._lock:
+            if self._client is None:
+                factory = _client_factory
+                if factory is None:
+                    from gradio_client import Client as factory
+                start = time.monotonic()
+                with tracing.span("model.connect", space=self.space_name):
+                    self._client = factory(self.space_name)
+                self.stats["connects"] += 1
+                self.stats["connect_s"] = time.monotonic() - start
+            return self._client
+
+    def reset(self):
+        with self._lock:
+            self._client = None
+
+    def predict(self, **kwargs):
+        """`client.predict(**kwargs)`; en cas d'échec, reconnecte une fois puis réessaie."""
+        for attempt in (1, 2):
+            client = self.get()
+            start = time.monotonic()
+            try:
+                with tracing.span("model.predict", attempt=attempt):
+                    result = client.predict(**kwargs)
+            except Exception:
+                self.stats["failures"] += 1
+                self.reset()
+                if attempt == 2:
+                    raise
+                continue
+            self.stats["predicts"] += 1
+            self.stats["predict_s"] = time.monotonic() - start
+            return result
+
+    def stream(self, **kwargs):
+        """
+        Variante de `predict` basée sur `client.submit`: produit les sorties
+        intermédiaires du job au fil de l'eau, la dernière étant la réponse complète.
+        Reconnecte une fois si l'échec survient avant la première sortie.
+        Si le consommateur s'arrête en cours de route, le job distant est annulé.
+        """
+        for attempt in (1, 2):
+            client = self.get()
+            start = time.monotonic()
+            produced = False
+            job = None
+            completed = False
+            span = tracing.span("model.stream", attempt=attempt)
+            try:
+                job = client.submit(**kwargs)
+                for output in job:
+                    if not produced:
+                        self.stats["first_output_s"] = time.monotonic() - start
+                        tracing.instant("model.first_output")
+                    produced = True
+                    yield output
+                if not produced:
+                    # Endpoint sans sorties intermédiaires: seule la réponse finale existe
+                    yield job.result()
+                completed = True
+            except Exception:
+                self.stats["failures"] += 1
+                self.reset()
+                if produced or attempt == 2:
+                    raise
+                continue
+            finally:
+                span.end()
+                if job is not None and not completed:
+                    try:
+                        job.cancel()
+                    except Exception:
+                        pass
+            self.stats["predicts"] += 1
+            self.stats["predict_s"] = time.monotonic() - start
+            return
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_client_manager(space_name: str = DEFAULT_SPACE) -> ClientManager:
+    """Gestionnaire partagé (un par Espace) pour tout le processus."""
+    with _managers_lock:
+        manager = _managers.get(space_name)
+        if manager is None:
+            manager = _managers[space_name] = ClientManager(space_name)
+        return manager
@@ -0,0 +1,81 @@
+"""
+Contexte de recherche pour le modèle (génération augmentée par la recherche).
+
+Les résultats déjà scrapés pour la requête affichée (`{titre, lien, extrait}`,
+souvent servis par le cache) sont fusionnés, dédoublonnés et tronqués à un budget
+de tokens, puis placés avant la question: l'Espace n'a plus à relancer sa propre
+recherche web.
+"""
+from services.engines import fuse_results, normalize_url
+from services.search import NO_SNIPPET
+
+
+# Budget du contexte (tokens estimés) et longueur maximale d'un extrait (caractères)
+CONTEXT_TOKENS = 600
+MAX_SNIPPET = 300
+# Estimation sans tokenizer: ~4 caractères par token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class SearchContext:
+    """Contexte assemblé: `sources` retenues, `text` à placer avant la question et sa taille estimée."""
+
+    def __init__(self, sources: list, text: str, tokens: int, dropped: int):
+        self.sources = sources
+        self.text = text
+        self.tokens = tokens
+        self.dropped = dropped  # résultats écartés faute de budget
+
+    def __bool__(self):
+        return bool(self.sources)
+
+    def prompt(self, question: str) -> str:
+        if not self.sources:
+            return question
+        return f"{self.text}\nEn t'appuyant sur ces sources (cite leur numéro), réponds à la question.\nQuestion : {question}"
+
+
+def build_context(results, budget: int = CONTEXT_TOKENS, max_snippet: int = MAX_SNIPPET, weights: dict = None) -> SearchContext:
+    """
+    Assemble le contexte à partir de résultats `{moteur: [...]}` (fusionnés par rang)
+    ou d'une liste déjà classée. Les doublons (URL normalisée, ou même titre) sont
+    écartés; les sources sont ajoutées dans l'ordre tant que le budget le permet.
+    """
+    ranked = fuse_results(results, weights) if isinstance(results, dict) else list(results or [])
+    header = "Résultats de recherche :\n"
+    lines = [header]
+    used = estimate_tokens(header)
+    sources = []
+    seen_links = set()
+    seen_titles = set()
+    dropped = 0
+    for result in ranked:
+        link = result.get("link") or ""
+        title = " ".join((result.get("title") or "").split())
+        key = normalize_url(link) if link else None
+        title_key = title.casefold()
+        if not title or key in seen_links or title_key in seen_titles:
+            continue
+        snippet = " ".join((result.get("snippet") or "").split())
+        if snippet == NO_SNIPPET:
+            # Texte de remplacement du scraper, pas un contenu: seul le titre est utile
+            snippet = ""
+        if len(snippet) > max_snippet:
+            snippet = snippet[:max_snippet].rsplit(" ", 1)[0] + "…"
+        entry = f"[{len(sources) + 1}] {title}\n{link}\n{snippet}\n" if snippet else f"[{len(sources) + 1}] {title}\n{link}\n"
+        cost = estimate_tokens(entry)
+        if used + cost > budget:
+            dropped += 1
+            continue
+        seen_links.add(key)
+        seen_titles.add(title_key)
+        lines.append(entry)
+        used += cost
+        sources.append({"title": title, "link": link, "snippet": snippet})
+    if not sources:
+        return SearchContext([], "", 0, dropped)
+    return SearchContext(sources, "".join(lines), used, dropped)
@@ -0,0 +1,140 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from PyQt5.QtCore import QObject, pyqtSignal
+from services import tracing
+
+
+# Pool partagé par toutes les recherches: évite de recréer des threads à chaque requête
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="search")
+
+# Intervalle de vérification de l'annulation pendant l'attente des moteurs (s)
+_POLL_INTERVAL = 0.05
+
+
+class SearchWorker(QObject):
+    """
+    Lance tous les scrapers en parallèle hors du thread GUI.
+    Chaque moteur émet `engine_finished` dès qu'il répond; `finished` est émis
+    une seule fois avec l'ensemble des résultats, au plus tard après `deadline` secondes
+    ou dès l'annulation (`cancel()`).
+    """
+    engine_finished = pyqtSignal(str, list)
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, query: str, scrapers: dict, deadline: float = 15.0, trace_id=None):
+        super().__init__()
+        self.query = query
+        self.scrapers = scrapers
+        self.deadline = deadline
+        # Chronologie de traçage à laquelle rattacher les spans (voir services/tracing.py)
+        self.trace_id = trace_id
+        self.elapsed = 0.0
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """
+        Abandonne la recherche: les scrapers pas encore démarrés ne font aucune requête,
+        ceux déjà en vol terminent en arrière-plan (leur résultat alimente le cache).
+        """
+        self._cancelled.set()
+
+    def _call(self, name, scraper):
+        if self._cancelled.is_set():
+            return []
+        with tracing.request_context(self.trace_id), tracing.span("engine", engine=name):
+            return scraper(self.query)
+
+    def run(self):
+        start = time.monotonic()
+        results = {name: [] for name in self.scrapers}
+        try:
+            futures = {
+                _EXECUTOR.submit(self._call, name, scraper): name
+                for name, scraper in self.scrapers.items()
+            }
+            pending = set(futures)
+            while pending and not self._cancelled.is_set():
+                remaining = self.deadline - (time.monotonic() - start)
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=min(remaining, _POLL_INTERVAL), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    try:
+                        results[name] = future.result() or []
+                    except Exception:
+                        results[name] = []
+                    if not self._cancelled.is_set():
+                        self.engine_finished.emit(name, results[name])
+            # Délai global dépassé ou annulation: les moteurs en retard sont ignorés
+            for future in pending:
+                future.cancel()
+        except Exception as e:
+            self.error.emit(f"Erreur: {str(e)}")
+        self.elapsed = time.monotonic() - start
+        self.finished.emit(results)
+
+
+class AsyncSearchWorker(QObject):
+    """
+    Équivalent de `SearchWorker` sur le backend asynchrone (services/asearch.py).
+    `run()` ne bloque pas: la recherche est planifiée sur la boucle partagée et les
+    signaux sont émis depuis son thread. `threaded = False` indique au planificateur
+    de l'appeler directement, sans QThread dédié.
+    `scrapers`: nom -> EngineScraper (le cache de résultats est consulté par le backend).
+    """
+    engine_finished = pyqtSignal(str, list)
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    threaded = False
+
+    def __init__(self, query: str, scrapers: dict, deadline: float = 15.0, trace_id=None, use_cache: bool = True):
+        super().__init__()
+        self.query = query
+        self.scrapers = scrapers
+        self.deadline = deadline
+        self.trace_id = trace_id
+        self.use_cache = use_cache
+        self.elapsed = 0.0
+        self._cancelled = threading.Event()
+        self._future = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Abandonne la recherche: les requêtes en vol sont annulées, `finished` est émis avec les réponses reçues."""
+        self._cancelled.set()
+        if self._future is not None:
+            self._future.cancel()
+
+    def run(self):
+        # Import différé: le backend asynchrone est optionnel (DRICHSEARCH_ASYNC=1)
+        from services import asearch
+        self._future = asearch.submit(self._run())
+
+    async def _run(self):
+        import asyncio
+        from services import asearch
+        start = time.monotonic()
+        results = {name: [] for name in self.scrapers}
+        try:
+            async for name, engine_results in asearch.iter_results(
+                self.query, self.scrapers, self.deadline, self.trace_id, self.use_cache
+            ):
+                results[name] = engine_results
+                if not self._cancelled.is_set():
+                    self.engine_finished.emit(name, engine_results)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.error.emit(f"Erreur: {str(e)}")
+        self.elapsed = time.monotonic() - start
+        self.finished.emit(results)
@@ -0,0 +1,214 @@
+import json
+import os
+import sys
+import threading
+from urllib.parse import quote_plus, urlsplit, urlunsplit, parse_qsl, urlencode
+from services import search, tracing
+
+
+def default_config_path() -> str:
+    """Chemin de config/scrapers.json (compatible binaire PyInstaller via sys._MEIPASS)."""
+    base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_path, "config", "scrapers.json")
+
+
+# Parseurs spécialisés, référencés par "parser" dans la configuration
+BUILTIN_PARSERS = {
+    "duckduckgo": search.parse_duckduckgo,
+    "yahoo": search.parse_yahoo,
+}
+
+
+class EngineScraper:
+    """
+    Scraper décrit par une entrée de config/scrapers.json:
+    - "endpoints": URLs essayées dans l'ordre, `{query}` est remplacé par la requête encodée;
+    - "parser": nom d'un parseur intégré, ou "selectors" pour un parseur générique
+      ({"containers", "item", "link", "snippet"});
+    - "timeout" (s) et "weight" (poids dans la fusion des classements);
+    - "limit": nombre maximal de résultats par page (défaut: tous ceux de la page;
+      avec "pagination", `step` doit valoir `limit`);
+    - "pagination": {"param", "start", "step"}: la page n ajoute `param=start + n*step`
+      à l'URL (voir `fetch_page`); sans cette clé, seule la première page existe;
+    - backend asynchrone (services/asearch.py): "connect_timeout" et "read_timeout" (s),
+      "timeout" servant alors de budget total, et "hedge_delay" (s) avant d'essayer
+      l'endpoint suivant en parallèle.
+    """
+
+    def __init__(self, config: dict):
+        self.name = config["name"]
+        self.endpoints = list(config["endpoints"])
+        self.timeout = float(config.get("timeout", 10))
+        self.connect_timeout = float(config.get("connect_timeout", min(3.0, self.timeout)))
+        self.read_timeout = float(config.get("read_timeout", self.timeout))
+        self.hedge_delay = float(config.get("hedge_delay", 1.5))
+        self.weight = float(config.get("weight", 1.0))
+        self.enabled = bool(config.get("enabled", True))
+        limit = config.get("limit")
+        self.limit = int(limit) if limit is not None else None
+        self.pagination = config.get("pagination")
+        parser = config.get("parser")
+        if parser:
+            if parser not in BUILTIN_PARSERS:
+                raise ValueError(f"Parseur inconnu pour {self.name}: {parser}")
+            self.parse = BUILTIN_PARSERS[parser]
+        else:
+            selectors = config.get("selectors") or {}
+            if "item" not in selectors or "link" not in selectors:
+                raise ValueError(f"Sélecteurs 'item' et 'link' requis pour {self.name}")
+            self.selectors = selectors
+            self.parse = self._parse_with_selectors
+
+    def __call__(self, query: str) -> list:
+        return self.fetch_page(query, 0)
+
+    @property
+    def paginated(self) -> bool:
+        return bool(self.pagination)
+
+    def fetch_page(self, query: str, page: int = 0) -> list:
+        """Résultats de la page `page` (0 = première); liste vide en cas d'échec."""
+        if page and not self.pagination:
+            return []
+        try:
+            markup = None
+            last_err = None
+            for endpoint in self.endpoints:
+                try:
+                    markup = search._http_get(self.build_url(endpoint, query, page), timeout=self.timeout).text
+                    break
+                except Exception as e:
+                    last_err = e
+                    continue
+            if markup is None:
+                raise last_err or RuntimeError(f"{self.name} unreachable")
+            return self.parse_markup(markup)
+        except Exception:
+            return []
+
+    def build_url(self, endpoint: str, query: str, page: int = 0) -> str:
+        url = endpoint.replace("{query}", quote_plus(query))
+        if page and self.pagination:
+            offset = int(self.pagination.get("start", 0)) + page * int(self.pagination["step"])
+            url += ("&" if "?" in url else "?") + f"{self.pagination['param']}={offset}"
+        return url
+
+    def parse_markup(self, markup, request=None) -> list:
+        with tracing.span("parse", request=request, engine=self.name, parser=search.get_parser()) as span:
+            results = self.parse(markup, self.limit)
+            span.set(results=len(results))
+        return results
+
+    def _parse_with_selectors(self, markup, limit: int = None) -> list:
+        selectors = self.selectors
+        containers = set(selectors.get("containers") or []) or None
+        doc = search.parse_html(markup, containers)
+        results = []
+        seen = set()
+        for item in doc.select(selectors["item"]):
+            a = _first_match(item, selectors["link"])
+            if not a:
+                continue
+            link = search._ddg_extract_url(a.attr('href').strip())
+            title = a.text()
+            if not link or not title or link in seen:
+                continue
+            sn = _first_match(item, selectors.get("snippet") or [])
+            results.append({'title': title, 'link': link, 'snippet': sn.text()[:200] if sn else ''})
+            seen.add(link)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+
+def _first_match(node, selectors):
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    for css in selectors:
+        found = node.select_one(css)
+        if found:
+            return found
+    return None
+
+
+def load_scrapers(path: str = None) -> dict:
+    """Charge les scrapers déclarés dans la configuration (nom -> EngineScraper)."""
+    with open(path or default_config_path(), "r", encoding="utf-8") as file:
+        return {entry["name"]: EngineScraper(entry) for entry in json.load(file)}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> dict:
+    """Registre partagé des scrapers (chargé au premier appel)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = load_scrapers()
+    return _registry
+
+
+def enabled_engines() -> list:
+    return [name for name, scraper in get_registry().items() if scraper.enabled]
+
+
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "msclkid")
+
+
+def normalize_url(url: str) -> str:
+    """
+    Clé de déduplication d'une URL: schéma ignoré, hôte en minuscules sans "www.",
+    sans fragment, sans "/" final ni paramètres de suivi, paramètres triés.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PARAMS)
+    ))
+    return urlunsplit(("", host, path, query, ""))
+
+
+def fuse_results(results_by_engine: dict, weights: dict = None, k: int = 60, limit: int = None) -> list:
+    """
+    Fusionne les classements par Reciprocal Rank Fusion:
+    score(url) = somme sur les moteurs de poids / (k + rang).
+    Les doublons (URL normalisée) sont regroupés; le titre et l'extrait retenus sont
+    ceux du moteur qui classe le mieux le résultat. Chaque entrée garde la liste
+    des moteurs qui l'ont renvoyée dans "engines".
+    """
+    weights = weights or {}
+    merged = {}
+    for engine, results in results_by_engine.items():
+        weight = weights.get(engine, 1.0)
+        for rank, result in enumerate(results or [], start=1):
+            key = normalize_url(result['link'])
+            contribution = weight / (k + rank)
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = entry = {
+                    'title': result['title'],
+                    'link': result['link'],
+                    'snippet': result.get('snippet', ''),
+                    'engines': [],
+                    'score': 0.0,
+                    '_best': contribution,
+                }
+            elif contribution > entry['_best']:
+                entry.update(title=result['title'], link=result['link'], snippet=result.get('snippet', ''), _best=contribution)
+            entry['score'] += contribution
+            if engine not in entry['engines']:
+                entry['engines'].append(engine)
+    fused = sorted(merged.values(), key=lambda entry: entry['score'], reverse=True)
+    for entry in fused:
+        del entry['_best']
+    return fused[:limit] if limit else fused
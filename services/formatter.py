@@ -0,0 +1,128 @@
+"""
+Mise en forme HTML des réponses du modèle (sous-ensemble de Markdown).
+
+Toutes les règles sont réunies dans une seule expression compilée au chargement
+du module: le texte est parcouru une seule fois, chaque correspondance étant
+convertie selon le groupe nommé qui l'a produite. Aucune règle ne traverse un
+saut de ligne, ce qui permet à `StreamFormatter` de formater une réponse streamée
+ligne par ligne sans jamais repasser sur ce qui est déjà formaté.
+
+Le texte du modèle est déjà du HTML (liens `<a href=...>` inclus): il n'est pas échappé.
+"""
+import re
+
+
+_SEARCH_HEADER = "🔍 **Résultats de recherche :**"
+
+_TOKENS = re.compile(
+    # Pré-filtre: seuls ces caractères peuvent ouvrir une règle, les autres
+    # positions sont écartées sans essayer chaque alternative
+    r"(?=[🔍#*`\[h(\n])(?:" + "|".join((
+        r"(?P<header>" + re.escape(_SEARCH_HEADER) + r")",
+        r"^(?P<hashes>#{1,3})[ \t]+(?P<heading>[^\n]+)$",
+        # Item numéroté: **1.** Titre, **1. Titre** ou **1. (non refermé)
+        r"\*\*(?P<num>\d+\.)(?:(?P<closed>\*\*)|[ \t]*(?:(?P<item>[^*\n]+?)\*\*)?)",
+        r"\*\*(?P<bold>[^*\n]+?)\*\*",
+        r"`(?P<code>[^`\n]+)`",
+        r"\[(?P<label>[^\]\n]+)\]\((?P<url>[^)\s]+)\)",
+        r"(?<=\s)(?P<href>href=\")//",
+        r"(?P<paren>\()//",
+        r"(?P<newline>\n)",
+    )) + ")",
+    re.MULTILINE,
+)
+
+
+def _absolute(url: str) -> str:
+    return "https:" + url if url.startswith("//") else url
+
+
+def _replace(match) -> str:
+    kind = match.lastgroup
+    if kind == "newline":
+        return "<br>"
+    if kind == "bold":
+        return f"<b>{match['bold']}</b>"
+    if kind in ("num", "closed", "item"):
+        # Saut de ligne avant l'item, sauf s'il ouvre déjà une ligne
+        start = match.start()
+        prefix = "" if start == 0 or match.string[start - 1] == "\n" else "<br>"
+        if match["item"] is not None:
+            return f"{prefix}<b>{match['num']} {match['item']}</b>"
+        return f"{prefix}<b>{match['num']} </b>"
+    if kind == "url":
+        return f'<a href="{_absolute(match["url"])}">{match["label"]}</a>'
+    if kind == "href":
+        return match["href"] + "https://"
+    if kind == "paren":
+        return "(https://"
+    if kind == "code":
+        return f"<code>{match['code']}</code>"
+    if kind == "heading":
+        level = len(match["hashes"]) + 1
+        return f"<h{level}>{match['heading']}</h{level}>"
+    return "<h3>🔍 Résultats de recherche</h3>"
+
+
+def format_model_text(text: str) -> str:
+    """
+    Formate une réponse complète du modèle en HTML:
+    - en-tête des résultats de recherche, titres `#`, gras, code, liens Markdown
+    - items numérotés `**1. ...**` sur leur propre ligne
+    - URLs `//...` complétées en `https://...`
+    - sauts de ligne en `<br>`
+    """
+    if not text:
+        return ""
+    return _TOKENS.sub(_replace, text)
+
+
+class StreamFormatter:
+    """
+    Formatage incrémental d'une réponse streamée.
+
+    `feed(fragment)` retourne le HTML des lignes devenues complètes (chaîne vide
+    sinon); la ligne en cours reste en attente (`pending`) jusqu'au prochain saut
+    de ligne ou à `finish()`. Chaque caractère n'est formaté qu'une fois, et la
+    concaténation des sorties est identique à `format_model_text(texte complet)`.
+    """
+
+    def __init__(self):
+        self.pending = ""
+        self.text_length = 0
+        # Fragments HTML déjà formatés, joints seulement à la lecture de `html`
+        self._parts = []
+
+    @property
+    def html(self) -> str:
+        """HTML des lignes complètes reçues jusqu'ici."""
+        if len(self._parts) > 1:
+            self._parts[:] = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def feed(self, fragment: str) -> str:
+        self.text_length += len(fragment)
+        cut = fragment.rfind("\n")
+        if cut < 0:
+            self.pending += fragment
+            return ""
+        ready = self.pending + fragment[:cut + 1]
+        self.pending = fragment[cut + 1:]
+        out = _TOKENS.sub(_replace, ready)
+        self._parts.append(out)
+        return out
+
+    def preview(self) -> str:
+        """
+        HTML de tout le texte reçu, ligne en attente comprise, formatée comme le sera
+        la ligne complète (aucune règle ne franchit un saut de ligne): l'affichage ne
+        change pas de balisage quand la ligne se termine.
+        """
+        return self.html + (_TOKENS.sub(_replace, self.pending) if self.pending else "")
+
+    def finish(self) -> str:
+        """Formate la ligne en attente; retourne le HTML restant."""
+        out = _TOKENS.sub(_replace, self.pending) if self.pending else ""
+        self.pending = ""
+        self._parts.append(out)
+        return out
@@ -1,44 +1,133 @@
 import json
+import os
+import threading
 from PyQt5.QtCore import QObject, pyqtSignal
-from gradio_client import Client
+from services import tracing
+from services.clients import DEFAULT_SPACE, ClientManager, get_client_manager, set_client_factory
+from services.cache import ResultCache, default_cache_dir
+from services.context import build_context
+
+
+# Cache des réponses: durée de validité, persistance sur disque, et mise en cache
+# des réponses échantillonnées (temperature > 0, dont celles de l'interface): une question
+# reposée reçoit la même réponse. DRICHSEARCH_CACHE_SAMPLED=0 les fait toujours régénérer.
+RESPONSE_CACHE_TTL = 24 * 3600
+RESPONSE_CACHE_PERSIST = True
+CACHE_SAMPLED_ANSWERS = os.environ.get("DRICHSEARCH_CACHE_SAMPLED", "1") != "0"
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResultCache:
+    """Cache partagé des réponses du modèle (LRU mémoire + SQLite si RESPONSE_CACHE_PERSIST)."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                path = os.path.join(default_cache_dir(), "answers.sqlite3") if RESPONSE_CACHE_PERSIST else ":memory:"
+                _response_cache = ResultCache(path, memory_size=128, disk_size=2000, ttls={}, default_ttl=RESPONSE_CACHE_TTL)
+    return _response_cache
+
+
+def response_cache_key(space_name: str, use_web_search: bool, max_length: int, temperature: float) -> str:
+    """Partie « paramètres » de la clé de cache (la requête normalisée complète la clé)."""
+    return f"{space_name}|web={int(bool(use_web_search))}|len={int(max_length)}|t={float(temperature):.3f}"
+
+
+def is_cacheable(temperature: float) -> bool:
+    return CACHE_SAMPLED_ANSWERS or float(temperature) <= 0.0
 
 
 class ModelWorker(QObject):
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
     progress = pyqtSignal(str)
+    # Mode streaming: fragments de texte successifs (chaque émission complète la précédente)
+    partial = pyqtSignal(str)
 
-    def __init__(self, prompt: str, use_web_search: bool = False, max_length: int = 200, temperature: float = 0.7):
+    def __init__(self, prompt: str, use_web_search: bool = False, max_length: int = 200, temperature: float = 0.7, stream: bool = False, use_cache: bool = True, trace_id=None, context=None):
         super().__init__()
         self.prompt = prompt
         self.use_web_search = use_web_search
+        # Résultats déjà scrapés ({moteur: [...]} ou liste): placés avant la question,
+        # ils remplacent la recherche web de l'Espace (voir services/context.py)
+        self.context = context
         self.max_length = max_length
         self.temperature = temperature
-        self.space_name = "Drichdev/micro-btnet-user"
+        self.stream = stream
+        self.use_cache = use_cache and is_cacheable(temperature)
+        self.space_name = DEFAULT_SPACE
+        self.trace_id = trace_id
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Abandonne la requête: pas d'appel si elle n'a pas commencé, arrêt du streaming sinon."""
+        self._cancelled.set()
 
     def run(self):
         """
         Exécute la requête vers l'API Gradio
         """
+        with tracing.request_context(self.trace_id):
+            self._run()
+
+    def _run(self):
         try:
-            self.progress.emit("Connexion au modèle...")
+            question, use_web_search = self.prompt, self.use_web_search
+            if self.context:
+                with tracing.span("model.context") as span:
+                    context = build_context(self.context)
+                    span.set(sources=len(context.sources), tokens=context.tokens, dropped=context.dropped)
+                if context:
+                    question, use_web_search = context.prompt(self.prompt), False
+                    self.progress.emit(f"Contexte: {len(context.sources)} résultats de la recherche (~{context.tokens} tokens)")
+
+            cache_key = response_cache_key(self.space_name, use_web_search, self.max_length, self.temperature)
+            if self.use_cache:
+                cache = get_response_cache()
+                cached = cache.get(cache_key, question)
+                if cached is not None:
+                    tracing.instant("model.cache_hit")
+                    self.progress.emit(f"Réponse en cache (taux de succès: {cache.hit_rate():.0%})")
+                    self.finished.emit(cached)
+                    return
+
+            if self._cancelled.is_set():
+                self.error.emit("Requête annulée")
+                return
+
+            manager = get_client_manager(self.space_name)
+            if not manager.connected:
+                self.progress.emit("Connexion au modèle...")
             
-            # Créer le client Gradio
-            client = Client(self.space_name)
+            # Client partagé (connecté une seule fois par session)
+            manager.get()
             
-            if self.use_web_search:
+            if use_web_search:
                 self.progress.emit("Recherche web activée...")
             else:
                 self.progress.emit("Génération de la réponse...")
             
             # Appeler l'API
-            result = client.predict(
-                question=self.prompt,
-                use_web_search=self.use_web_search,
+            params = dict(
+                question=question,
+                use_web_search=use_web_search,
                 max_length=self.max_length,
                 temperature=self.temperature,
                 api_name="/answer_question"
             )
+            if self.stream:
+                result = self._run_streaming(manager, params)
+            else:
+                result = manager.predict(**params)
+            if self.stream and self._cancelled.is_set():
+                # Streaming interrompu: la réponse est partielle, ni cache ni affichage
+                self.error.emit("Requête annulée")
+                return
+            if self.use_cache and isinstance(result, str):
+                get_response_cache().put(cache_key, question, result)
             
             # Émettre la réponse
             self.finished.emit(result)
@@ -46,6 +135,24 @@ class ModelWorker(QObject):
         except Exception as e:
             self.error.emit(f"Erreur: {str(e)}")
 
+    def _run_streaming(self, manager, params) -> str:
+        """
+        Émet via `partial` la partie nouvelle de chaque sortie intermédiaire
+        (les Espaces Gradio renvoient le texte cumulé) et retourne le texte final.
+        """
+        text = ""
+        for output in manager.stream(**params):
+            if self._cancelled.is_set():
+                break
+            output = output if isinstance(output, str) else str(output)
+            if output.startswith(text):
+                chunk = output[len(text):]
+                if chunk:
+                    self.partial.emit(chunk)
+            # Sinon la sortie a été réécrite: le texte final la remplacera à l'affichage
+            text = output
+        return text
+
 
 # Exemple d'utilisation avec interface PyQt5
 """
@@ -0,0 +1,80 @@
+from functools import partial
+from services.cache import cached_scraper
+from services.engines import fuse_results, normalize_url
+
+
+class ResultPager:
+    """
+    Pagination d'une recherche déjà affichée (page 0).
+
+    `scrapers_for(n)` fournit les scrapers de la page n (avec cache, un par moteur
+    encore paginable) pour un `SearchWorker`; `accept(n, résultats)` retourne
+    les résultats de cette page à ajouter à l'affichage, sans doublons avec les
+    pages précédentes. Un moteur sans pagination, ou dont une page n'apporte
+    rien de nouveau, est considéré comme épuisé.
+    En mode fusionné, les pages de tous les moteurs sont fusionnées en une seule liste.
+    """
+
+    def __init__(self, query: str, registry: dict, engines: list, merge: bool = False, weights: dict = None):
+        self.query = query
+        self.merge = merge
+        self.weights = weights or {}
+        self.page = 0
+        self._scrapers = {name: registry[name] for name in engines if name in registry}
+        self._active = {name for name, scraper in self._scrapers.items() if getattr(scraper, "paginated", False)}
+        self._seen = {name: set() for name in self._scrapers}
+        self._merged_seen = set()
+        self._backlog = []
+
+    @property
+    def has_more(self) -> bool:
+        return bool(self._active or self._backlog)
+
+    def mark_shown(self, results_by_engine: dict, merged: list = None):
+        """
+        Enregistre les résultats de la page 0. En mode fusionné, `merged` est la liste
+        affichée: les résultats fusionnés au-delà passent en tête de la page suivante.
+        """
+        for name, results in results_by_engine.items():
+            if name in self._seen:
+                self._seen[name].update(normalize_url(result["link"]) for result in results)
+        if self.merge:
+            self._merged_seen.update(normalize_url(result["link"]) for result in merged or [])
+            self._backlog = [
+                result for result in fuse_results(results_by_engine, self.weights)
+                if normalize_url(result["link"]) not in self._merged_seen
+            ]
+
+    def scrapers_for(self, page: int) -> dict:
+        return {
+            name: cached_scraper(f"{name}#p{page}", partial(self._scrapers[name].fetch_page, page=page))
+            for name in self._active
+        }
+
+    def accept(self, page: int, results_by_engine: dict) -> dict:
+        """
+        Nouveaux résultats de la page `page`: {moteur: [...]}, ou {None: [...]} en mode fusionné.
+        """
+        self.page = max(self.page, page)
+        fresh = {}
+        for name, results in results_by_engine.items():
+            seen = self._seen[name]
+            new = []
+            for result in results:
+                key = normalize_url(result["link"])
+                if key not in seen:
+                    seen.add(key)
+                    new.append(result)
+            if not new:
+                self._active.discard(name)
+            fresh[name] = new
+        if not self.merge:
+            return fresh
+        merged = []
+        backlog, self._backlog = self._backlog, []
+        for result in backlog + fuse_results(fresh, self.weights):
+            key = normalize_url(result["link"])
+            if key not in self._merged_seen:
+                self._merged_seen.add(key)
+                merged.append(result)
+        return {None: merged}
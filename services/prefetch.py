@@ -0,0 +1,76 @@
+import threading
+from PyQt5.QtCore import QObject, QTimer
+from services.cache import cached_scraper
+from services.dispatch import SearchWorker
+
+
+class Prefetcher(QObject):
+    """
+    Préchargement spéculatif pendant la saisie: après `debounce_ms` sans frappe,
+    les scrapers des moteurs courants sont lancés en arrière-plan pour remplir
+    le cache de résultats. Une nouvelle frappe annule le préchargement en cours
+    (voie « prefetch » du planificateur, à remplacement).
+
+    `budget` borne le nombre de requêtes réseau de préchargement en vol, y compris
+    celles d'un préchargement annulé qui se terminent encore: au-delà, on n'en lance pas.
+    """
+
+    def __init__(self, scheduler, registry_provider, engines_provider, debounce_ms: int = 350,
+                 min_length: int = 3, budget: int = 4, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.registry_provider = registry_provider
+        self.engines_provider = engines_provider
+        self.min_length = min_length
+        self.budget = budget
+        self.stats = {"started": 0, "skipped": 0}
+        self._text = ""
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._generation = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._fire)
+
+    def on_text_edited(self, text: str):
+        """À connecter à `QLineEdit.textEdited`."""
+        self._text = text.strip()
+        self.cancel()
+        self._timer.start()
+
+    def cancel(self):
+        self._timer.stop()
+        if self._generation is not None:
+            self.scheduler.cancel("prefetch", self._generation)
+            self._generation = None
+
+    def _fire(self):
+        query = self._text
+        engines = self.engines_provider()
+        if len(query) < self.min_length or not engines:
+            return
+        with self._lock:
+            if self._in_flight + len(engines) > self.budget:
+                self.stats["skipped"] += 1
+                return
+        registry = self.registry_provider()
+        scrapers = {
+            name: cached_scraper(name, self._counted(registry[name]))
+            for name in engines if name in registry
+        }
+        worker = SearchWorker(query, scrapers)
+        self._generation = self.scheduler.submit("prefetch", worker, priority=10)
+        self.stats["started"] += 1
+
+    def _counted(self, scraper):
+        # Compte uniquement les vrais appels réseau (les succès de cache ne passent pas ici)
+        def run(query):
+            with self._lock:
+                self._in_flight += 1
+            try:
+                return scraper(query)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+        return run
@@ -0,0 +1,204 @@
+from html import escape as _html_escape
+
+
+def escape(text: str) -> str:
+    """
+    Échappement HTML (texte et attributs). La plupart des titres/extraits ne
+    contiennent aucun caractère spécial: on évite alors les cinq `replace`.
+    """
+    if '&' in text or '<' in text or '>' in text or '"' in text or "'" in text:
+        return _html_escape(text)
+    return text
+
+
+def is_web_url(url: str) -> bool:
+    """Vrai pour un lien http(s), le seul type de lien que les pages de résultats ouvrent."""
+    return url[:8].lower().startswith(("http://", "https://"))
+
+
+_RESULTS_STYLE = """
+            body { font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }
+            .container { display: flex; gap: 20px; }
+            .column { flex: 1; background-color: white; padding: 15px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+            .result { margin-bottom: 20px; padding-bottom: 15px; border-bottom: 1px solid #eee; }
+            .result:last-child { border-bottom: none; }
+            .result a { color: #1a0dab; text-decoration: none; font-weight: bold; font-size: 18px; display: block; margin-bottom: 5px; }
+            .result a:hover { text-decoration: underline; }
+            .result p { color: #545454; margin: 5px 0; line-height: 1.6; }
+            .url { color: #006621; font-size: 14px; }
+            .loading, .no-results { color: #999; font-style: italic; padding: 20px; text-align: center; }
+"""
+
+
+_RESULTS_SHELL = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <style>""" + _RESULTS_STYLE + """</style>
+    </head>
+    <body>
+        <div class="container" id="columns"></div>
+        <script>
+            // Les résultats s'ouvrent dans un nouvel onglet: la comparaison reste affichée
+            function openLink(url) { if (/^https?:/i.test(url)) { console.log('drich:open ' + url); } }
+            function truncate(text, size) { return (text || '').slice(0, size) + '...'; }
+            function buildRow(result) {
+                var item = document.createElement('div');
+                item.className = 'result';
+                var a = document.createElement('a');
+                a.href = 'javascript:void(0)';
+                a.textContent = result.title;
+                a.onclick = function () { openLink(result.link); return false; };
+                var url = document.createElement('p');
+                url.className = 'url';
+                url.textContent = truncate(result.link, 70);
+                var snippet = document.createElement('p');
+                snippet.textContent = truncate(result.snippet, 150);
+                item.appendChild(a);
+                item.appendChild(url);
+                item.appendChild(snippet);
+                return item;
+            }
+            // Distance au bas de page (px) à partir de laquelle la page suivante est demandée
+            var MORE_THRESHOLD = 800;
+            window.drichResults = {
+                columns: {},
+                moreEnabled: false,
+                moreRequested: false,
+                reset: function (names) {
+                    var container = document.getElementById('columns');
+                    container.innerHTML = '';
+                    this.columns = {};
+                    this.moreEnabled = false;
+                    this.moreRequested = false;
+                    for (var i = 0; i < names.length; i++) {
+                        var column = document.createElement('div');
+                        column.className = 'column';
+                        column.innerHTML = "<div class='loading'>Chargement...</div>";
+                        container.appendChild(column);
+                        this.columns[names[i]] = column;
+                    }
+                    window.scrollTo(0, 0);
+                },
+                render: function (name, results) {
+                    var column = this.columns[name];
+                    if (!column) { return; }
+                    var fragment = document.createDocumentFragment();
+                    if (!results.length) {
+                        var empty = document.createElement('div');
+                        empty.className = 'no-results';
+                        empty.textContent = 'Aucun résultat trouvé';
+                        fragment.appendChild(empty);
+                    }
+                    results.forEach(function (result) { fragment.appendChild(buildRow(result)); });
+                    column.innerHTML = '';
+                    column.appendChild(fragment);
+                },
+                // Ajoute des lignes en fin de colonne, sans toucher aux précédentes
+                append: function (name, results) {
+                    var column = this.columns[name];
+                    if (!column || !results.length) { return; }
+                    var fragment = document.createDocumentFragment();
+                    results.forEach(function (result) { fragment.appendChild(buildRow(result)); });
+                    column.appendChild(fragment);
+                },
+                // Pagination: l'application demande la suite via console.log('drich:more')
+                enableMore: function (enabled) {
+                    this.moreEnabled = enabled;
+                    this.moreRequested = false;
+                    this.checkMore();
+                },
+                moreDone: function (hasMore) { this.enableMore(hasMore); },
+                checkMore: function () {
+                    if (!this.moreEnabled || this.moreRequested) { return; }
+                    var bottom = window.innerHeight + window.scrollY;
+                    if (bottom >= document.body.scrollHeight - MORE_THRESHOLD) {
+                        this.moreRequested = true;
+                        console.log('drich:more');
+                    }
+                }
+            };
+            window.addEventListener('scroll', function () { window.drichResults.checkMore(); }, { passive: true });
+        </script>
+    </body>
+    </html>
+    """
+
+
+def generate_results_shell() -> str:
+    """
+    Page de résultats persistante: chargée une seule fois dans la vue, puis
+    remplie colonne par colonne via `drichResults.reset(noms)` et
+    `drichResults.render(nom, résultats)` (voir MainWindow._push_results_js).
+    Les pages suivantes sont ajoutées par `drichResults.append(nom, résultats)`;
+    près du bas de page, le script demande la suite par `console.log('drich:more')`,
+    et un clic sur un résultat envoie `drich:open <url>` (voir ui/results_page.py).
+    """
+    return _RESULTS_SHELL
+
+
+# Gabarits découpés une seule fois à l'import: le rendu n'est plus qu'une suite
+# d'appels `format` sur des fragments fixes, assemblés par un unique `join`.
+_PAGE_START = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <style>""" + _RESULTS_STYLE + """</style>
+    </head>
+    <body>
+        <div class="container">"""
+_PAGE_END = """
+        </div>
+        <script>
+            // Même canal que la page persistante: l'application ouvre le lien dans un onglet
+            function openLink(url) { if (/^https?:/i.test(url)) { console.log('drich:open ' + url); } }
+            document.addEventListener('click', function (event) {
+                var link = event.target.closest('a[data-href]');
+                if (link) { event.preventDefault(); openLink(link.getAttribute('data-href')); }
+            });
+        </script>
+    </body>
+    </html>
+    """
+_COLUMN_START = '\n            <div class="column" data-engine="{}">'.format
+_COLUMN_END = "\n            </div>"
+_RESULT = (
+    '\n                <div class="result">'
+    '<a href="javascript:void(0)" data-href="{}">{}</a>'
+    '<p class="url">{}...</p>'
+    '<p>{}...</p>'
+    '</div>'
+).format
+_NO_RESULTS = "\n                <div class='no-results'>Aucun résultat trouvé</div>"
+
+
+def render_results(columns) -> str:
+    """
+    Page de comparaison complète pour N moteurs, en une seule passe.
+    `columns`: liste de couples (nom du moteur, liste de {title, link, snippet}).
+    Titres, liens et extraits sont échappés (le lien n'est plus injecté dans du JS inline:
+    il est lu depuis l'attribut `data-href` par un gestionnaire de clic unique, qui le
+    transmet à l'application par `drich:open`; les liens non http(s) sont ignorés).
+    """
+    parts = [_PAGE_START]
+    append = parts.append
+    for name, results in columns:
+        append(_COLUMN_START(escape(name)))
+        if results:
+            for result in results:
+                link = result['link']
+                safe_link = escape(link)
+                append(_RESULT(
+                    # Seuls les liens http(s) sont cliquables (pas de `javascript:` venu d'un moteur)
+                    safe_link if is_web_url(link) else "",
+                    escape(result['title']),
+                    safe_link if len(link) <= 70 else escape(link[:70]),
+                    escape(result['snippet'][:150]),
+                ))
+        else:
+            append(_NO_RESULTS)
+        append(_COLUMN_END)
+    append(_PAGE_END)
+    return "".join(parts)
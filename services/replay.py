@@ -0,0 +1,438 @@
+"""
+Enregistrement et rejeu du trafic réseau, pour mesurer et tester sans Internet.
+
+Trois modes, choisis par DRICHSEARCH_REPLAY (voir `install_from_env`):
+- "record":  les pages des moteurs et les appels au modèle Gradio sont faits
+             normalement et enregistrés dans DRICHSEARCH_REPLAY_DIR;
+- "replay":  les enregistrements sont rejoués dans le processus, sans réseau;
+- "standin": les scrapers interrogent le serveur local lancé par
+             `python -m services.replay serve` (DRICHSEARCH_STANDIN_URL), ce qui
+             exerce toute la pile HTTP (pool de connexions, délais d'attente).
+             Les appels au modèle sont alors rejoués dans le processus.
+
+Les défauts (latence, gigue, taux d'erreur, débit en requêtes/s et en octets/s)
+s'appliquent au rejeu et au serveur local; voir `FaultProfile`.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from services import clients, search
+from services.cache import default_cache_dir
+from services.ratelimit import RateLimiter
+
+
+class InjectedError(ConnectionError):
+    """Erreur réseau simulée par `FaultProfile`."""
+
+
+class ReplayMissError(LookupError):
+    """Aucun enregistrement ne correspond à la requête rejouée."""
+
+
+class FaultProfile:
+    """
+    Dégradations appliquées à chaque requête rejouée:
+    - `latency` (+ `jitter` aléatoire) secondes avant la réponse;
+    - `error_rate`: proportion de requêtes en échec;
+    - `rps`: requêtes par seconde au plus (0 = illimité);
+    - `bandwidth`: octets par seconde pour le corps des réponses (0 = illimité).
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rps: float = 0.0, bandwidth: int = 0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bandwidth = bandwidth
+        self._limiter = RateLimiter(rps)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FaultProfile":
+        env = os.environ.get
+        return cls(
+            latency=float(env("DRICHSEARCH_REPLAY_LATENCY", 0)),
+            jitter=float(env("DRICHSEARCH_REPLAY_JITTER", 0)),
+            error_rate=float(env("DRICHSEARCH_REPLAY_ERROR_RATE", 0)),
+            rps=float(env("DRICHSEARCH_REPLAY_RPS", 0)),
+            bandwidth=int(env("DRICHSEARCH_REPLAY_BANDWIDTH", 0)),
+        )
+
+    def delay(self, size: int = 0) -> float:
+        """Durée simulée d'une réponse de `size` octets."""
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+        transfer = size / self.bandwidth if self.bandwidth else 0.0
+        return self.latency + jitter + transfer
+
+    def should_fail(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def throttle(self):
+        """Bloque jusqu'à ce que le débit en requêtes/s autorise une nouvelle requête."""
+        self._limiter.acquire()
+
+    def apply(self, size: int = 0, timeout: float = None):
+        """Attend le débit autorisé et la latence simulée; lève une erreur injectée ou un dépassement de délai."""
+        self.throttle()
+        delay = self.delay(size)
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"délai dépassé ({timeout:g}s, réponse simulée en {delay:.2f}s)")
+        if delay:
+            time.sleep(delay)
+        if self.should_fail():
+            raise InjectedError("erreur réseau injectée")
+
+
+def default_replay_dir() -> str:
+    return os.environ.get("DRICHSEARCH_REPLAY_DIR") or os.path.join(default_cache_dir(), "recordings")
+
+
+def _http_key(url: str) -> str:
+    # Le schéma est ignoré: la même page est servie en http par le serveur local
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}?{parts.query}"
+
+
+def _model_key(space_name: str, kwargs: dict) -> str:
+    return f"{space_name}|{json.dumps(kwargs, sort_keys=True, default=str)}"
+
+
+class RecordingStore:
+    """
+    Enregistrements sur disque, un fichier JSON par requête:
+    `http/<hôte>/<sha1>.json` (page d'un moteur) et `model/<sha1>.json` (appel Gradio).
+    Sans correspondance exacte, une page HTTP peut être remplacée par une autre
+    page du même hôte (`fallback`), ce qui permet de rejouer des requêtes jamais enregistrées.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or default_replay_dir()
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _file(self, kind: str, key: str, group: str = "") -> str:
+        return os.path.join(self.path, kind, group, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _write(self, file_path: str, key: str, entry: dict):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp = file_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(dict(entry, key=key), file, ensure_ascii=False)
+        os.replace(tmp, file_path)
+
+    def _read(self, file_path: str):
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def save_http(self, url: str, status: int, body: str, elapsed: float):
+        key, host = _http_key(url), urlsplit(url).netloc
+        self._write(self._file("http", key, host), key, {"url": url, "status": status, "body": body, "elapsed": elapsed})
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def load_http(self, url: str, fallback: bool = True):
+        host = urlsplit(url).netloc
+        entry = self._read(self._file("http", _http_key(url), host))
+        if entry is None and fallback:
+            candidates = self._host_files(host)
+            if candidates:
+                # Choix stable d'une requête à l'autre et entre les processus
+                entry = self._read(candidates[zlib.crc32(url.encode("utf-8")) % len(candidates)])
+        return entry
+
+    def _host_files(self, host: str) -> list:
+        with self._lock:
+            files = self._hosts.get(host)
+            if files is None:
+                directory = os.path.join(self.path, "http", host)
+                names = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+                files = self._hosts[host] = [os.path.join(directory, name) for name in names if name.endswith(".json")]
+            return files
+
+    def save_model(self, space_name: str, kwargs: dict, outputs: list, result):
+        key = _model_key(space_name, kwargs)
+        self._write(self._file("model", key), key, {"space": space_name, "outputs": outputs, "result": result})
+
+    def load_model(self, space_name: str, kwargs: dict):
+        return self._read(self._file("model", _model_key(space_name, kwargs)))
+
+
+class ReplayResponse:
+    """Réponse minimale compatible avec l'usage de `requests.Response` par les scrapers."""
+
+    def __init__(self, url: str, status_code: int, text: str):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise ConnectionError(f"HTTP {self.status_code} pour {self.url}")
+
+
+# --- Transports HTTP (voir search.set_transport) ---
+
+def recording_transport(store: RecordingStore):
+    def transport(url, timeout):
+        start = time.monotonic()
+        response = search._network_get(url, timeout)
+        store.save_http(url, response.status_code, response.text, time.monotonic() - start)
+        return response
+    return transport
+
+
+def replay_transport(store: RecordingStore, faults: FaultProfile = None):
+    faults = faults or FaultProfile()
+
+    def transport(url, timeout):
+        entry = store.load_http(url)
+        if entry is None:
+            faults.apply(timeout=timeout)
+            return ReplayResponse(url, 404, "")
+        faults.apply(len(entry["body"].encode("utf-8")), timeout)
+        return ReplayResponse(url, entry["status"], entry["body"])
+    return transport
+
+
+def standin_transport(base_url: str):
+    """Redirige chaque URL vers le serveur local: https://hôte/chemin?q -> <base>/hôte/chemin?q."""
+    base_url = base_url.rstrip("/")
+
+    def transport(url, timeout):
+        parts = urlsplit(url)
+        target = f"{base_url}/{parts.netloc}{parts.path or '/'}"
+        if parts.query:
+            target += f"?{parts.query}"
+        return search._network_get(target, timeout)
+    return transport
+
+
+# --- Clients Gradio (voir clients.set_client_factory) ---
+
+class _RecordingJob:
+    def __init__(self, job, on_complete):
+        self._job = job
+        self._on_complete = on_complete
+        self._outputs = []
+
+    def __iter__(self):
+        start = time.monotonic()
+        for output in self._job:
+            self._outputs.append([time.monotonic() - start, output])
+            yield output
+        self._on_complete(self._outputs, self._job.result())
+
+    def result(self):
+        return self._job.result()
+
+    def cancel(self):
+        return self._job.cancel()
+
+
+class RecordingClient:
+    """Client Gradio réel dont les réponses sont enregistrées."""
+
+    def __init__(self, space_name: str, store: RecordingStore):
+        from gradio_client import Client
+        self.space_name = space_name
+        self._store = store
+        self._client = Client(space_name)
+
+    def predict(self, **kwargs):
+        start = time.monotonic()
+        result = self._client.predict(**kwargs)
+        self._store.save_model(self.space_name, kwargs, [[time.monotonic() - start, result]], result)
+        return result
+
+    def submit(self, **kwargs):
+        def save(outputs, result):
+            self._store.save_model(self.space_name, kwargs, outputs, result)
+        return _RecordingJob(self._client.submit(**kwargs), save)
+
+
+class _ReplayJob:
+    def __init__(self, entry: dict, faults: FaultProfile, speed: float):
+        self._entry = entry
+        self._faults = faults
+        self._speed = speed
+        self._cancelled = threading.Event()
+
+    def __iter__(self):
+        self._faults.apply()
+        start = time.monotonic()
+        for offset, output in self._entry["outputs"]:
+            if self._speed:
+                # Respecte le rythme enregistré (accéléré ou ralenti par `speed`)
+                wait = offset / self._speed - (time.monotonic() - start)
+                if wait > 0 and self._cancelled.wait(wait):
+                    return
+            if self._cancelled.is_set():
+                return
+            yield output
+
+    def result(self):
+        return self._entry["result"]
+
+    def cancel(self):
+        self._cancelled.set()
+        return True
+
+
+class ReplayClient:
+    """Client Gradio simulé à partir des enregistrements (aucun accès réseau)."""
+
+    def __init__(self, space_name: str, store: RecordingStore, faults: FaultProfile = None, speed: float = 1.0):
+        self.space_name = space_name
+        self._store = store
+        self._faults = faults or FaultProfile()
+        self._speed = speed
+
+    def _entry(self, kwargs):
+        entry = self._store.load_model(self.space_name, kwargs)
+        if entry is None:
+            raise ReplayMissError(f"aucun enregistrement pour {self.space_name} {kwargs.get('api_name', '')}")
+        return entry
+
+    def predict(self, **kwargs):
+        entry = self._entry(kwargs)
+        self._faults.apply()
+        if self._speed and entry["outputs"]:
+            time.sleep(entry["outputs"][-1][0] / self._speed)
+        return entry["result"]
+
+    def submit(self, **kwargs):
+        return _ReplayJob(self._entry(kwargs), self._faults, self._speed)
+
+
+def install(mode: str, store: RecordingStore = None, faults: FaultProfile = None,
+            standin_url: str = None, speed: float = 1.0):
+    """Active un mode ("record", "replay", "standin") pour les scrapers et le modèle; None le désactive."""
+    if not mode:
+        search.set_transport(None)
+        clients.set_client_factory(None)
+        return
+    store = store or RecordingStore()
+    faults = faults or FaultProfile()
+    if mode == "record":
+        search.set_transport(recording_transport(store))
+        clients.set_client_factory(lambda space_name: RecordingClient(space_name, store))
+    elif mode in ("replay", "standin"):
+        if mode == "standin":
+            search.set_transport(standin_transport(standin_url or "http://127.0.0.1:8765"))
+        else:
+            search.set_transport(replay_transport(store, faults))
+        clients.set_client_factory(lambda space_name: ReplayClient(space_name, store, faults, speed))
+    else:
+        raise ValueError(f"mode de rejeu inconnu: {mode}")
+
+
+def install_from_env() -> str:
+    """Applique DRICHSEARCH_REPLAY (et les variables associées); retourne le mode actif."""
+    mode = os.environ.get("DRICHSEARCH_REPLAY", "").strip().lower() or None
+    if mode:
+        install(
+            mode,
+            RecordingStore(default_replay_dir()),
+            FaultProfile.from_env(),
+            standin_url=os.environ.get("DRICHSEARCH_STANDIN_URL"),
+            speed=float(os.environ.get("DRICHSEARCH_REPLAY_SPEED", 1)),
+        )
+    return mode
+
+
+# --- Serveur local ---
+
+def make_server(store: RecordingStore, faults: FaultProfile, port: int = 8765, pages: dict = None,
+                host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serveur HTTP servant les pages enregistrées sous /<hôte>/<chemin>?<requête>.
+    `pages`: hôte -> fichier HTML servi quand aucun enregistrement ne convient.
+    Une erreur injectée répond 503; la bande passante est simulée en découpant le corps.
+    """
+    pages = dict(pages or {})
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            netloc, _, rest = self.path.lstrip("/").partition("/")
+            url = f"https://{netloc}/{rest}"
+            entry = store.load_http(url)
+            if entry is None and netloc in pages:
+                with open(pages[netloc], "r", encoding="utf-8") as file:
+                    entry = {"status": 200, "body": file.read()}
+            body = (entry["body"] if entry else "").encode("utf-8")
+            status = entry["status"] if entry else 404
+
+            faults.throttle()
+            time.sleep(faults.delay())
+            if faults.should_fail():
+                status, body = 503, b"erreur injectee"
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            chunk = max(1, faults.bandwidth // 10) if faults.bandwidth else len(body) or 1
+            try:
+                for offset in range(0, len(body), chunk):
+                    self.wfile.write(body[offset:offset + chunk])
+                    if faults.bandwidth:
+                        time.sleep(chunk / faults.bandwidth)
+            except (BrokenPipeError, ConnectionResetError):
+                # Client parti (délai dépassé, requête annulée)
+                self.close_connection = True
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur local rejouant les pages des moteurs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve")
+    serve.add_argument("--dir", default=None, help="dossier des enregistrements (défaut: DRICHSEARCH_REPLAY_DIR)")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0, help="latence ajoutée (s)")
+    serve.add_argument("--jitter", type=float, default=0.0, help="gigue aléatoire ajoutée (s)")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="proportion de réponses 503")
+    serve.add_argument("--rps", type=float, default=0.0, help="requêtes par seconde au plus (0 = illimité)")
+    serve.add_argument("--bandwidth", type=int, default=0, help="octets par seconde (0 = illimité)")
+    serve.add_argument("--page", action="append", default=[], metavar="HÔTE=FICHIER",
+                       help="page servie par défaut pour un hôte (ex: html.duckduckgo.com=benchmarks/fixtures/duckduckgo_large.html)")
+    args = parser.parse_args(argv)
+
+    pages = dict(item.split("=", 1) for item in args.page)
+    faults = FaultProfile(args.latency, args.jitter, args.error_rate, args.rps, args.bandwidth)
+    server = make_server(RecordingStore(args.dir), faults, args.port, pages)
+    print(f"Serveur de rejeu sur http://127.0.0.1:{args.port} (DRICHSEARCH_REPLAY=standin)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import heapq
+import itertools
+from PyQt5.QtCore import QObject, QThread
+
+
+class _Lane:
+    """File d'attente d'un type de requête (recherche, modèle...)."""
+
+    def __init__(self, name: str, max_concurrent: int, supersede: bool):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.supersede = supersede
+        self.queue = []  # tas de (priorité, ordre, génération, worker)
+        self.running = {}  # génération -> (worker, thread)
+        self.cancelled = set()
+        self.latest = 0
+
+
+class RequestScheduler(QObject):
+    """
+    Point d'entrée unique des requêtes réseau de l'interface.
+
+    Chaque requête reçoit un numéro de génération croissant. Dans une voie
+    « superseding » (recherches), une nouvelle requête annule toutes les précédentes:
+    celles en attente ne démarrent jamais, celles en cours reçoivent `cancel()`.
+    Les autres voies (modèle) bornent le nombre d'appels simultanés et mettent le reste
+    en file, par priorité croissante puis ordre d'arrivée.
+
+    Les workers sont des QObject exposant `run()`, les signaux `finished` et `error`
+    (l'un des deux est toujours émis) et, optionnellement, `cancel()`.
+    Un worker dont `run()` ne bloque pas peut déclarer `threaded = False`: il est
+    alors démarré dans le thread GUI, sans QThread.
+    La génération est aussi posée sur le worker (`worker.generation`): les slots de
+    l'interface vérifient `is_current(voie, worker.generation)` avant d'afficher.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lanes = {}
+        self._order = itertools.count()
+        self._generations = itertools.count(1)
+
+    def add_lane(self, name: str, max_concurrent: int = 1, supersede: bool = False):
+        self._lanes[name] = _Lane(name, max_concurrent, supersede)
+
+    def submit(self, lane_name: str, worker: QObject, priority: int = 0) -> int:
+        """Planifie `worker` et retourne sa génération (les connexions aux signaux sont faites avant)."""
+        lane = self._lanes[lane_name]
+        generation = next(self._generations)
+        lane.latest = generation
+        worker.generation = generation
+        if lane.supersede:
+            self._cancel_all(lane)
+        heapq.heappush(lane.queue, (priority, next(self._order), generation, worker))
+        self._drain(lane)
+        return generation
+
+    def is_current(self, lane_name: str, generation: int) -> bool:
+        """Vrai si `generation` est la dernière requête soumise dans une voie à remplacement,
+        ou si elle n'a pas été annulée dans une voie en file."""
+        lane = self._lanes[lane_name]
+        if lane.supersede:
+            return generation == lane.latest
+        return generation not in lane.cancelled
+
+    def cancel(self, lane_name: str, generation: int):
+        lane = self._lanes[lane_name]
+        lane.cancelled.add(generation)
+        for entry in lane.queue:
+            if entry[2] == generation:
+                entry[3].deleteLater()
+        lane.queue = [entry for entry in lane.queue if entry[2] != generation]
+        heapq.heapify(lane.queue)
+        running = lane.running.get(generation)
+        if running is not None:
+            self._cancel_worker(running[0])
+
+    def cancel_all(self, lane_name: str):
+        """
+        Annule toutes les requêtes de la voie, sans en soumettre de nouvelle: plus aucune
+        génération antérieure n'est courante (ex: recherche confiée à un moteur externe).
+        """
+        lane = self._lanes[lane_name]
+        lane.latest = next(self._generations)
+        lane.cancelled.update(entry[2] for entry in lane.queue)
+        lane.cancelled.update(lane.running)
+        self._cancel_all(lane)
+
+    def pending(self, lane_name: str) -> int:
+        """Nombre de requêtes en cours ou en attente dans une voie."""
+        lane = self._lanes[lane_name]
+        return len(lane.running) + len(lane.queue)
+
+    def _cancel_all(self, lane: _Lane):
+        # Les workers jamais démarrés sont simplement libérés
+        for _, _, _, worker in lane.queue:
+            worker.deleteLater()
+        lane.queue = []
+        for worker, _ in lane.running.values():
+            self._cancel_worker(worker)
+
+    def _cancel_worker(self, worker: QObject):
+        cancel = getattr(worker, "cancel", None)
+        if cancel is not None:
+            cancel()
+
+    def _drain(self, lane: _Lane):
+        while lane.queue and len(lane.running) < lane.max_concurrent:
+            _, _, generation, worker = heapq.heappop(lane.queue)
+            self._start(lane, generation, worker)
+
+    def _start(self, lane: _Lane, generation: int, worker: QObject):
+        # Workers non bloquants (`threaded = False`, ex: backend asyncio): appelés directement
+        if not getattr(worker, "threaded", True):
+            thread = None
+        else:
+            # Thread parenté au planificateur: survit à l'écrasement des références Python
+            thread = QThread(self)
+            worker.moveToThread(thread)
+            thread.started.connect(worker.run)
+        lane.running[generation] = (worker, thread)
+
+        def done(*_):
+            if lane.running.pop(generation, None) is None:
+                return
+            if thread is not None:
+                thread.quit()
+            worker.deleteLater()
+            self._drain(lane)
+
+        worker.finished.connect(done)
+        worker.error.connect(done)
+        if thread is None:
+            worker.run()
+            return
+        thread.finished.connect(thread.deleteLater)
+        thread.start()
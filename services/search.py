@@ -1,8 +1,111 @@
 import json
 import os
-import requests
-from bs4 import BeautifulSoup
+import threading
 from urllib.parse import quote_plus, urlparse, parse_qs, unquote
+from services import tracing
+from services.render import render_results
+
+
+# Extrait affiché quand un résultat n'en a pas (à ne pas traiter comme du contenu)
+NO_SNIPPET = "Pas de description"
+
+# En-têtes communs à tous les scrapers (définis une seule fois sur la session)
+_DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0 Safari/537.36'
+}
+
+# Taille du pool de connexions keep-alive par hôte
+_HOST_POOL_SIZES = {
+    "https://html.duckduckgo.com": 4,
+    "https://duckduckgo.com": 4,
+    "https://search.yahoo.com": 4,
+}
+_DEFAULT_POOL_SIZE = 2
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Retourne la session HTTP partagée (créée à la demande, thread-safe).
+    Les connexions TCP/TLS sont réutilisées d'une recherche à l'autre.
+    `requests` n'est importé qu'ici, au premier besoin (démarrage plus rapide).
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.headers.update(_DEFAULT_HEADERS)
+                default = HTTPAdapter(pool_connections=len(_HOST_POOL_SIZES) + 1, pool_maxsize=_DEFAULT_POOL_SIZE)
+                session.mount("https://", default)
+                session.mount("http://", default)
+                for prefix, size in _HOST_POOL_SIZES.items():
+                    session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=size))
+                _session = session
+    return _session
+
+
+def reset_session():
+    """Ferme la session partagée (les connexions ouvertes sont libérées)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def http_stats() -> dict:
+    """
+    Compteurs de réutilisation des connexions, par hôte:
+    {host: {"connections": n, "requests": m, "reused": m - n}}.
+    """
+    stats = {}
+    session = _session
+    if session is None:
+        return stats
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            entry = stats.setdefault(pool.host, {"connections": 0, "requests": 0, "reused": 0})
+            entry["connections"] += pool.num_connections
+            entry["requests"] += pool.num_requests
+            entry["reused"] = max(0, entry["requests"] - entry["connections"])
+    return stats
+
+
+# Transport de remplacement (enregistrement/rejeu, serveur local: voir services/replay.py).
+# Appelé comme `transport(url, timeout)`; doit retourner un objet de type Response.
+_transport = None
+
+
+def set_transport(transport=None):
+    """Remplace l'accès réseau des scrapers (None: retour à la session partagée)."""
+    global _transport
+    _transport = transport
+
+
+def _network_get(url: str, timeout: float):
+    return get_session().get(url, timeout=timeout)
+
+
+def _http_get(url: str, timeout: float):
+    """GET via la session partagée; lève une exception si le statut est en erreur."""
+    with tracing.span("fetch", url=url) as span:
+        response = (_transport or _network_get)(url, timeout)
+        span.set(status=response.status_code, bytes=len(response.content))
+        response.raise_for_status()
+        return response
 
 
 def _ddg_extract_url(href: str) -> str:
@@ -25,6 +128,202 @@ def _ddg_extract_url(href: str) -> str:
     return ""
 
 
+class _SoupNode:
+    """Nœud BeautifulSoup exposé via l'interface commune des parseurs."""
+    __slots__ = ("tag",)
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    def select(self, css: str) -> list:
+        return [_SoupNode(tag) for tag in self.tag.select(css)]
+
+    def select_one(self, css: str):
+        tag = self.tag.select_one(css)
+        return _SoupNode(tag) if tag is not None else None
+
+    def text(self) -> str:
+        return self.tag.get_text(strip=True)
+
+    def attr(self, name: str) -> str:
+        return self.tag.get(name) or ''
+
+
+class _LexborNode:
+    """Nœud selectolax (lexbor) exposé via l'interface commune des parseurs."""
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+    def select(self, css: str) -> list:
+        # lexbor inclut le nœud lui-même et répète un nœud par sélecteur d'une liste "a, b":
+        # on ne garde que les descendants, chacun une seule fois (ordre du document)
+        own_id = self.node.mem_id
+        seen = set()
+        nodes = []
+        for node in self.node.css(css):
+            node_id = node.mem_id
+            if node_id != own_id and node_id not in seen:
+                seen.add(node_id)
+                nodes.append(_LexborNode(node))
+        return nodes
+
+    def select_one(self, css: str):
+        own_id = self.node.mem_id
+        for node in self.node.css(css):
+            if node.mem_id != own_id:
+                return _LexborNode(node)
+        return None
+
+    def text(self) -> str:
+        return self.node.text(strip=True)
+
+    def attr(self, name: str) -> str:
+        return self.node.attributes.get(name) or ''
+
+
+def _soup_parser(builder: str):
+    def parse(markup, containers=None):
+        from bs4 import BeautifulSoup, SoupStrainer
+        strainer = None
+        if containers:
+            # Analyse partielle: seuls les blocs de résultats sont construits
+            strainer = SoupStrainer(class_=lambda value: bool(value) and not containers.isdisjoint(value.split()))
+        return _SoupNode(BeautifulSoup(markup, builder, parse_only=strainer))
+    return parse
+
+
+def _lexbor_parser(markup, containers=None):
+    from selectolax.lexbor import LexborHTMLParser
+    return _LexborNode(LexborHTMLParser(markup).root)
+
+
+def _module_available(name: str) -> bool:
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+
+# Backends par ordre de préférence; "html.parser" (pur Python) est toujours disponible
+_PARSERS = {
+    "selectolax": (_lexbor_parser, "selectolax.lexbor"),
+    "lxml": (_soup_parser("lxml"), "lxml"),
+    "html.parser": (_soup_parser("html.parser"), None),
+}
+_parser_name = None
+
+
+def available_parsers() -> list:
+    """Noms des backends de parsing utilisables dans cet environnement."""
+    return [name for name, (_, module) in _PARSERS.items() if module is None or _module_available(module)]
+
+
+def set_parser(name: str = None) -> str:
+    """
+    Sélectionne le backend de parsing HTML ("selectolax", "lxml", "html.parser").
+    Sans argument (ou backend indisponible): variable DRICHSEARCH_PARSER,
+    sinon le plus rapide disponible. Retourne le nom retenu.
+    """
+    global _parser_name
+    available = available_parsers()
+    name = name or os.environ.get("DRICHSEARCH_PARSER")
+    _parser_name = name if name in available else available[0]
+    return _parser_name
+
+
+def get_parser() -> str:
+    return _parser_name or set_parser()
+
+
+def parse_html(markup, containers: set = None):
+    """
+    Construit l'arbre HTML avec le backend courant.
+    `containers`: classes CSS des blocs de résultats; quand le backend le permet,
+    seuls ces blocs sont analysés (équivalent SoupStrainer).
+    """
+    parse, _ = _PARSERS[get_parser()]
+    return parse(markup, containers)
+
+
+_DDG_CONTAINERS = {"result", "web-result"}
+_YAHOO_CONTAINERS = {"algo"}
+
+
+def parse_duckduckgo(markup, limit: int = 10) -> list:
+    """Extrait jusqu'à `limit` résultats {title, link, snippet} d'une page HTML DuckDuckGo (None: tous)."""
+    doc = parse_html(markup, _DDG_CONTAINERS)
+    results = []
+
+    # Résultats principaux (supporter plusieurs structures HTML), en une seule passe
+    candidates = doc.select('div.result, div.results_links_deep.web-result, div.web-result')
+
+    seen = set()
+    for item in candidates:
+        a = item.select_one('a.result__a') or item.select_one('h2.result__title a') or item.select_one('a[href]')
+        if not a:
+            continue
+        raw_href = a.attr('href').strip()
+        href = _ddg_extract_url(raw_href)
+        title = a.text()
+        if not href or not title:
+            continue
+        key = (title, href)
+        if key in seen:
+            continue
+
+        # Snippet: essayer diverses classes / balises, dans cet ordre (un sélecteur groupé
+        # retournerait le premier élément du document, pas le premier de la liste)
+        sn = (
+            item.select_one('a.result__snippet')
+            or item.select_one('div.result__snippet')
+            or item.select_one('p')
+            or item.select_one('div')
+        )
+        snippet = sn.text()[:200] if sn else ''
+
+        results.append({'title': title, 'link': href, 'snippet': snippet})
+        seen.add(key)
+        if limit is not None and len(results) >= limit:
+            break
+
+    return results
+
+
+def parse_yahoo(markup, limit: int = 10) -> list:
+    """Extrait les résultats {title, link, snippet} des `limit` premiers blocs d'une page HTML Yahoo (None: tous)."""
+    doc = parse_html(markup, _YAHOO_CONTAINERS)
+    results = []
+    search_items = doc.select('div.algo')
+    for item in search_items[:limit]:
+        try:
+            link_elem = item.select_one('a[href]')
+            if not link_elem:
+                continue
+            link = link_elem.attr('href')
+            if not link.startswith('http'):
+                continue
+            title = link_elem.text()
+            if not title or len(title) < 3:
+                continue
+            description = ""
+            desc_elem = item.select_one('div.compText')
+            if not desc_elem:
+                desc_elem = item.select_one('p, div')
+            if desc_elem:
+                description = desc_elem.text()
+            results.append({
+                'title': title,
+                'link': link,
+                'snippet': description[:200] if description else NO_SNIPPET
+            })
+        except Exception:
+            continue
+    return results
+
+
 def scrape_duckduckgo(query: str):
     """
     Scrape DuckDuckGo via l'endpoint HTML (sans JS):
@@ -32,165 +331,38 @@ def scrape_duckduckgo(query: str):
     Retourne jusqu'à 10 résultats {title, link, snippet}.
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0 Safari/537.36'
-        }
         # Essayer plusieurs endpoints HTML compatibles
         endpoints = [
             f"https://html.duckduckgo.com/html/?q={quote_plus(query)}",
             f"https://duckduckgo.com/html/?q={quote_plus(query)}",
         ]
 
-        soup = None
+        markup = None
         last_err = None
         for url in endpoints:
             try:
-                resp = requests.get(url, headers=headers, timeout=12)
-                resp.raise_for_status()
-                soup = BeautifulSoup(resp.text, 'html.parser')
+                resp = _http_get(url, timeout=12)
+                markup = resp.text
                 break
             except Exception as e:
                 last_err = e
                 continue
-        if soup is None:
+        if markup is None:
             raise last_err or RuntimeError("DuckDuckGo unreachable")
 
-        results = []
-
-        # Résultats principaux (supporter plusieurs structures HTML)
-        candidates = []
-        candidates.extend(soup.select('div.result'))
-        candidates.extend(soup.select('div.results_links_deep.web-result'))
-        candidates.extend(soup.select('div.web-result'))
-
-        seen = set()
-        for item in candidates:
-            a = item.select_one('a.result__a') or item.select_one('h2.result__title a') or item.find('a', href=True)
-            if not a:
-                continue
-            raw_href = (a.get('href') or '').strip()
-            href = _ddg_extract_url(raw_href)
-            title = a.get_text(strip=True)
-            if not href or not title:
-                continue
-            key = (title, href)
-            if key in seen:
-                continue
-
-            # Snippet: essayer diverses classes / balises
-            sn = (
-                item.select_one('a.result__snippet')
-                or item.select_one('div.result__snippet')
-                or item.select_one('div.result__snippet.js-result-snippet')
-                or item.find('p')
-                or item.find('div')
-            )
-            snippet = sn.get_text(strip=True)[:200] if sn else ''
-
-            results.append({'title': title, 'link': href, 'snippet': snippet})
-            seen.add(key)
-            if len(results) >= 10:
-                break
-
-        return results
+        return parse_duckduckgo(markup)
     except Exception:
         return []
 
 def scrape_yahoo(query: str):
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-        url = f"https://search.yahoo.com/search?p={query}"
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        results = []
-        search_items = soup.find_all('div', class_='algo')
-        for item in search_items[:10]:
-            try:
-                link_elem = item.find('a', href=True)
-                if not link_elem:
-                    continue
-                link = link_elem.get('href', '')
-                if not link.startswith('http'):
-                    continue
-                title = link_elem.get_text(strip=True)
-                if not title or len(title) < 3:
-                    continue
-                description = ""
-                desc_elem = item.find('div', class_='compText')
-                if not desc_elem:
-                    desc_elem = item.find(['p', 'div'])
-                if desc_elem:
-                    description = desc_elem.get_text(strip=True)
-                results.append({
-                    'title': title,
-                    'link': link,
-                    'snippet': description[:200] if description else "Pas de description"
-                })
-            except Exception:
-                continue
-        return results
+        url = f"https://search.yahoo.com/search?p={quote_plus(query)}"
+        response = _http_get(url, timeout=10)
+        return parse_yahoo(response.content)
     except Exception:
         return []
 
 
 def generate_results_html(first_results, second_results, first_name="DuckDuckGo", second_name="Yahoo"):
-    html = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }
-            .container { display: flex; gap: 20px; }
-            .column { flex: 1; background-color: white; padding: 15px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
-            .result { margin-bottom: 20px; padding-bottom: 15px; border-bottom: 1px solid #eee; }
-            .result:last-child { border-bottom: none; }
-            .result a { color: #1a0dab; text-decoration: none; font-weight: bold; font-size: 18px; display: block; margin-bottom: 5px; }
-            .result a:hover { text-decoration: underline; }
-            .result p { color: #545454; margin: 5px 0; line-height: 1.6; }
-            .url { color: #006621; font-size: 14px; }
-            .no-results { color: #999; font-style: italic; padding: 20px; text-align: center; }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="column ddg">
-    """
-    if first_results:
-        for result in first_results:
-            html += f"""
-                <div class=\"result\">
-                    <a href=\"javascript:void(0)\" onclick=\"openLink('{result['link']}'); return false;\">{result['title']}</a>
-                    <p class=\"url\">{result['link'][:70]}...</p>
-                    <p>{result['snippet'][:150]}...</p>
-                </div>
-            """
-    else:
-        html += "<div class='no-results'>Aucun résultat trouvé</div>"
-    html += """
-            </div>
-            <div class=\"column yahoo\">
-    """
-    if second_results:
-        for result in second_results:
-            html += f"""
-                <div class=\"result\">
-                    <a href=\"javascript:void(0)\" onclick=\"openLink('{result['link']}'); return false;\">{result['title']}</a>
-                    <p class=\"url\">{result['link'][:70]}...</p>
-                    <p>{result['snippet'][:150]}...</p>
-                </div>
-            """
-    else:
-        html += "<div class='no-results'>Aucun résultat trouvé</div>"
-    html += """
-            </div>
-        </div>
-        <script>
-            function openLink(url) { window.location.href = url; }
-        </script>
-    </body>
-    </html>
-    """
-    return html
+    """Page de comparaison à deux colonnes (voir services.render.render_results)."""
+    return render_results([(first_name, first_results), (second_name, second_results)])
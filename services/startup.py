@@ -0,0 +1,27 @@
+import os
+import time
+
+
+# Origine des mesures: import de ce module, tout premier import de main.py
+_T0 = time.perf_counter()
+_marks = []
+
+
+def enabled() -> bool:
+    """Rapport de démarrage demandé via DRICHSEARCH_STARTUP_REPORT=1."""
+    return os.environ.get("DRICHSEARCH_STARTUP_REPORT") == "1"
+
+
+def mark(label: str):
+    """Enregistre une étape du démarrage (temps écoulé depuis le lancement)."""
+    _marks.append((label, time.perf_counter()))
+
+
+def report() -> str:
+    """Tableau des étapes: durée de chaque étape et temps cumulé, en millisecondes."""
+    lines = [f"{'étape':<40} {'durée':>9} {'cumul':>9}"]
+    previous = _T0
+    for label, at in _marks:
+        lines.append(f"{label:<40} {(at - previous) * 1000:>7.1f}ms {(at - _T0) * 1000:>7.1f}ms")
+        previous = at
+    return "\n".join(lines)
@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+# Activation via DRICHSEARCH_TRACE=1 (ou set_enabled); désactivé, chaque point
+# d'instrumentation se réduit à un test de booléen et retourne un objet partagé.
+_enabled = os.environ.get("DRICHSEARCH_TRACE") == "1"
+
+# Nombre de requêtes (recherche, question au modèle) dont la chronologie est conservée
+MAX_REQUESTS = 20
+# Nombre total de spans conservés pour l'export
+MAX_SPANS = 10000
+
+_T0 = time.perf_counter_ns()
+_lock = threading.Lock()
+_local = threading.local()
+_spans = deque(maxlen=MAX_SPANS)
+_requests = OrderedDict()
+_request_ids = iter(range(1, 1 << 62))
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(value: bool):
+    global _enabled
+    _enabled = bool(value)
+
+
+def _now_us() -> float:
+    return (time.perf_counter_ns() - _T0) / 1000.0
+
+
+class _NullSpan:
+    """Span inerte retourné quand le traçage est désactivé."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+    def end(self):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Intervalle mesuré; utilisable en `with` ou via `end()` (fin asynchrone)."""
+
+    __slots__ = ("name", "request", "args", "start", "tid", "_done")
+
+    def __init__(self, name: str, request, args: dict):
+        self.name = name
+        self.request = request
+        self.args = args
+        self.tid = threading.get_ident()
+        self.start = _now_us()
+        self._done = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.end()
+        return False
+
+    def set(self, **args):
+        """Ajoute des attributs (statut, taille...) au span."""
+        self.args.update(args)
+
+    def end(self):
+        if self._done:
+            return
+        self._done = True
+        _record({
+            "name": self.name,
+            "ph": "X",
+            "ts": self.start,
+            "dur": _now_us() - self.start,
+            "tid": self.tid,
+            "request": self.request,
+            "args": self.args,
+        })
+
+
+def _record(event: dict):
+    with _lock:
+        _spans.append(event)
+        timeline = _requests.get(event["request"])
+        if timeline is not None:
+            timeline["spans"].append(event)
+
+
+def span(name: str, request=None, **args):
+    """
+    Mesure un intervalle. La requête courante du thread (voir `request_context`)
+    est utilisée si `request` n'est pas fourni.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    if request is None:
+        request = getattr(_local, "request", None)
+    return Span(name, request, args)
+
+
+def instant(name: str, **args):
+    """Événement ponctuel (ex: premier fragment reçu du modèle)."""
+    if not _enabled:
+        return
+    _record({
+        "name": name,
+        "ph": "i",
+        "ts": _now_us(),
+        "tid": threading.get_ident(),
+        "request": getattr(_local, "request", None),
+        "args": args,
+    })
+
+
+def begin_request(label: str):
+    """Ouvre la chronologie d'une requête utilisateur; retourne son identifiant (None si désactivé)."""
+    if not _enabled:
+        return None
+    with _lock:
+        request_id = next(_request_ids)
+        _requests[request_id] = {"id": request_id, "label": label, "start": _now_us(), "spans": []}
+        while len(_requests) > MAX_REQUESTS:
+            _requests.popitem(last=False)
+    return request_id
+
+
+class _RequestContext:
+    __slots__ = ("request", "previous")
+
+    def __init__(self, request):
+        self.request = request
+
+    def __enter__(self):
+        self.previous = getattr(_local, "request", None)
+        _local.request = self.request
+        return self
+
+    def __exit__(self, *exc):
+        _local.request = self.previous
+        return False
+
+
+def request_context(request):
+    """Rattache les spans du thread courant à `request` le temps du bloc `with`."""
+    if request is None:
+        return _NULL_SPAN
+    return _RequestContext(request)
+
+
+def recent_requests(limit: int = MAX_REQUESTS) -> list:
+    """Copie des dernières chronologies, de la plus ancienne à la plus récente."""
+    with _lock:
+        timelines = list(_requests.values())[-limit:]
+        return [dict(timeline, spans=list(timeline["spans"])) for timeline in timelines]
+
+
+def clear():
+    with _lock:
+        _spans.clear()
+        _requests.clear()
+
+
+def export_chrome_trace(path: str) -> int:
+    """
+    Écrit les spans au format Chrome Trace (chrome://tracing, Perfetto).
+    Chaque requête utilisateur est un « processus » nommé d'après son libellé.
+    Retourne le nombre d'événements écrits.
+    """
+    with _lock:
+        spans = list(_spans)
+        labels = {request_id: timeline["label"] for request_id, timeline in _requests.items()}
+    events = []
+    for request_id, label in labels.items():
+        events.append({"name": "process_name", "ph": "M", "pid": request_id, "args": {"name": label}})
+    for event in spans:
+        out = {key: value for key, value in event.items() if key != "request"}
+        out["pid"] = event["request"] or 0
+        if event["ph"] == "i":
+            out["s"] = "t"
+        events.append(out)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    return len(events)
@@ -0,0 +1,14 @@
+import os
+import pytest
+from services import cache, model
+
+# Widgets Qt (QApplication) sans serveur d'affichage
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """Caches partagés (résultats, réponses du modèle) recréés dans un dossier temporaire."""
+    monkeypatch.setenv("DRICHSEARCH_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(cache, "_cache", None)
+    monkeypatch.setattr(model, "_response_cache", None)
@@ -0,0 +1,188 @@
+import asyncio
+import threading
+import time
+import pytest
+from PyQt5.QtCore import QCoreApplication
+from services import asearch, search
+from services.cache import ResultCache, cached_scraper
+from services.dispatch import AsyncSearchWorker
+from services.engines import EngineScraper
+from services.replay import ReplayResponse
+from services.scheduler import RequestScheduler
+
+MOJEEK = """
+<ul class="results-standard">
+  <li><h2><a class="title" href="https://python.org">Python</a></h2><p class="s">Langage</p></li>
+</ul>
+"""
+
+
+class Transport:
+    """Transport de remplacement: `routes` associe un hôte à (délai, statut)."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, url, timeout):
+        with self._lock:
+            self.calls.append(url)
+        host = url.split("/")[2]
+        delay, status = self.routes.get(host, (0.0, 404))
+        time.sleep(delay)
+        return ReplayResponse(url, status, MOJEEK if status == 200 else "")
+
+
+@pytest.fixture
+def transport():
+    def install(routes):
+        transport = Transport(routes)
+        search.set_transport(transport)
+        return transport
+    yield install
+    search.set_transport(None)
+
+
+def engine(name="Mojeek", hosts=("a.example",), **config):
+    return EngineScraper(dict({
+        "name": name,
+        "endpoints": [f"https://{host}/search?q={{query}}" for host in hosts],
+        "selectors": {"item": "ul.results-standard > li", "link": ["a.title"], "snippet": "p.s"},
+    }, **config))
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_search_all_collects_every_engine(transport):
+    transport({"a.example": (0.0, 200), "b.example": (0.0, 500)})
+    scrapers = {"A": engine("A"), "B": engine("B", hosts=("b.example",))}
+    results = run(asearch.search_all("python", scrapers, use_cache=False))
+    assert [r["link"] for r in results["A"]] == ["https://python.org"]
+    assert results["B"] == []
+
+
+def test_slow_endpoint_is_hedged_with_the_next_one(transport):
+    calls = transport({"slow.example": (0.5, 200), "fast.example": (0.0, 200)})
+    scraper = engine(hosts=("slow.example", "fast.example"), hedge_delay=0.05)
+
+    async def timed():
+        start = time.monotonic()
+        results = await asearch.search_engine(scraper, "python", use_cache=False)
+        return results, time.monotonic() - start
+    # Mesuré dans la boucle: asyncio.run attend ensuite la fin du transport lent
+    results, elapsed = run(timed())
+    assert len(results) == 1
+    assert elapsed < 0.4
+    assert [url.split("/")[2] for url in calls.calls] == ["slow.example", "fast.example"]
+
+
+def test_fast_endpoint_is_not_hedged(transport):
+    calls = transport({"a.example": (0.0, 200), "b.example": (0.0, 200)})
+    scraper = engine(hosts=("a.example", "b.example"), hedge_delay=0.2)
+    assert len(run(asearch.search_engine(scraper, "python", use_cache=False))) == 1
+    assert len(calls.calls) == 1
+
+
+def test_failed_endpoint_falls_back_without_waiting(transport):
+    transport({"a.example": (0.0, 503), "b.example": (0.0, 200)})
+    scraper = engine(hosts=("a.example", "b.example"), hedge_delay=5)
+    start = time.monotonic()
+    assert len(run(asearch.search_engine(scraper, "python", use_cache=False))) == 1
+    assert time.monotonic() - start < 1
+
+
+def test_total_budget_returns_no_results(transport):
+    transport({"a.example": (0.3, 200)})
+    scraper = engine(timeout=0.05)
+    assert run(asearch.search_engine(scraper, "python", use_cache=False)) == []
+
+
+def test_deadline_drops_late_engines(transport):
+    transport({"a.example": (0.0, 200), "slow.example": (0.3, 200)})
+    scrapers = {"A": engine("A"), "Lent": engine("Lent", hosts=("slow.example",))}
+
+    async def collect():
+        return [name async for name, _ in asearch.iter_results("python", scrapers, deadline=0.1, use_cache=False)]
+    assert run(collect()) == ["A"]
+
+
+def test_results_go_through_the_cache(transport, tmp_path, monkeypatch):
+    calls = transport({"a.example": (0.0, 200)})
+    cache = ResultCache(str(tmp_path / "results.sqlite3"))
+    monkeypatch.setattr(asearch, "get_result_cache", lambda: cache)
+    scraper = engine()
+    first = run(asearch.search_engine(scraper, "python"))
+    assert run(asearch.search_engine(scraper, " Python ")) == first
+    assert len(calls.calls) == 1
+
+
+def test_parsing_and_cache_run_off_the_event_loop(transport, tmp_path, monkeypatch):
+    transport({"a.example": (0.0, 200)})
+    threads = []
+
+    class Cache(ResultCache):
+        def get(self, *args):
+            threads.append(("get", threading.get_ident()))
+            return super().get(*args)
+
+        def put(self, *args):
+            threads.append(("put", threading.get_ident()))
+            return super().put(*args)
+
+    def parse_markup(markup, request=None):
+        threads.append(("parse", threading.get_ident()))
+        return EngineScraper.parse_markup(scraper, markup, request)
+
+    monkeypatch.setattr(asearch, "get_result_cache", lambda: Cache(str(tmp_path / "results.sqlite3")))
+    scraper = engine()
+    scraper.parse_markup = parse_markup
+
+    async def search():
+        results = await asearch.search_engine(scraper, "python")
+        return results, threading.get_ident()
+    results, loop_thread = run(search())
+    assert len(results) == 1
+    assert [name for name, _ in threads] == ["get", "parse", "put"]
+    assert all(thread != loop_thread for _, thread in threads)
+
+
+def test_async_worker_runs_without_thread_through_scheduler(transport):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    transport({"a.example": (0.0, 200)})
+    scheduler = RequestScheduler()
+    scheduler.add_lane("search", supersede=True)
+    worker = AsyncSearchWorker("python", {"A": engine("A")}, use_cache=False)
+    received, per_engine = [], []
+    worker.engine_finished.connect(lambda name, results: per_engine.append(name))
+    worker.finished.connect(received.append)
+    scheduler.submit("search", worker)
+    end = time.monotonic() + 5
+    while scheduler.pending("search") and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.005)
+    assert scheduler.pending("search") == 0
+    assert per_engine == ["A"]
+    assert [r["link"] for r in received[0]["A"]] == ["https://python.org"]
+
+
+def test_waits_for_request_in_flight_in_the_threaded_backend(transport, tmp_path, monkeypatch):
+    calls = transport({"a.example": (0.0, 200)})
+    cache = ResultCache(str(tmp_path / "results.sqlite3"))
+    monkeypatch.setattr(asearch, "get_result_cache", lambda: cache)
+    started, release = threading.Event(), threading.Event()
+
+    def prefetch(query):
+        started.set()
+        release.wait(5)
+        return [{"title": "Python", "link": "https://python.org", "snippet": "Langage"}]
+    prefetcher = threading.Thread(target=cached_scraper("Mojeek", prefetch, cache), args=("python",))
+    prefetcher.start()
+    started.wait(5)
+    threading.Timer(0.05, release.set).start()
+    results = run(asearch.search_engine(engine(), "python"))
+    prefetcher.join(5)
+    assert [r["link"] for r in results] == ["https://python.org"]
+    assert calls.calls == []
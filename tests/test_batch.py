@@ -0,0 +1,113 @@
+import io
+import json
+import threading
+import time
+import pytest
+import batch
+
+
+def fake_registry(delay=0.0):
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def engine(name):
+        def scrape(query):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(delay)
+            with lock:
+                active[0] -= 1
+            if query == "vide":
+                return []
+            return [{"title": f"{name} {query} {i}", "link": f"https://{name.lower()}.test/{i}", "snippet": ""}
+                    for i in range(2)]
+        return scrape
+    return {"DuckDuckGo": engine("DuckDuckGo"), "Yahoo": engine("Yahoo")}, peak
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry, peak = fake_registry(delay=0.01)
+    monkeypatch.setattr(batch, "get_registry", lambda: registry)
+    monkeypatch.setattr(batch, "enabled_engines", lambda: ["DuckDuckGo"])
+    return peak
+
+
+def test_read_queries_skips_comments_and_accepts_json_lines():
+    stream = io.StringIO('python\n\n# commentaire\n  rust  \n{"query": "go"}\n{"query": ""}\n{invalide\n')
+    assert list(batch.read_queries(stream)) == ["python", "rust", "go", "{invalide"]
+
+
+def test_run_batch_writes_one_record_per_result(registry):
+    out = io.StringIO()
+    stats = batch.run_batch(iter(["python", "vide"]), ["DuckDuckGo", "Yahoo"], out, concurrency=2, rate=0)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(records) == 4
+    assert {(r["engine"], r["rank"]) for r in records} == {
+        ("DuckDuckGo", 1), ("DuckDuckGo", 2), ("Yahoo", 1), ("Yahoo", 2)}
+    assert all(r["query"] == "python" and r["latency"] >= 0 for r in records)
+    assert set(records[0]) == {"query", "engine", "rank", "title", "link", "snippet", "latency"}
+    assert (stats["queries"], stats["calls"], stats["results"], stats["empty"]) == (2, 4, 4, 2)
+
+
+def test_run_batch_bounds_concurrency(registry):
+    stats = batch.run_batch((f"q{i}" for i in range(20)), ["DuckDuckGo"], io.StringIO(), concurrency=2, rate=0)
+    assert registry[0] <= 2
+    assert stats["calls"] == 20
+
+
+def test_pending_calls_stay_within_window(monkeypatch):
+    release, calls, consumed = threading.Event(), [], []
+
+    def scrape(query):
+        calls.append(query)
+        release.wait(5)
+        return []
+    monkeypatch.setattr(batch, "get_registry", lambda: {"DuckDuckGo": scrape})
+
+    def queries():
+        for i in range(50):
+            consumed.append(i)
+            yield f"q{i}"
+    runner = threading.Thread(target=batch.run_batch, args=(queries(), ["DuckDuckGo"], io.StringIO(), 2, 0))
+    runner.start()
+    time.sleep(0.1)
+    # Fenêtre de concurrency * 2 appels en attente, plus la requête lue qui attend une place
+    assert len(consumed) <= 2 * 2 + 1
+    release.set()
+    runner.join(5)
+    assert len(consumed) == 50 and len(calls) == 50
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = batch.RateLimiter(rate=50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # Un jeton disponible au départ, puis un toutes les 20 ms
+    assert time.monotonic() - start >= 0.09
+
+
+def test_rate_limiter_zero_is_unlimited():
+    limiter = batch.RateLimiter(rate=0)
+    start = time.monotonic()
+    for _ in range(1000):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.5
+
+
+def test_main_reads_file_and_prints_summary(registry, tmp_path, capsys):
+    queries = tmp_path / "queries.txt"
+    queries.write_text("python\nrust\n", encoding="utf-8")
+    assert batch.main([str(queries), "--rate", "0"]) == 0
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+    assert [(r["query"], r["engine"]) for r in records].count(("rust", "DuckDuckGo")) == 2
+    assert json.loads(captured.err)["calls"] == 2
+
+
+def test_main_rejects_unknown_engine(registry, capsys):
+    with pytest.raises(SystemExit) as exc:
+        batch.main(["-", "--engines", "Inconnu"])
+    assert exc.value.code == 2
+    assert "moteurs inconnus: Inconnu" in capsys.readouterr().err
@@ -0,0 +1,252 @@
+import sqlite3
+import threading
+import time
+import pytest
+from services import cache as cache_module
+from services.cache import ResultCache, cached_scraper
+
+
+RESULTS = [{"title": "Python", "link": "https://python.org", "snippet": "Langage"}]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def make_cache(tmp_path, **kwargs):
+    kwargs.setdefault("ttls", {"DuckDuckGo": 100})
+    return ResultCache(str(tmp_path / "results.sqlite3"), **kwargs)
+
+
+def disk_rows(cache):
+    return cache._db.execute("SELECT engine, query FROM results ORDER BY engine, query").fetchall()
+
+
+def test_roundtrip_normalizes_query(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put("DuckDuckGo", "  Python   Asyncio ", RESULTS)
+    assert cache.get("DuckDuckGo", "python asyncio") == RESULTS
+    assert cache.get("Yahoo", "python asyncio") is None
+    assert cache.stats["memory_hits"] == 1 and cache.stats["misses"] == 1
+
+
+def test_empty_results_are_not_stored(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put("DuckDuckGo", "rien", [])
+    assert cache.get("DuckDuckGo", "rien") is None
+    assert disk_rows(cache) == []
+
+
+def test_memory_lru_evicts_oldest_then_serves_from_disk(tmp_path, clock):
+    cache = make_cache(tmp_path, memory_size=2)
+    for query in ("a", "b"):
+        cache.put("DuckDuckGo", query, RESULTS)
+    cache.get("DuckDuckGo", "a")  # "a" devient le plus récent
+    cache.put("DuckDuckGo", "c", RESULTS)
+    assert cache.stats["evictions"] == 1
+    assert set(key[1] for key in cache._memory) == {"a", "c"}
+    assert cache.get("DuckDuckGo", "b") == RESULTS
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_disk_survives_reopening(tmp_path, clock):
+    make_cache(tmp_path).put("DuckDuckGo", "q", RESULTS)
+    reopened = make_cache(tmp_path)
+    assert reopened.get("DuckDuckGo", "q") == RESULTS
+    assert reopened.stats["disk_hits"] == 1
+
+
+def test_entries_expire_with_engine_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put("DuckDuckGo", "q", RESULTS)
+    clock[0] += 60
+    assert cache.get("DuckDuckGo", "q") == RESULTS
+    clock[0] += 50
+    assert cache.get("DuckDuckGo", "q") is None
+
+
+def test_later_pages_use_the_engine_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, default_ttl=1000)
+    cache.put("DuckDuckGo#p2", "q", RESULTS)
+    clock[0] += 110
+    assert cache.get("DuckDuckGo#p2", "q") is None
+
+
+def test_disk_size_evicts_oldest_rows(tmp_path, clock):
+    cache = make_cache(tmp_path, disk_size=3)
+    for index in range(6):
+        clock[0] += 1
+        cache.put("DuckDuckGo", f"q{index}", RESULTS)
+    assert [query for _, query in disk_rows(cache)] == ["q3", "q4", "q5"]
+
+
+def test_replacing_an_entry_does_not_evict(tmp_path, clock):
+    cache = make_cache(tmp_path, disk_size=3)
+    for index in range(3):
+        cache.put("DuckDuckGo", f"q{index}", RESULTS)
+    for _ in range(5):
+        clock[0] += 1
+        cache.put("DuckDuckGo", "q0", RESULTS)
+    assert len(disk_rows(cache)) == 3
+
+
+def test_purge_expired_removes_stale_rows(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put("DuckDuckGo", "ancien", RESULTS)
+    clock[0] += 70
+    cache.put("DuckDuckGo", "recent", RESULTS)
+    clock[0] += 50
+    cache.purge_expired()
+    assert disk_rows(cache) == [("DuckDuckGo", "recent")]
+
+
+def test_expired_rows_are_purged_on_open(tmp_path, clock):
+    cache = make_cache(tmp_path, default_ttl=200)
+    for engine in ("DuckDuckGo", "DuckDuckGo#p1", "Mojeek", "Duck_Go"):
+        cache.put(engine, "ancien", RESULTS)
+    clock[0] += 150
+    cache.put("DuckDuckGo#p1", "recent", RESULTS)
+    # TTL du moteur pour ses pages suivantes, default_ttl pour les moteurs sans TTL
+    reopened = make_cache(tmp_path, default_ttl=200)
+    assert disk_rows(reopened) == [("DuckDuckGo#p1", "recent"), ("Duck_Go", "ancien"), ("Mojeek", "ancien")]
+    assert reopened._rows == 3
+
+
+def test_row_count_is_rechecked_only_past_disk_size(tmp_path, clock):
+    cache = make_cache(tmp_path, disk_size=2)
+    cache.put("DuckDuckGo", "q1", RESULTS)
+    cache.put("DuckDuckGo", "q1", RESULTS)
+    # Le majorant dépasse disk_size, mais le vrai compte (1 ligne) n'évince rien
+    cache.put("DuckDuckGo", "q2", RESULTS)
+    assert len(disk_rows(cache)) == 2
+    assert cache._rows == 2
+    cache.put("DuckDuckGo", "q3", RESULTS)
+    assert [query for _, query in disk_rows(cache)] == ["q2", "q3"]
+
+
+def test_without_disk_cache_stays_in_memory(tmp_path, clock, monkeypatch):
+    def fail(*args, **kwargs):
+        raise sqlite3.OperationalError("disque indisponible")
+    monkeypatch.setattr(cache_module.sqlite3, "connect", fail)
+    cache = make_cache(tmp_path)
+    cache.put("DuckDuckGo", "q", RESULTS)
+    assert cache.get("DuckDuckGo", "q") == RESULTS
+
+
+def test_cached_scraper_calls_network_once(tmp_path, clock):
+    calls = []
+
+    def scraper(query):
+        calls.append(query)
+        return RESULTS
+    cached = cached_scraper("DuckDuckGo", scraper, make_cache(tmp_path))
+    assert cached("Python") == RESULTS
+    assert cached(" python ") == RESULTS
+    assert calls == ["Python"]
+
+
+def test_cached_scraper_retries_empty_results(tmp_path, clock):
+    calls = []
+
+    def scraper(query):
+        calls.append(query)
+        return []
+    cached = cached_scraper("DuckDuckGo", scraper, make_cache(tmp_path))
+    cached("q")
+    cached("q")
+    assert len(calls) == 2
+
+
+def run_concurrently(cached, queries):
+    results = [None] * len(queries)
+
+    def call(index):
+        results[index] = cached(queries[index])
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(len(queries))]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_cached_scraper_shares_in_flight_request(tmp_path, clock):
+    calls, release = [], threading.Event()
+
+    def scraper(query):
+        calls.append(query)
+        release.wait(5)
+        return RESULTS
+    cached = cached_scraper("DuckDuckGo", scraper, make_cache(tmp_path))
+    threads, results = run_concurrently(cached, ["Python", " python", "PYTHON"])
+    while not calls:
+        time.sleep(0.005)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert results == [RESULTS] * 3
+    assert not cache_module._inflight
+
+
+def test_cached_scraper_waiter_retries_after_failed_owner(tmp_path, clock):
+    calls, release = [], threading.Event()
+
+    def scraper(query):
+        calls.append(query)
+        if len(calls) == 1:
+            release.wait(5)
+            return []
+        return RESULTS
+    cached = cached_scraper("DuckDuckGo", scraper, make_cache(tmp_path))
+    threads, results = run_concurrently(cached, ["q"])
+    while not calls:
+        time.sleep(0.005)
+    waiter, waiter_results = run_concurrently(cached, ["q"])
+    time.sleep(0.05)
+    release.set()
+    for thread in threads + waiter:
+        thread.join(5)
+    assert results == [[]]
+    assert waiter_results == [RESULTS]
+    assert len(calls) == 2
+
+
+def test_cached_results_are_copies(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    stored = [dict(RESULTS[0])]
+    cache.put("DuckDuckGo", "q", stored)
+    stored.append({"title": "ajout"})
+    served = cache.get("DuckDuckGo", "q")
+    served[0]["title"] = "modifié"
+    served.clear()
+    assert cache.get("DuckDuckGo", "q") == RESULTS
+    reopened = make_cache(tmp_path)
+    reopened.get("DuckDuckGo", "q")[0]["title"] = "modifié"
+    assert reopened.get("DuckDuckGo", "q") == RESULTS
+
+
+def test_cached_scraper_waiter_gives_up_after_scraper_timeout(tmp_path, clock):
+    calls, release = [], threading.Event()
+
+    class Scraper:
+        timeout = 0.05
+
+        def __call__(self, query):
+            calls.append(query)
+            if len(calls) == 1:
+                release.wait(5)
+            return RESULTS
+    cached = cached_scraper("DuckDuckGo", Scraper(), make_cache(tmp_path))
+    threads, results = run_concurrently(cached, ["q"])
+    while not calls:
+        time.sleep(0.005)
+    start = time.monotonic()
+    assert cached("q") == RESULTS
+    assert time.monotonic() - start < 1
+    assert len(calls) == 2
+    release.set()
+    for thread in threads:
+        thread.join(5)
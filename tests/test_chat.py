@@ -0,0 +1,101 @@
+import json
+import os
+import pytest
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication
+from ui.chat import ChatHistoryModel, HtmlRole, KeyRole, RoleRole, message_html
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def history(app, tmp_path):
+    model = ChatHistoryModel(max_messages=3, spill_path=str(tmp_path / "chat" / "session.jsonl"))
+    yield model
+    model.close()
+
+
+def texts(model):
+    return [model.index(row).data(Qt.DisplayRole) for row in range(model.rowCount())]
+
+
+def test_roles(history):
+    history.append("Vous", "a < b", html=False)
+    history.append("Modèle", "<i>réponse</i>")
+    first, second = history.index(0), history.index(1)
+    assert first.data(RoleRole) == "Vous"
+    assert first.data(Qt.DisplayRole) == "a < b"
+    assert second.data(Qt.DisplayRole) == "réponse"
+    assert first.data(HtmlRole) == "<b>Vous:</b> a &lt; b"
+    assert first.data(KeyRole) != second.data(KeyRole)
+
+
+def test_plain_text_is_escaped_with_line_breaks():
+    message = {"role": "<script>", "text": "a & b\nc", "html": False}
+    assert message_html(message) == "<b>&lt;script&gt;:</b> a &amp; b<br>c"
+
+
+def test_replace_last_bumps_render_key(history):
+    history.append("Modèle", "...", html=False)
+    changed = []
+    history.dataChanged.connect(lambda first, last: changed.append(first.row()))
+    key = history.index(0).data(KeyRole)
+    history.replace_last("<b>fin</b>")
+    assert changed == [0]
+    assert history.index(0).data(KeyRole) != key
+    assert history.index(0).data(Qt.DisplayRole) == "fin"
+
+
+def test_oldest_messages_spill_to_disk(history):
+    for i in range(5):
+        history.append("Vous", f"m{i}", html=False)
+    assert texts(history) == ["m2", "m3", "m4"]
+    assert history.archived == 2
+    with open(history.spill_path, encoding="utf-8") as file:
+        assert [json.loads(line)["text"] for line in file] == ["m0", "m1"]
+
+
+def test_load_older_restores_archived_messages_in_order(history):
+    for i in range(6):
+        history.append("Vous", f"m{i}", html=False)
+    inserted = []
+    history.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    assert history.load_older(2) == 2
+    assert inserted == [(0, 1)]
+    assert texts(history) == ["m1", "m2", "m3", "m4", "m5"]
+    assert history.archived == 1
+    assert history.load_older() == 1
+    assert history.load_older() == 0
+    assert texts(history)[0] == "m0"
+
+
+def test_close_removes_session_file(history):
+    for i in range(4):
+        history.append("Vous", f"m{i}", html=False)
+    assert os.path.exists(history.spill_path)
+    history.close()
+    assert not os.path.exists(history.spill_path)
+
+
+def test_reloaded_messages_are_kept_while_history_is_held(history):
+    for i in range(6):
+        history.append("Vous", f"m{i}", html=False)
+    history.hold_history(True)
+    history.load_older(2)
+    history.append("Vous", "m6", html=False)
+    # La fenêtre dépasse max_messages tant que l'utilisateur lit l'historique
+    assert texts(history) == ["m1", "m2", "m3", "m4", "m5", "m6"]
+    removed = []
+    history.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+    history.hold_history(False)
+    assert removed == [(0, 2)]
+    assert texts(history) == ["m4", "m5", "m6"]
+    assert history.archived == 4
+    # Les messages rechargés ne sont pas réécrits dans l'archive
+    with open(history.spill_path, encoding="utf-8") as file:
+        assert [json.loads(line)["text"] for line in file] == ["m0", "m1", "m2", "m3"]
+    history.load_older(4)
+    assert texts(history)[:4] == ["m0", "m1", "m2", "m3"]
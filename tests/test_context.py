@@ -0,0 +1,89 @@
+from services.context import SearchContext, build_context, estimate_tokens
+from services.search import NO_SNIPPET
+
+
+def result(link, title, snippet="Un extrait."):
+    return {"title": title, "link": link, "snippet": snippet}
+
+
+def test_sources_are_numbered_in_rank_order():
+    context = build_context([result("https://a.com", "A"), result("https://b.com", "B")])
+    assert [source["title"] for source in context.sources] == ["A", "B"]
+    assert "[1] A\nhttps://a.com\nUn extrait.\n" in context.text
+    assert "[2] B\n" in context.text
+    assert context.tokens == estimate_tokens(context.text)
+
+
+def test_budget_is_respected():
+    results = [result(f"https://site{i}.com", f"Titre {i}", "mot " * 60) for i in range(20)]
+    context = build_context(results, budget=200)
+    assert context.tokens <= 200
+    assert 0 < len(context.sources) < 20
+    assert context.dropped == 20 - len(context.sources)
+
+
+def test_smaller_entry_fits_after_a_dropped_one():
+    results = [
+        result("https://a.com", "A", "court"),
+        result("https://b.com", "B", "long " * 50),
+        result("https://c.com", "C", "court"),
+    ]
+    context = build_context(results, budget=40)
+    assert [source["title"] for source in context.sources] == ["A", "C"]
+    assert context.dropped == 1
+
+
+def test_duplicates_by_url_and_title_are_skipped():
+    context = build_context([
+        result("https://www.a.com/page/", "A"),
+        result("http://a.com/page", "Autre titre"),
+        result("https://b.com", "  a "),
+        result("https://c.com", "C"),
+    ])
+    assert [source["link"] for source in context.sources] == ["https://www.a.com/page/", "https://c.com"]
+    assert context.dropped == 0
+
+
+def test_results_without_title_are_skipped():
+    context = build_context([result("https://a.com", ""), result("https://b.com", "B")])
+    assert [source["title"] for source in context.sources] == ["B"]
+
+
+def test_placeholder_and_empty_snippets_keep_only_title():
+    context = build_context([result("https://a.com", "A", NO_SNIPPET), result("https://b.com", "B", "")])
+    assert NO_SNIPPET not in context.text
+    assert context.text.endswith("[1] A\nhttps://a.com\n[2] B\nhttps://b.com\n")
+    assert [source["snippet"] for source in context.sources] == ["", ""]
+
+
+def test_long_snippet_is_truncated_on_a_word():
+    context = build_context([result("https://a.com", "A", "abcdef " * 100)], max_snippet=30)
+    snippet = context.sources[0]["snippet"]
+    assert snippet.endswith("…")
+    assert len(snippet) <= 31
+    assert snippet[:-1].split() == ["abcdef"] * 4
+
+
+def test_engine_results_are_fused():
+    context = build_context({
+        "DuckDuckGo": [result("https://a.com", "A"), result("https://b.com", "B")],
+        "Yahoo": [result("https://b.com/", "B bis")],
+    })
+    assert context.sources[0]["link"] == "https://b.com/"
+    assert len(context.sources) == 2
+
+
+def test_empty_context_leaves_question_unchanged():
+    for results in (None, [], {}, [result("https://a.com", "")]):
+        context = build_context(results)
+        assert not context
+        assert context.text == "" and context.tokens == 0
+        assert context.prompt("Qu'est-ce que Python ?") == "Qu'est-ce que Python ?"
+
+
+def test_prompt_places_sources_before_question():
+    context = build_context([result("https://a.com", "A")])
+    assert isinstance(context, SearchContext) and context
+    prompt = context.prompt("Qu'est-ce que A ?")
+    assert prompt.startswith(context.text)
+    assert prompt.endswith("Question : Qu'est-ce que A ?")
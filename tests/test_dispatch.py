@@ -0,0 +1,58 @@
+import threading
+import time
+from services.dispatch import SearchWorker
+
+
+def run_worker(scrapers, deadline=5.0):
+    worker = SearchWorker("python", scrapers, deadline=deadline)
+    arrivals = []
+    finished = []
+    worker.engine_finished.connect(lambda name, results: arrivals.append(name))
+    worker.finished.connect(finished.append)
+    worker.run()
+    assert len(finished) == 1
+    return worker, arrivals, finished[0]
+
+
+def sleeper(delay, results):
+    def scrape(query):
+        time.sleep(delay)
+        return results
+    return scrape
+
+
+def test_engines_run_concurrently():
+    scrapers = {name: sleeper(0.3, [{"title": name}]) for name in ("A", "B", "C")}
+    worker, arrivals, results = run_worker(scrapers)
+    assert sorted(arrivals) == ["A", "B", "C"]
+    assert results == {name: [{"title": name}] for name in scrapers}
+    assert worker.elapsed < 0.8
+
+
+def test_results_are_emitted_in_arrival_order():
+    scrapers = {"lent": sleeper(0.3, [1]), "rapide": sleeper(0.0, [2])}
+    _, arrivals, _ = run_worker(scrapers)
+    assert arrivals == ["rapide", "lent"]
+
+
+def test_failing_engine_yields_empty_list():
+    def broken(query):
+        raise RuntimeError("hors service")
+    _, arrivals, results = run_worker({"cassé": broken, "ok": sleeper(0.0, [1])})
+    assert results == {"cassé": [], "ok": [1]}
+    assert sorted(arrivals) == ["cassé", "ok"]
+
+
+def test_deadline_drops_late_engines():
+    release = threading.Event()
+
+    def stuck(query):
+        release.wait(5)
+        return [1]
+    try:
+        worker, arrivals, results = run_worker({"bloqué": stuck, "ok": sleeper(0.0, [2])}, deadline=0.2)
+    finally:
+        release.set()
+    assert arrivals == ["ok"]
+    assert results == {"bloqué": [], "ok": [2]}
+    assert worker.elapsed < 1.0
@@ -0,0 +1,159 @@
+import pytest
+from services import search
+from services.engines import EngineScraper, fuse_results, load_scrapers, normalize_url
+
+
+MOJEEK = """
+<ul class="results-standard">
+  <li><h2><a class="title" href="https://python.org">Python</a></h2><p class="s">Langage</p></li>
+  <li><h2><a href="https://docs.python.org">Docs</a></h2></li>
+  <li><h2><a class="title" href="https://python.org">Python (doublon)</a></h2></li>
+  <li><span>Sans lien</span></li>
+</ul>
+"""
+
+
+def result(link: str, title: str = None) -> dict:
+    return {"title": title or link, "link": link, "snippet": ""}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def selectors_engine(**config):
+    return EngineScraper(dict({
+        "name": "Mojeek",
+        "endpoints": ["https://a.example/search?q={query}", "https://b.example/search?q={query}"],
+        "selectors": {"item": "ul.results-standard > li", "link": ["a.title", "h2 a"], "snippet": "p.s"},
+    }, **config))
+
+
+def test_shipped_configuration_loads():
+    scrapers = load_scrapers()
+    assert scrapers["DuckDuckGo"].parse is search.parse_duckduckgo
+    assert scrapers["Yahoo"].parse is search.parse_yahoo
+    assert all(scraper.endpoints for scraper in scrapers.values())
+
+
+def test_shipped_engines_return_ten_results_per_page():
+    for scraper in load_scrapers().values():
+        assert scraper.limit == 10
+        if scraper.paginated:
+            assert int(scraper.pagination["step"]) == scraper.limit
+
+
+@pytest.mark.parametrize("config", [
+    {"name": "X", "endpoints": [], "parser": "inconnu"},
+    {"name": "X", "endpoints": [], "selectors": {"item": "li"}},
+])
+def test_invalid_configuration_is_rejected(config):
+    with pytest.raises(ValueError):
+        EngineScraper(config)
+
+
+def test_selectors_parser():
+    assert selectors_engine().parse(MOJEEK) == [
+        {"title": "Python", "link": "https://python.org", "snippet": "Langage"},
+        {"title": "Docs", "link": "https://docs.python.org", "snippet": ""},
+    ]
+
+
+def test_endpoints_are_tried_in_order_with_encoded_query(monkeypatch):
+    urls = []
+
+    def http_get(url, timeout):
+        urls.append(url)
+        if url.startswith("https://a.example"):
+            raise ConnectionError("indisponible")
+        return FakeResponse(MOJEEK)
+    monkeypatch.setattr(search, "_http_get", http_get)
+    results = selectors_engine()("c++ & #rust")
+    assert urls == [
+        "https://a.example/search?q=c%2B%2B+%26+%23rust",
+        "https://b.example/search?q=c%2B%2B+%26+%23rust",
+    ]
+    assert [entry["title"] for entry in results] == ["Python", "Docs"]
+
+
+def test_unreachable_engine_returns_empty_list(monkeypatch):
+    def http_get(url, timeout):
+        raise ConnectionError("indisponible")
+    monkeypatch.setattr(search, "_http_get", http_get)
+    assert selectors_engine()("python") == []
+
+
+def test_pages_add_the_configured_offset(monkeypatch):
+    urls = []
+
+    def http_get(url, timeout):
+        urls.append(url)
+        return FakeResponse(MOJEEK)
+    monkeypatch.setattr(search, "_http_get", http_get)
+    engine = selectors_engine(endpoints=["https://b.example/search?q={query}"],
+                              pagination={"param": "s", "start": 1, "step": 10}, limit=1)
+    assert engine.paginated
+    assert len(engine.fetch_page("python", 2)) == 1
+    assert urls == ["https://b.example/search?q=python&s=21"]
+    assert engine.build_url("https://b.example/{query}", "python", 1) == "https://b.example/python?s=11"
+    assert engine.build_url("https://b.example/{query}", "python", 0) == "https://b.example/python"
+
+
+def test_engine_without_pagination_has_a_single_page(monkeypatch):
+    monkeypatch.setattr(search, "_http_get", lambda url, timeout: FakeResponse(MOJEEK))
+    engine = selectors_engine()
+    assert not engine.paginated
+    assert len(engine.fetch_page("python", 0)) == 2
+    assert engine.fetch_page("python", 1) == []
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.example.com/page/",
+    "http://example.com/page",
+    "https://EXAMPLE.com/page#section",
+    "https://example.com/page?utm_source=x&utm_medium=y",
+    "https://example.com/page?fbclid=abc",
+])
+def test_normalize_url_equivalent_forms(url):
+    assert normalize_url(url) == normalize_url("https://example.com/page")
+
+
+def test_normalize_url_sorts_and_keeps_real_parameters():
+    assert normalize_url("https://example.com/s?b=2&a=1") == normalize_url("https://example.com/s?a=1&b=2&gclid=z")
+    assert normalize_url("https://example.com/s?a=1") != normalize_url("https://example.com/s?a=2")
+    assert normalize_url("https://example.com/a") != normalize_url("https://example.com/b")
+
+
+def test_rrf_scores_and_order():
+    fused = fuse_results({
+        "A": [result("https://a.com"), result("https://shared.com")],
+        "B": [result("https://shared.com"), result("https://b.com")],
+    })
+    assert [entry["link"] for entry in fused][0] == "https://shared.com"
+    shared = fused[0]
+    assert shared["score"] == pytest.approx(1 / 62 + 1 / 61)
+    assert shared["engines"] == ["A", "B"]
+    assert {entry["link"] for entry in fused} == {"https://a.com", "https://shared.com", "https://b.com"}
+    assert all("_best" not in entry for entry in fused)
+
+
+def test_duplicates_keep_best_ranked_title():
+    fused = fuse_results({
+        "A": [result("https://x.com"), result("https://www.shared.com/", "Titre A")],
+        "B": [result("http://shared.com", "Titre B")],
+    })
+    shared = next(entry for entry in fused if normalize_url(entry["link"]) == normalize_url("https://shared.com"))
+    assert shared["title"] == "Titre B"
+    assert len(fused) == 2
+
+
+def test_weights_and_limit():
+    results = {"A": [result("https://a.com")], "B": [result("https://b.com")]}
+    fused = fuse_results(results, weights={"A": 0.5, "B": 2.0}, limit=1)
+    assert [entry["link"] for entry in fused] == ["https://b.com"]
+
+
+def test_empty_and_missing_engines():
+    assert fuse_results({}) == []
+    assert fuse_results({"A": [], "B": None}) == []
@@ -0,0 +1,88 @@
+import os
+import random
+import pytest
+from services.formatter import StreamFormatter, format_model_text
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "fixtures")
+
+
+def fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def stream(text: str, cuts: list) -> str:
+    formatter = StreamFormatter()
+    out = []
+    start = 0
+    for cut in cuts + [len(text)]:
+        out.append(formatter.feed(text[start:cut]))
+        start = cut
+    out.append(formatter.finish())
+    assert formatter.pending == ""
+    assert formatter.html == "".join(out)
+    assert formatter.text_length == len(text)
+    return "".join(out)
+
+
+@pytest.mark.parametrize("text, html", [
+    ("🔍 **Résultats de recherche :**\n**1.** Titre", "<h3>🔍 Résultats de recherche</h3><br><b>1. </b> Titre"),
+    ("texte **1. Item** suite", "texte <br><b>1. Item</b> suite"),
+    ("**1. seul", "<b>1. </b>seul"),
+    ("## Titre", "<h3>Titre</h3>"),
+    ("**gras** et `code`", "<b>gras</b> et <code>code</code>"),
+    ("[doc](//x.com/a)", '<a href="https://x.com/a">doc</a>'),
+    ('<a href="//x.com">x</a>', '<a href="https://x.com">x</a>'),
+    ("voir (//x.com)", "voir (https://x.com)"),
+    ("a\nb", "a<br>b"),
+    ("", ""),
+])
+def test_format_model_text(text, html):
+    assert format_model_text(text) == html
+
+
+@pytest.mark.parametrize("size", ["small", "large"])
+def test_stream_matches_one_shot_on_random_chunkings(size):
+    text = fixture(f"model_answer_{size}.txt")
+    expected = format_model_text(text)
+    rng = random.Random(size)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(text)), rng.randint(1, min(60, len(text) - 1))))
+        assert stream(text, cuts) == expected
+
+
+def test_stream_char_by_char():
+    text = fixture("model_answer_small.txt")
+    assert stream(text, list(range(1, len(text)))) == format_model_text(text)
+
+
+def test_feed_holds_incomplete_line():
+    formatter = StreamFormatter()
+    assert formatter.feed("**gra") == ""
+    assert formatter.pending == "**gra"
+    assert formatter.feed("s** fin\nsuite") == "<b>gras</b> fin<br>"
+    assert formatter.pending == "suite"
+    assert formatter.finish() == "suite"
+
+
+def test_preview_formats_pending_line_like_the_final_text():
+    text = fixture("model_answer_small.txt")
+    formatter = StreamFormatter()
+    rng = random.Random(0)
+    start = 0
+    while start < len(text):
+        cut = min(len(text), start + rng.randint(1, 24))
+        formatter.feed(text[start:cut])
+        start = cut
+        assert formatter.preview() == format_model_text(text[:cut])
+    formatter.finish()
+    assert formatter.html == format_model_text(text)
+
+
+def test_preview_keeps_markup_when_line_completes():
+    formatter = StreamFormatter()
+    formatter.feed("voir **gras**")
+    assert formatter.preview() == "voir <b>gras</b>"
+    formatter.feed(" fin\n")
+    assert formatter.preview() == "voir <b>gras</b> fin<br>"
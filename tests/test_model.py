@@ -0,0 +1,268 @@
+import itertools
+import threading
+import time
+import pytest
+from services import model
+from services.model import ClientManager, ModelWorker, get_client_manager
+
+
+class FakeJob:
+    """Job `client.submit` simulé: sorties intermédiaires (une exception est levée au passage), puis résultat."""
+
+    def __init__(self, outputs, result=None):
+        self.outputs = outputs
+        self._result = result if result is not None else (outputs[-1] if outputs else "")
+        self.cancelled = False
+
+    def __iter__(self):
+        for output in self.outputs:
+            if isinstance(output, Exception):
+                raise output
+            yield output
+
+    def result(self):
+        return self._result
+
+    def cancel(self):
+        self.cancelled = True
+        return True
+
+
+class FakeClient:
+    """
+    Client Gradio simulé: `answers` est consommé à chaque appel. Pour `predict`, une
+    réponse ou une exception; pour `submit`, une liste de sorties cumulées ou un FakeJob.
+    """
+    created = []
+
+    def __init__(self, space_name, answers=None):
+        self.space_name = space_name
+        self.answers = list(answers or [])
+        self.calls = []
+        FakeClient.created.append(self)
+
+    def predict(self, **kwargs):
+        self.calls.append(kwargs)
+        answer = self.answers.pop(0) if self.answers else f"réponse à {kwargs['question']}"
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    def submit(self, **kwargs):
+        self.calls.append(kwargs)
+        answer = self.answers.pop(0) if self.answers else [f"réponse à {kwargs['question']}"]
+        if isinstance(answer, Exception):
+            raise answer
+        self.job = answer if isinstance(answer, FakeJob) else FakeJob(answer)
+        return self.job
+
+
+_spaces = itertools.count()
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """Remplace la création des clients; retourne la liste des réponses du prochain client."""
+    FakeClient.created = []
+    plans = []
+
+    def factory(space_name):
+        time.sleep(0.01)  # connexion lente: les appels concurrents doivent l'attendre
+        return FakeClient(space_name, plans.pop(0) if plans else None)
+    monkeypatch.setattr("services.clients._client_factory", factory)
+    return plans
+
+
+@pytest.fixture
+def space():
+    # Espace distinct par test: les gestionnaires sont partagés par le processus
+    return f"test/space-{next(_spaces)}"
+
+
+def test_client_is_connected_once_for_concurrent_callers(clients, space):
+    manager = ClientManager(space)
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(manager.get())) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(FakeClient.created) == 1
+    assert all(client is got[0] for client in got)
+    assert manager.stats["connects"] == 1
+
+
+def test_warm_up_connects_in_background(clients, space):
+    manager = ClientManager(space)
+    manager.warm_up()
+    for _ in range(100):
+        if manager.connected:
+            break
+        time.sleep(0.01)
+    assert manager.connected
+    manager.predict(question="q")
+    assert manager.stats["connects"] == 1
+
+
+def test_predict_reconnects_once_after_failure(clients, space):
+    clients.append([ConnectionError("coupé")])
+    manager = ClientManager(space)
+    assert manager.predict(question="q") == "réponse à q"
+    assert len(FakeClient.created) == 2
+    assert manager.stats["failures"] == 1 and manager.stats["predicts"] == 1
+
+
+def test_predict_gives_up_after_second_failure(clients, space):
+    clients.extend([[ConnectionError("coupé")], [ConnectionError("toujours coupé")]])
+    manager = ClientManager(space)
+    with pytest.raises(ConnectionError):
+        manager.predict(question="q")
+    assert not manager.connected
+
+
+def test_managers_are_shared_per_space(space):
+    assert get_client_manager(space) is get_client_manager(space)
+    assert get_client_manager(space) is not get_client_manager(space + "-autre")
+
+
+def run_worker(worker):
+    events = []
+    worker.finished.connect(lambda text: events.append(("finished", text)))
+    worker.error.connect(lambda text: events.append(("error", text)))
+    worker.progress.connect(lambda text: events.append(("progress", text)))
+    worker.run()
+    return events
+
+
+def test_workers_share_the_connected_client(clients, space):
+    for prompt in ("un", "deux"):
+        worker = ModelWorker(prompt, max_length=50, temperature=0.2)
+        worker.space_name = space
+        events = run_worker(worker)
+        assert events[-1] == ("finished", f"réponse à {prompt}")
+    (client,) = FakeClient.created
+    assert client.calls[0] == {
+        "question": "un", "use_web_search": False, "max_length": 50, "temperature": 0.2, "api_name": "/answer_question",
+    }
+
+
+def test_worker_reports_errors(clients, space):
+    clients.extend([[RuntimeError("a")], [RuntimeError("b")]])
+    worker = ModelWorker("q")
+    worker.space_name = space
+    assert run_worker(worker)[-1] == ("error", "Erreur: b")
+
+
+def stream_worker(space, prompt="q", **params):
+    worker = ModelWorker(prompt, stream=True, **params)
+    worker.space_name = space
+    chunks = []
+    worker.partial.connect(chunks.append)
+    return worker, chunks
+
+
+def test_stream_emits_new_suffixes(clients, space):
+    clients.append([["Bon", "Bonjour", "Bonjour", "Bonjour, monde"]])
+    worker, chunks = stream_worker(space)
+    events = run_worker(worker)
+    assert chunks == ["Bon", "jour", ", monde"]
+    assert events[-1] == ("finished", "Bonjour, monde")
+
+
+def test_rewritten_output_is_replaced_by_final_text(clients, space):
+    clients.append([["Bonjour", "Salut tout le monde"]])
+    worker, chunks = stream_worker(space)
+    assert run_worker(worker)[-1] == ("finished", "Salut tout le monde")
+    assert chunks == ["Bonjour"]
+
+
+def test_endpoint_without_intermediate_outputs(clients, space):
+    clients.append([FakeJob([], result="Réponse finale")])
+    worker, chunks = stream_worker(space)
+    assert run_worker(worker)[-1] == ("finished", "Réponse finale")
+    assert chunks == ["Réponse finale"]
+
+
+def test_stream_reconnects_when_failing_before_first_output(clients, space):
+    clients.extend([[ConnectionError("coupé")], [["ok"]]])
+    worker, chunks = stream_worker(space)
+    assert run_worker(worker)[-1] == ("finished", "ok")
+    assert len(FakeClient.created) == 2
+
+
+def test_stream_does_not_retry_after_first_output(clients, space):
+    clients.append([["début", ConnectionError("coupé")]])
+    worker, chunks = stream_worker(space)
+    assert run_worker(worker)[-1] == ("error", "Erreur: coupé")
+    assert chunks == ["début"]
+    assert len(FakeClient.created) == 1
+
+
+def test_repeated_question_is_served_from_cache(clients, space):
+    first = ModelWorker("Qu'est-ce que Python ?", temperature=0.0)
+    first.space_name = space
+    assert run_worker(first)[-1] == ("finished", "réponse à Qu'est-ce que Python ?")
+    again = ModelWorker("  qu'est-ce que   python ? ", temperature=0.0)
+    again.space_name = space
+    events = run_worker(again)
+    assert events[-1] == ("finished", "réponse à Qu'est-ce que Python ?")
+    assert any(kind == "progress" and text.startswith("Réponse en cache") for kind, text in events)
+    (client,) = FakeClient.created
+    assert len(client.calls) == 1
+
+
+@pytest.mark.parametrize("changed", [{"max_length": 100}, {"use_web_search": True}])
+def test_generation_parameters_are_part_of_the_key(clients, space, changed):
+    for params in ({}, changed):
+        worker = ModelWorker("q", **dict(params, temperature=0.0))
+        worker.space_name = space
+        run_worker(worker)
+    (client,) = FakeClient.created
+    assert len(client.calls) == 2
+
+
+def test_streamed_answer_is_cached(clients, space):
+    clients.append([["Bon", "Bonjour"]])
+    worker, _ = stream_worker(space, temperature=0.0)
+    run_worker(worker)
+    worker, chunks = stream_worker(space, temperature=0.0)
+    assert run_worker(worker)[-1] == ("finished", "Bonjour")
+    assert chunks == []
+
+
+def test_interface_call_is_served_from_cache(clients, space):
+    clients.append([["Python est", "Python est un langage."]])
+    context = {"DuckDuckGo": [{"title": "Python", "link": "https://python.org", "snippet": "Langage"}]}
+    events = []
+    for _ in range(2):
+        # Mêmes paramètres que MainWindow._run_model_in_background
+        worker = ModelWorker(
+            "Qu'est-ce que Python ?", use_web_search=True, max_length=200, temperature=0.7,
+            stream=True, context=context,
+        )
+        worker.space_name = space
+        events = run_worker(worker)
+    assert events[-1] == ("finished", "Python est un langage.")
+    assert any(kind == "progress" and text.startswith("Réponse en cache") for kind, text in events)
+    (client,) = FakeClient.created
+    assert len(client.calls) == 1
+
+
+def test_sampled_answers_can_be_regenerated(clients, space, monkeypatch):
+    monkeypatch.setattr(model, "CACHE_SAMPLED_ANSWERS", False)
+    for _ in range(2):
+        worker = ModelWorker("q", temperature=0.7)
+        worker.space_name = space
+        run_worker(worker)
+    (client,) = FakeClient.created
+    assert len(client.calls) == 2
+    assert ModelWorker("q", temperature=0.0).use_cache
+
+
+def test_cache_can_be_bypassed(clients, space):
+    for use_cache in (True, False):
+        worker = ModelWorker("q", temperature=0.0, use_cache=use_cache)
+        worker.space_name = space
+        run_worker(worker)
+    (client,) = FakeClient.created
+    assert len(client.calls) == 2
@@ -0,0 +1,63 @@
+from services.pagination import ResultPager
+
+
+def result(link: str) -> dict:
+    return {"title": link, "link": link, "snippet": ""}
+
+
+class PagedEngine:
+    """Scraper paginé: `pages[n]` est la liste des liens de la page n."""
+    paginated = True
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def fetch_page(self, query, page=0):
+        self.calls.append((query, page))
+        return [result(link) for link in self.pages.get(page, [])]
+
+
+class SinglePageEngine:
+    def __call__(self, query):
+        return []
+
+
+def test_only_paginated_engines_are_fetched_and_cached():
+    engine = PagedEngine({1: ["https://b.example"]})
+    pager = ResultPager("python", {"A": engine, "B": SinglePageEngine()}, ["A", "B", "Absent"])
+    scrapers = pager.scrapers_for(1)
+    assert list(scrapers) == ["A"]
+    assert scrapers["A"]("python") == [result("https://b.example")]
+    assert pager.scrapers_for(1)["A"]("python") == [result("https://b.example")]
+    assert engine.calls == [("python", 1)]
+
+
+def test_pages_drop_duplicates_of_previous_pages():
+    pager = ResultPager("python", {"A": PagedEngine({})}, ["A"])
+    pager.mark_shown({"A": [result("https://a.example/")]})
+    fresh = pager.accept(1, {"A": [result("https://www.a.example"), result("https://b.example")]})
+    assert fresh == {"A": [result("https://b.example")]}
+    assert pager.page == 1 and pager.has_more
+
+
+def test_engine_is_exhausted_when_a_page_brings_nothing_new():
+    pager = ResultPager("python", {"A": PagedEngine({}), "B": PagedEngine({})}, ["A", "B"])
+    pager.mark_shown({"A": [result("https://a.example")], "B": []})
+    fresh = pager.accept(1, {"A": [result("https://a.example")], "B": [result("https://b.example")]})
+    assert fresh == {"A": [], "B": [result("https://b.example")]}
+    assert list(pager.scrapers_for(2)) == ["B"]
+    pager.accept(2, {"B": []})
+    assert not pager.has_more
+
+
+def test_merged_mode_carries_unshown_results_to_next_page():
+    pager = ResultPager("python", {"A": PagedEngine({}), "B": PagedEngine({})}, ["A", "B"], merge=True)
+    page0 = {"A": [result("https://a1.example"), result("https://a2.example")], "B": [result("https://b1.example")]}
+    # Seul le premier résultat fusionné a été affiché: les autres ouvrent la page suivante
+    pager.mark_shown(page0, merged=[result("https://a1.example")])
+    fresh = pager.accept(1, {"A": [result("https://a3.example")], "B": [result("https://a1.example")]})
+    links = [entry["link"] for entry in fresh[None]]
+    assert set(links[:2]) == {"https://a2.example", "https://b1.example"}
+    assert links[2:] == ["https://a3.example"]
+    assert not pager.accept(2, {"A": [result("https://a3.example")]})[None]
@@ -0,0 +1,151 @@
+import os
+import pytest
+from services import search
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "fixtures")
+
+
+DUCKDUCKGO = """
+<html><body>
+<div id="links">
+  <div class="result results_links web-result">
+    <h2 class="result__title"><a class="result__a" href="//duckduckgo.com/l/?uddg=https%3A%2F%2Fpython.org%2F&amp;rut=1">Python &amp; co</a></h2>
+    <a class="result__snippet" href="#">Le langage Python</a>
+  </div>
+  <div class="result results_links_deep web-result">
+    <h2 class="result__title"><a href="https://docs.python.org/3/">Documentation</a></h2>
+    <div class="result__snippet">Référence complète</div>
+  </div>
+  <div class="result">
+    <a href="https://pypi.org">PyPI</a>
+    <p>Index des paquets</p>
+  </div>
+  <div class="result"><a class="result__a" href="/y.js?ad=1">Publicité</a></div>
+  <div class="result"><span>Sans lien</span></div>
+  <div class="result results_links web-result">
+    <h2 class="result__title"><a class="result__a" href="https://python.org/">Python &amp; co</a></h2>
+  </div>
+</div>
+</body></html>
+"""
+
+YAHOO = """
+<html><body><ol>
+  <li><div class="dd algo algo-sr">
+    <h3><a href="https://www.python.org/">Welcome to Python.org</a></h3>
+    <div class="compText"><p>The official home of Python</p></div>
+  </div></li>
+  <li><div class="dd algo">
+    <a href="https://fr.wikipedia.org/wiki/Python">Python — Wikipédia</a>
+    <p>Langage de programmation</p>
+  </div></li>
+  <li><div class="dd algo"><a href="https://example.com">Sans extrait</a></div></li>
+  <li><div class="dd algo"><a href="/relatif">Lien relatif</a></div></li>
+  <li><div class="dd algo"><a href="https://example.org">ab</a></div></li>
+</ol></body></html>
+"""
+
+PAGES = {"duckduckgo": DUCKDUCKGO, "yahoo": YAHOO}
+
+
+@pytest.fixture(autouse=True)
+def restore_parser():
+    yield
+    search.set_parser()
+
+
+def parse_with(parser: str, engine: str, markup) -> list:
+    assert search.set_parser(parser) == parser
+    return getattr(search, f"parse_{engine}")(markup)
+
+
+@pytest.mark.parametrize("parser", [name for name in search.available_parsers() if name != "html.parser"])
+@pytest.mark.parametrize("engine", sorted(PAGES))
+def test_backends_match_reference_parser(parser, engine):
+    expected = parse_with("html.parser", engine, PAGES[engine])
+    assert expected
+    assert parse_with(parser, engine, PAGES[engine]) == expected
+    assert parse_with(parser, engine, PAGES[engine].encode("utf-8")) == expected
+
+
+@pytest.mark.parametrize("parser", [name for name in search.available_parsers() if name != "html.parser"])
+@pytest.mark.parametrize("engine", sorted(PAGES))
+@pytest.mark.parametrize("size", ["small", "large"])
+def test_backends_match_reference_parser_on_recorded_pages(parser, engine, size):
+    with open(os.path.join(FIXTURES, f"{engine}_{size}.html"), "rb") as file:
+        markup = file.read()
+    expected = parse_with("html.parser", engine, markup)
+    assert expected
+    assert parse_with(parser, engine, markup) == expected
+
+
+def test_duckduckgo_results():
+    assert parse_with("html.parser", "duckduckgo", DUCKDUCKGO) == [
+        {"title": "Python & co", "link": "https://python.org/", "snippet": "Le langage Python"},
+        {"title": "Documentation", "link": "https://docs.python.org/3/", "snippet": "Référence complète"},
+        {"title": "PyPI", "link": "https://pypi.org", "snippet": "Index des paquets"},
+    ]
+
+
+def test_yahoo_results():
+    assert parse_with("html.parser", "yahoo", YAHOO) == [
+        {"title": "Welcome to Python.org", "link": "https://www.python.org/", "snippet": "The official home of Python"},
+        {"title": "Python — Wikipédia", "link": "https://fr.wikipedia.org/wiki/Python", "snippet": "Langage de programmation"},
+        {"title": "Sans extrait", "link": "https://example.com", "snippet": "Pas de description"},
+    ]
+
+
+@pytest.mark.parametrize("parser", search.available_parsers())
+def test_duckduckgo_prefers_link_snippet_over_div(parser):
+    markup = (
+        '<div class="result"><a class="result__a" href="https://python.org">Python</a>'
+        '<div class=result__snippet>divsn</div><a class=result__snippet>asn</a></div>'
+    )
+    assert parse_with(parser, "duckduckgo", markup)[0]["snippet"] == "asn"
+
+
+@pytest.mark.parametrize("engine", sorted(PAGES))
+def test_limit_caps_results(engine):
+    with open(os.path.join(FIXTURES, f"{engine}_large.html"), "rb") as file:
+        markup = file.read()
+    parse = getattr(search, f"parse_{engine}")
+    everything = parse(markup, None)
+    assert len(everything) > 10
+    assert parse(markup) == everything[:10]
+    assert parse(markup, 3) == everything[:3]
+
+
+def test_unknown_parser_falls_back_to_fastest(monkeypatch):
+    monkeypatch.delenv("DRICHSEARCH_PARSER", raising=False)
+    assert search.set_parser("inexistant") == search.available_parsers()[0]
+
+
+def test_parser_from_environment(monkeypatch):
+    monkeypatch.setenv("DRICHSEARCH_PARSER", "html.parser")
+    assert search.set_parser() == "html.parser"
+
+
+@pytest.mark.parametrize("href,expected", [
+    ("https://example.com/a?b=1", "https://example.com/a?b=1"),
+    ("//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fpage%3Fq%3D1&rut=abc", "https://example.com/page?q=1"),
+    ("/y.js?ad=1", ""),
+    ("", ""),
+])
+def test_ddg_extract_url(href, expected):
+    assert search._ddg_extract_url(href) == expected
+
+
+@pytest.mark.parametrize("scrape", [search.scrape_duckduckgo, search.scrape_yahoo])
+def test_scrapers_encode_the_query(scrape):
+    urls = []
+
+    def transport(url, timeout):
+        urls.append(url)
+        raise OSError("hors ligne")
+    search.set_transport(transport)
+    try:
+        assert scrape("c++ & rust?") == []
+    finally:
+        search.set_transport(None)
+    assert urls and all(url.endswith("=c%2B%2B+%26+rust%3F") for url in urls)
@@ -0,0 +1,86 @@
+import time
+import pytest
+from PyQt5.QtCore import QCoreApplication
+from services.prefetch import Prefetcher
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.submitted = []
+        self.cancelled = []
+
+    def submit(self, lane, worker, priority=0):
+        self.submitted.append((lane, worker, priority))
+        return len(self.submitted)
+
+    def cancel(self, lane, generation):
+        self.cancelled.append((lane, generation))
+
+
+def make_prefetcher(engines=("DuckDuckGo",), **kwargs):
+    scheduler = FakeScheduler()
+    registry = {name: (lambda query: []) for name in ("DuckDuckGo", "Yahoo")}
+    kwargs.setdefault("debounce_ms", 10)
+    prefetcher = Prefetcher(scheduler, lambda: registry, lambda: list(engines), **kwargs)
+    return prefetcher, scheduler
+
+
+def wait_for(duration):
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        QCoreApplication.processEvents()
+        time.sleep(0.005)
+
+
+def test_fires_once_after_typing_pause(app):
+    prefetcher, scheduler = make_prefetcher()
+    for text in ("p", "py", "pyt", "python"):
+        prefetcher.on_text_edited(text)
+    wait_for(0.1)
+    assert len(scheduler.submitted) == 1
+    lane, worker, priority = scheduler.submitted[0]
+    assert (lane, worker.query, priority) == ("prefetch", "python", 10)
+    assert list(worker.scrapers) == ["DuckDuckGo"]
+
+
+def test_new_keystroke_cancels_running_prefetch(app):
+    prefetcher, scheduler = make_prefetcher()
+    prefetcher.on_text_edited("python")
+    wait_for(0.1)
+    prefetcher.on_text_edited("python asyncio")
+    assert scheduler.cancelled == [("prefetch", 1)]
+    wait_for(0.1)
+    assert scheduler.submitted[-1][1].query == "python asyncio"
+
+
+def test_short_query_or_no_engine_is_ignored(app):
+    prefetcher, scheduler = make_prefetcher()
+    prefetcher.on_text_edited("py ")
+    wait_for(0.1)
+    prefetcher, no_engine = make_prefetcher(engines=())
+    prefetcher.on_text_edited("python")
+    wait_for(0.1)
+    assert scheduler.submitted == [] and no_engine.submitted == []
+
+
+def test_budget_skips_prefetch_while_requests_in_flight(app):
+    prefetcher, scheduler = make_prefetcher(engines=("DuckDuckGo", "Yahoo"), budget=3)
+    prefetcher._in_flight = 2
+    prefetcher.on_text_edited("python")
+    wait_for(0.1)
+    assert scheduler.submitted == []
+    assert prefetcher.stats == {"started": 0, "skipped": 1}
+
+
+def test_in_flight_counts_only_network_calls(app):
+    prefetcher, _ = make_prefetcher()
+    seen = []
+    counted = prefetcher._counted(lambda query: seen.append(prefetcher._in_flight) or [])
+    counted("python")
+    assert seen == [1]
+    assert prefetcher._in_flight == 0
@@ -0,0 +1,95 @@
+from html.parser import HTMLParser
+from services.render import escape, is_web_url, render_results
+
+
+class _Collector(HTMLParser):
+    """Relève les colonnes et, pour chaque résultat, (data-href, titre, url, extrait)."""
+
+    def __init__(self):
+        super().__init__()
+        self.columns = []
+        self._field = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "div" and "data-engine" in attrs:
+            self.columns.append((attrs["data-engine"], []))
+        elif tag == "div" and attrs.get("class") == "result":
+            self.columns[-1][1].append({"href": None, "title": "", "url": "", "snippet": ""})
+        elif tag == "div" and attrs.get("class") == "no-results":
+            self._field = None
+        elif tag == "a" and "data-href" in attrs:
+            self.columns[-1][1][-1]["href"] = attrs["data-href"]
+            self._field = "title"
+        elif tag == "p":
+            self._field = "url" if attrs.get("class") == "url" else "snippet"
+
+    def handle_endtag(self, tag):
+        self._field = None
+
+    def handle_data(self, data):
+        if self._field:
+            self.columns[-1][1][-1][self._field] += data
+
+
+def parse(html):
+    collector = _Collector()
+    collector.feed(html)
+    return collector.columns
+
+
+def result(title="Titre", link="https://example.com", snippet="Extrait"):
+    return {"title": title, "link": link, "snippet": snippet}
+
+
+def test_escape_keeps_plain_text_unchanged():
+    text = "Texte sans caractère spécial"
+    assert escape(text) is text
+    assert escape("a < b & \"c\" 'd'") == "a &lt; b &amp; &quot;c&quot; &#x27;d&#x27;"
+
+
+def test_one_column_per_engine_in_order():
+    columns = parse(render_results([("A", [result()]), ("B", []), ("C", [result(), result()])]))
+    assert [name for name, _ in columns] == ["A", "B", "C"]
+    assert [len(results) for _, results in columns] == [1, 0, 2]
+
+
+def test_empty_column_shows_no_results_message():
+    html = render_results([("A", [])])
+    assert "Aucun résultat trouvé" in html
+
+
+def test_fields_are_escaped():
+    hostile = result(
+        title="<script>alert(1)</script>",
+        link='https://example.com/?a=1&b="2"',
+        snippet="<img src=x onerror=alert(1)>",
+    )
+    html = render_results([("<b>moteur</b>", [hostile])])
+    assert "<script>alert" not in html and "<img" not in html and "<b>moteur" not in html
+    (name, (parsed,)), = parse(html)
+    assert name == "<b>moteur</b>"
+    assert parsed["href"] == hostile["link"]
+    assert parsed["title"] == hostile["title"]
+    assert parsed["snippet"] == hostile["snippet"] + "..."
+
+
+def test_url_and_snippet_are_truncated():
+    long_link = "https://example.com/" + "a" * 100
+    (_, (parsed,)), = parse(render_results([("A", [result(link=long_link, snippet="x" * 300)])]))
+    assert parsed["href"] == long_link
+    assert parsed["url"] == long_link[:70] + "..."
+    assert parsed["snippet"] == "x" * 150 + "..."
+
+
+def test_only_web_links_are_clickable():
+    links = ["javascript:alert(1)", "JaVaScRiPt:alert(1)", "data:text/html,x", "HTTPS://example.com"]
+    (_, parsed), = parse(render_results([("A", [result(link=link) for link in links])]))
+    assert [entry["href"] for entry in parsed] == ["", "", "", "HTTPS://example.com"]
+    assert [entry["url"] for entry in parsed][0] == "javascript:alert(1)..."
+    assert "window.location" not in render_results([("A", [])])
+
+
+def test_is_web_url():
+    assert is_web_url("http://a.example") and is_web_url("https://a.example")
+    assert not is_web_url("javascript:void(0)") and not is_web_url("//a.example") and not is_web_url("")
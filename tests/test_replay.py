@@ -0,0 +1,167 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from services import clients, replay, search
+from services.replay import (
+    FaultProfile, InjectedError, RecordingStore, ReplayClient, ReplayMissError, ReplayResponse,
+)
+
+PAGE = (
+    '<div class="result"><a class="result__a" href="https://python.org">Python</a>'
+    '<a class="result__snippet">Langage</a></div>'
+)
+DDG_URL = "https://html.duckduckgo.com/html/?q=python"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RecordingStore(str(tmp_path / "recordings"))
+
+
+@pytest.fixture(autouse=True)
+def uninstall():
+    yield
+    replay.install(None)
+
+
+def test_http_recordings_roundtrip_and_fall_back_within_host(store):
+    store.save_http(DDG_URL, 200, PAGE, 0.1)
+    assert store.load_http("http://html.duckduckgo.com/html/?q=python")["body"] == PAGE
+    # Requête jamais enregistrée: une page du même hôte la remplace, sauf sans repli
+    assert store.load_http("https://html.duckduckgo.com/html/?q=rust")["body"] == PAGE
+    assert store.load_http("https://html.duckduckgo.com/html/?q=rust", fallback=False) is None
+    assert store.load_http("https://search.yahoo.com/search?p=python") is None
+
+
+def test_fallback_sees_pages_recorded_later(store):
+    assert store.load_http(DDG_URL) is None
+    store.save_http("https://html.duckduckgo.com/html/?q=go", 200, PAGE, 0.1)
+    assert store.load_http(DDG_URL)["body"] == PAGE
+
+
+def test_model_recordings_are_keyed_by_arguments(store):
+    store.save_model("space", {"message": "a", "api_name": "/chat"}, [[0.0, "ok"]], "ok")
+    assert store.load_model("space", {"api_name": "/chat", "message": "a"})["result"] == "ok"
+    assert store.load_model("space", {"message": "b", "api_name": "/chat"}) is None
+    assert store.load_model("other", {"message": "a", "api_name": "/chat"}) is None
+
+
+def test_replay_serves_scrapers_without_network(store, monkeypatch):
+    def no_network(url, timeout):
+        raise AssertionError("accès réseau pendant le rejeu")
+    monkeypatch.setattr(search, "_network_get", no_network)
+    store.save_http(DDG_URL, 200, PAGE, 0.1)
+    replay.install("replay", store)
+    results = search.scrape_duckduckgo("une autre requête")
+    assert [(r["title"], r["link"]) for r in results] == [("Python", "https://python.org")]
+    # Hôte sans enregistrement: 404, le scraper ne retourne rien
+    assert search.scrape_yahoo("python") == []
+
+
+def test_record_mode_saves_pages(store, monkeypatch):
+    monkeypatch.setattr(search, "_network_get", lambda url, timeout: ReplayResponse(url, 200, PAGE))
+    replay.install("record", store)
+    assert search._http_get(DDG_URL, timeout=1).text == PAGE
+    assert store.load_http(DDG_URL, fallback=False)["status"] == 200
+
+
+def test_install_none_restores_network(store, monkeypatch):
+    replay.install("replay", store)
+    replay.install(None)
+    assert search._transport is None and clients._client_factory is None
+
+
+def test_install_rejects_unknown_mode(store):
+    with pytest.raises(ValueError):
+        replay.install("rejouer", store)
+
+
+def test_install_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("DRICHSEARCH_REPLAY", " Replay ")
+    monkeypatch.setenv("DRICHSEARCH_REPLAY_DIR", str(tmp_path))
+    monkeypatch.setenv("DRICHSEARCH_REPLAY_SPEED", "0")
+    assert replay.install_from_env() == "replay"
+    client = clients._client_factory("space")
+    assert isinstance(client, ReplayClient) and client._store.path == str(tmp_path)
+    monkeypatch.delenv("DRICHSEARCH_REPLAY")
+    assert replay.install_from_env() is None
+
+
+def test_fault_profile_delay_errors_and_timeout():
+    assert FaultProfile(latency=0.5, bandwidth=1000).delay(500) == pytest.approx(1.0)
+    delays = {FaultProfile(jitter=0.2, seed=1).delay() for _ in range(3)}
+    assert all(0 <= delay <= 0.2 for delay in delays)
+    with pytest.raises(InjectedError):
+        FaultProfile(error_rate=1.0).apply()
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        FaultProfile(latency=5).apply(timeout=0.01)
+    assert time.monotonic() - start < 1
+
+
+def test_injected_errors_reach_the_scraper(store):
+    store.save_http(DDG_URL, 200, PAGE, 0.1)
+    replay.install("replay", store, FaultProfile(error_rate=1.0))
+    with pytest.raises(InjectedError):
+        search._http_get(DDG_URL, timeout=1)
+    assert search.scrape_duckduckgo("python") == []
+
+
+def test_replay_client_streams_recorded_outputs(store):
+    kwargs = {"message": "Bonjour", "api_name": "/chat"}
+    store.save_model("space", kwargs, [[0.0, "Bon"], [0.01, "Bonjour"]], "Bonjour")
+    client = ReplayClient("space", store, speed=0)
+    assert client.predict(**kwargs) == "Bonjour"
+    job = client.submit(**kwargs)
+    assert list(job) == ["Bon", "Bonjour"]
+    assert job.result() == "Bonjour"
+    with pytest.raises(ReplayMissError):
+        client.submit(message="Salut", api_name="/chat")
+
+
+def test_cancelled_replay_job_stops_streaming(store):
+    kwargs = {"message": "long"}
+    store.save_model("space", kwargs, [[0.0, "a"], [5.0, "b"]], "b")
+    job = ReplayClient("space", store).submit(**kwargs)
+    outputs = iter(job)
+    assert next(outputs) == "a"
+    threading.Timer(0.05, job.cancel).start()
+    start = time.monotonic()
+    assert list(outputs) == []
+    assert time.monotonic() - start < 1
+
+
+def test_model_connects_through_replay_factory(store):
+    replay.install("replay", store, speed=0)
+    store.save_model("space/replay", {"api_name": "/chat"}, [[0.0, "ok"]], "ok")
+    manager = clients.get_client_manager("space/replay")
+    assert isinstance(manager.get(), ReplayClient)
+    assert manager.get().predict(api_name="/chat") == "ok"
+
+
+def test_standin_server_serves_recorded_pages(store):
+    store.save_http(DDG_URL, 200, PAGE, 0.1)
+    server = replay.make_server(store, FaultProfile(), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        replay.install("standin", store, standin_url=f"http://127.0.0.1:{server.server_address[1]}")
+        assert search._http_get(DDG_URL, timeout=5).text == PAGE
+        with pytest.raises(Exception):
+            search._http_get("https://search.yahoo.com/search?p=python", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_install_does_not_import_qt(tmp_path):
+    # Le mode lot (batch.py) installe le rejeu sans charger Qt
+    code = (
+        "import sys\n"
+        "from services import replay\n"
+        f"replay.install('replay', replay.RecordingStore({str(tmp_path)!r}))\n"
+        "assert not [name for name in sys.modules if name.startswith('PyQt5')]\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(__file__)), check=True)
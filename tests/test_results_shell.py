@@ -0,0 +1,125 @@
+import pytest
+
+pytest.importorskip("PyQt5.QtWebEngineWidgets", exc_type=ImportError)
+from ui.window import MainWindow  # noqa: E402
+
+
+class FakePage:
+    """
+    Page dont `runJavaScript` répond immédiatement: True si la coquille est chargée,
+    False sinon, None si le script lève une exception (`failing`).
+    """
+
+    def __init__(self):
+        self.shell = False
+        self.failing = False
+        self.scripts = []
+
+    def runJavaScript(self, code, callback):
+        if self.shell:
+            self.scripts.append(code)
+        callback(None if self.failing else self.shell)
+
+
+class FakeView:
+    def __init__(self):
+        self._page = FakePage()
+        self.shell_loads = 0
+
+    def page(self):
+        return self._page
+
+    def setHtml(self, html):
+        self.shell_loads += 1
+
+
+class ResultsHost:
+    """Partie « page de résultats » de MainWindow, sans QtWebEngine."""
+    _push_results_js = MainWindow._push_results_js
+    _load_results_shell = MainWindow._load_results_shell
+    _on_results_load_finished = MainWindow._on_results_load_finished
+
+    def __init__(self):
+        self.results_view = FakeView()
+        self._results_shell_ready = False
+        self._results_shell_loading = False
+        self._pending_results_js = []
+        self._shell_span = None
+        self._search_trace = None
+
+    def finish_shell_load(self, ok=True):
+        self.results_view.page().shell = ok
+        self._on_results_load_finished(ok)
+
+
+def pushed(host):
+    return list(host.results_view.page().scripts)
+
+
+def test_calls_wait_for_the_shell_then_run_in_order():
+    host = ResultsHost()
+    host._push_results_js("drichResults.reset(['A'])")
+    host._push_results_js("drichResults.render('A', [])")
+    assert host.results_view.shell_loads == 1
+    assert pushed(host) == []
+    host.finish_shell_load()
+    scripts = pushed(host)
+    assert len(scripts) == 2
+    assert "drichResults.reset(['A'])" in scripts[0] and "drichResults.render('A', [])" in scripts[1]
+
+
+def test_shell_is_reloaded_when_the_view_navigated_away():
+    host = ResultsHost()
+    host._push_results_js("drichResults.reset(['A'])")
+    host.finish_shell_load()
+    # Lien ouvert dans la vue: la coquille n'est plus là
+    host.results_view.page().shell = False
+    host._push_results_js("drichResults.render('A', [])")
+    assert host.results_view.shell_loads == 2
+    host.finish_shell_load()
+    assert "drichResults.render('A', [])" in pushed(host)[-1]
+
+
+def test_failed_shell_load_keeps_nothing_queued():
+    host = ResultsHost()
+    host._push_results_js("drichResults.reset(['A'])")
+    host.finish_shell_load(ok=False)
+    assert host._pending_results_js == []
+    assert not host._results_shell_ready
+
+
+def test_script_error_does_not_reload_the_shell():
+    host = ResultsHost()
+    host._push_results_js("drichResults.reset(['A'])")
+    host.finish_shell_load()
+    host.results_view.page().failing = True
+    host._push_results_js("drichResults.render('A', [")
+    assert host.results_view.shell_loads == 1
+    assert host._results_shell_ready and host._pending_results_js == []
+
+
+def test_call_is_replayed_only_once():
+    host = ResultsHost()
+    host._push_results_js("drichResults.reset(['A'])")
+    host.finish_shell_load()
+    host.results_view.page().shell = False
+    host._push_results_js("drichResults.render('A', [])")
+    # La page rechargée n'expose toujours pas drichResults: l'appel est abandonné
+    host._on_results_load_finished(True)
+    assert host.results_view.shell_loads == 2
+    assert host._pending_results_js == []
+
+
+def test_results_page_only_obeys_the_local_shell():
+    from PyQt5.QtCore import QUrl
+    from PyQt5.QtWidgets import QApplication
+    from ui.results_page import ResultsPage
+    QApplication.instance() or QApplication([])
+    page = ResultsPage()
+    commands = []
+    page.command.connect(commands.append)
+    page.url = lambda: QUrl("about:blank")
+    page.javaScriptConsoleMessage(0, "drich:more", 1, "")
+    page.url = lambda: QUrl("https://www.bing.com/search?q=python")
+    page.javaScriptConsoleMessage(0, "drich:open https://evil.example", 1, "")
+    assert commands == ["more"]
@@ -0,0 +1,235 @@
+import threading
+import time
+import pytest
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QObject, QThread, pyqtSignal
+from services.scheduler import RequestScheduler
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+class FakeWorker(QObject):
+    """Worker qui démarre dans son QThread puis attend que le test le termine (`finish`)."""
+    finished = pyqtSignal(list)
+    error = pyqtSignal(str)
+
+    def __init__(self, started: list):
+        super().__init__()
+        self.started = started
+        self.cancelled = False
+        self._outcome = None
+        self._release = threading.Event()
+
+    def run(self):
+        self.started.append(self)
+        self._release.wait(5)
+        if self._outcome == "error":
+            self.error.emit("échec")
+        else:
+            self.finished.emit([])
+
+    def cancel(self):
+        self.cancelled = True
+
+    def finish(self, outcome="finished"):
+        self._outcome = outcome
+        self._release.set()
+
+
+def wait_until(predicate, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "délai dépassé"
+        QCoreApplication.processEvents()
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def scheduler(app):
+    scheduler = RequestScheduler()
+    scheduler.add_lane("search", supersede=True)
+    scheduler.add_lane("model", max_concurrent=2)
+    yield scheduler
+    # Fin du test: les workers restants sont libérés et leurs threads arrêtés
+    for lane in scheduler._lanes.values():
+        for entry in lane.queue:
+            entry[3].finish()
+        for worker, _ in list(lane.running.values()):
+            worker.finish()
+    wait_until(lambda: all(scheduler.pending(lane) == 0 for lane in scheduler._lanes))
+    for thread in scheduler.findChildren(QThread):
+        if not sip.isdeleted(thread):
+            thread.wait(1000)
+
+
+def test_generations_increase_and_are_set_on_worker(scheduler):
+    started = []
+    first, second = FakeWorker(started), FakeWorker(started)
+    gen1 = scheduler.submit("model", first)
+    gen2 = scheduler.submit("model", second)
+    assert gen2 > gen1
+    assert (first.generation, second.generation) == (gen1, gen2)
+
+
+def test_worker_runs_in_its_own_thread(scheduler):
+    started = []
+    worker = FakeWorker(started)
+    scheduler.submit("model", worker)
+    wait_until(lambda: started)
+    assert worker.thread() is not QCoreApplication.instance().thread()
+
+
+def test_superseding_cancels_running_worker(scheduler):
+    started = []
+    old, new = FakeWorker(started), FakeWorker(started)
+    old_gen = scheduler.submit("search", old)
+    new_gen = scheduler.submit("search", new)
+    assert old.cancelled and not new.cancelled
+    assert not scheduler.is_current("search", old_gen)
+    assert scheduler.is_current("search", new_gen)
+
+
+def test_superseded_queued_worker_never_starts(scheduler):
+    started = []
+    running, queued, latest = FakeWorker(started), FakeWorker(started), FakeWorker(started)
+    scheduler.submit("search", running)
+    wait_until(lambda: started == [running])
+    # Le worker annulé occupe la voie jusqu'à sa fin: le second attend, puis est remplacé
+    scheduler.submit("search", queued)
+    scheduler.submit("search", latest)
+    assert running.cancelled
+    running.finish()
+    wait_until(lambda: len(started) == 2)
+    assert started == [running, latest]
+
+
+def test_late_result_of_superseded_request_is_stale(scheduler):
+    started = []
+    old, new = FakeWorker(started), FakeWorker(started)
+    scheduler.submit("search", old)
+    wait_until(lambda: started == [old])
+    scheduler.submit("search", new)
+    old.finish()
+    wait_until(lambda: scheduler.pending("search") == 1)
+    assert not scheduler.is_current("search", old.generation)
+    assert scheduler.is_current("search", new.generation)
+
+
+def test_queued_lane_bounds_concurrency(scheduler):
+    started = []
+    workers = [FakeWorker(started) for _ in range(4)]
+    for worker in workers:
+        scheduler.submit("model", worker)
+    wait_until(lambda: len(started) == 2)
+    assert set(started) == set(workers[:2])
+    assert scheduler.pending("model") == 4
+    workers[0].finish()
+    wait_until(lambda: len(started) == 3)
+    assert started[2] is workers[2]
+    workers[1].finish("error")
+    wait_until(lambda: len(started) == 4)
+    assert started[3] is workers[3]
+    assert all(scheduler.is_current("model", worker.generation) for worker in workers)
+
+
+def test_queued_lane_orders_by_priority_then_arrival(scheduler):
+    started = []
+    blockers = [FakeWorker(started), FakeWorker(started)]
+    for worker in blockers:
+        scheduler.submit("model", worker)
+    low, high, high_later = FakeWorker(started), FakeWorker(started), FakeWorker(started)
+    scheduler.submit("model", low, priority=5)
+    scheduler.submit("model", high, priority=0)
+    scheduler.submit("model", high_later, priority=0)
+    for worker in blockers:
+        worker.finish()
+    wait_until(lambda: len(started) == 4)
+    assert started[2:] == [high, high_later] or started[2:] == [high_later, high]
+    high.finish()
+    high_later.finish()
+    wait_until(lambda: len(started) == 5)
+    assert started[4] is low
+
+
+def test_cancel_queued_generation(scheduler):
+    started = []
+    blockers = [FakeWorker(started), FakeWorker(started)]
+    for worker in blockers:
+        scheduler.submit("model", worker)
+    queued = FakeWorker(started)
+    generation = scheduler.submit("model", queued)
+    scheduler.cancel("model", generation)
+    assert not scheduler.is_current("model", generation)
+    assert scheduler.pending("model") == 2
+    for worker in blockers:
+        worker.finish()
+    wait_until(lambda: scheduler.pending("model") == 0)
+    assert queued not in started
+
+
+def test_cancel_running_generation(scheduler):
+    started = []
+    worker = FakeWorker(started)
+    generation = scheduler.submit("model", worker)
+    scheduler.cancel("model", generation)
+    assert worker.cancelled
+    assert not scheduler.is_current("model", generation)
+    # Le worker annulé signale quand même sa fin: la place est libérée
+    worker.finish("error")
+    wait_until(lambda: scheduler.pending("model") == 0)
+
+
+class InlineWorker(QObject):
+    """Worker non bloquant: démarré dans le thread courant, terminé par le test."""
+    finished = pyqtSignal(list)
+    error = pyqtSignal(str)
+    threaded = False
+
+    def __init__(self):
+        super().__init__()
+        self.ran_in = None
+
+    def run(self):
+        self.ran_in = QThread.currentThread()
+
+
+def test_non_threaded_worker_starts_without_qthread(scheduler):
+    worker = InlineWorker()
+    scheduler.submit("search", worker)
+    assert worker.ran_in is QCoreApplication.instance().thread()
+    assert scheduler.findChildren(QThread) == []
+    worker.finished.emit([])
+    assert scheduler.pending("search") == 0
+
+
+def test_cancel_all_makes_running_search_stale(scheduler):
+    started = []
+    worker = FakeWorker(started)
+    generation = scheduler.submit("search", worker)
+    wait_until(lambda: started == [worker])
+    # Moteur externe choisi: la recherche scrapée en cours ne doit plus rien afficher
+    scheduler.cancel_all("search")
+    assert worker.cancelled
+    assert not scheduler.is_current("search", generation)
+    worker.finish()
+    wait_until(lambda: scheduler.pending("search") == 0)
+    assert not scheduler.is_current("search", generation)
+    assert scheduler.is_current("search", scheduler.submit("search", FakeWorker(started)))
+
+
+def test_cancel_all_in_queued_lane(scheduler):
+    started = []
+    workers = [FakeWorker(started) for _ in range(3)]
+    generations = [scheduler.submit("model", worker) for worker in workers]
+    wait_until(lambda: len(started) == 2)
+    scheduler.cancel_all("model")
+    assert not any(scheduler.is_current("model", generation) for generation in generations)
+    assert workers[0].cancelled and workers[1].cancelled
+    assert scheduler.pending("model") == 2
+    for worker in workers[:2]:
+        worker.finish()
+    wait_until(lambda: scheduler.pending("model") == 0)
+    assert workers[2] not in started
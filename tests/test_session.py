@@ -0,0 +1,60 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from services import search
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    search.reset_session()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    search.reset_session()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_session_is_shared_and_preconfigured():
+    search.reset_session()
+    try:
+        session = search.get_session()
+        assert search.get_session() is session
+        assert session.headers["User-Agent"] == search._DEFAULT_HEADERS["User-Agent"]
+        adapter = session.get_adapter("https://html.duckduckgo.com/html/?q=x")
+        assert adapter._pool_maxsize == search._HOST_POOL_SIZES["https://html.duckduckgo.com"]
+        assert session.get_adapter("https://example.com")._pool_maxsize == search._DEFAULT_POOL_SIZE
+    finally:
+        search.reset_session()
+
+
+def test_connection_is_reused_between_requests(server):
+    session = search.get_session()
+    for _ in range(3):
+        assert session.get(server + "/page", timeout=5).text == "ok"
+    stats = search.http_stats()["127.0.0.1"]
+    assert stats == {"connections": 1, "requests": 3, "reused": 2}
+
+
+def test_reset_session_closes_pools(server):
+    first = search.get_session()
+    first.get(server, timeout=5)
+    search.reset_session()
+    assert search.http_stats() == {}
+    assert search.get_session() is not first
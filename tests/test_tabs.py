@@ -0,0 +1,147 @@
+import pytest
+
+pytest.importorskip("PyQt5.QtWebEngineWidgets", exc_type=ImportError)
+from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from ui import tabs  # noqa: E402
+from ui.tabs import Active, Discarded, Frozen, TabManager  # noqa: E402
+from ui.web_profile import BrowserProfile  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def manager(app, tmp_path):
+    manager = TabManager(BrowserProfile(str(tmp_path), persistent=False), max_live=3, memory_mb=0, freeze_after=3600)
+    manager._timer.stop()
+    manager.pinned = manager.add_pinned(QWebEngineView(), "Résultats")
+    return manager
+
+
+def states(manager):
+    return [tab.state for tab in manager._tabs]
+
+
+def test_background_tabs_freeze_after_delay(manager):
+    manager.freeze_after = 0
+    manager.open(background=True)
+    manager.open(background=True)
+    manager.enforce()
+    assert states(manager) == [Active, Frozen, Frozen]
+    assert manager.stats["frozen"] == 2
+
+
+def test_least_recently_seen_tabs_are_discarded_over_budget(manager):
+    first = manager.open()
+    second = manager.open()
+    manager.show_pinned()
+    first.last_active, second.last_active = 2.0, 1.0
+    manager.open(background=True)
+    manager.open(background=True)
+    # 5 onglets pour 3 vivants: les deux vus le moins récemment sont écartés
+    assert manager.pinned.state == Active
+    assert first.state == second.state == Discarded
+    assert manager.stats["discarded"] == 2
+    assert len([tab for tab in manager._tabs if tab.state != Discarded]) == 3
+
+
+def test_pinned_tab_is_never_frozen_nor_discarded(manager):
+    manager.max_live, manager.freeze_after = 1, 0
+    manager.open()
+    manager.open()
+    manager.enforce()
+    assert manager.pinned.state == Active
+    assert manager.current_tab().state == Active
+
+
+def test_switching_back_restores_discarded_tab(manager):
+    manager.max_live = 2
+    tab = manager.open()
+    manager.open()
+    manager.show_pinned()
+    assert tab.state == Discarded
+    manager.widget.setCurrentWidget(tab.container)
+    assert tab.state == Active
+    assert manager.stats["restored"] == 1
+
+
+def test_memory_budget_discards_one_tab_per_check(manager, monkeypatch):
+    manager.memory_mb = 100
+    monkeypatch.setattr(tabs, "renderer_memory_mb", lambda live: 500.0)
+    manager.open(background=True)
+    assert manager.stats["discarded"] == 1
+    manager.open(background=True)
+    manager.open(background=True)
+    assert manager.stats["discarded"] == 3
+
+
+def test_unmeasurable_memory_discards_nothing(manager, monkeypatch):
+    manager.memory_mb = 100
+    monkeypatch.setattr(tabs, "renderer_memory_mb", lambda live: None)
+    manager.open(background=True)
+    manager.enforce()
+    assert manager.stats["discarded"] == 0
+
+
+def test_pinned_tab_cannot_be_closed(manager):
+    manager.open()
+    manager.close_tab(0)
+    assert manager.widget.count() == 2
+    manager.close_tab(1)
+    assert manager.widget.count() == 1
+
+
+class PidTab:
+    def __init__(self, pid):
+        self.page = type("Page", (), {"renderProcessPid": lambda self, pid=pid: pid})()
+
+
+def test_renderer_memory_counts_each_process_once(monkeypatch):
+    sizes = {10: 100 * 1024 * 1024, 11: 50 * 1024 * 1024}
+    monkeypatch.setattr(tabs, "_process_rss", sizes.get)
+    assert tabs.renderer_memory_mb([PidTab(10), PidTab(10), PidTab(11), PidTab(0)]) == 150
+    assert tabs.renderer_memory_mb([PidTab(10), PidTab(12)]) is None
+
+
+def test_process_rss_without_psutil(monkeypatch):
+    monkeypatch.setattr(tabs, "psutil", None)
+    if tabs.os.path.isdir("/proc"):
+        assert tabs._process_rss(tabs.os.getpid()) > 0
+        assert tabs._process_rss(2 ** 31 - 1) == 0
+    # Sans /proc, un processus introuvable n'est pas un processus terminé
+    monkeypatch.setattr(tabs.os.path, "isdir", lambda path: False)
+    assert tabs._process_rss(tabs.os.getpid()) is None
+
+
+def test_process_rss_with_psutil(monkeypatch):
+    class Error(Exception):
+        pass
+
+    class NoSuchProcess(Error):
+        pass
+
+    def process(pid):
+        if pid == 1:
+            raise NoSuchProcess()
+        if pid == 2:
+            raise Error("accès refusé")
+        return type("Process", (), {"memory_info": lambda self: type("Info", (), {"rss": 42})()})()
+    fake = type("psutil", (), {"Error": Error, "NoSuchProcess": NoSuchProcess, "Process": staticmethod(process)})
+    monkeypatch.setattr(tabs, "psutil", fake)
+    assert [tabs._process_rss(pid) for pid in (1, 2, 3)] == [0, None, 42]
+
+
+def test_budgets_from_env(monkeypatch):
+    monkeypatch.setenv("DRICHSEARCH_MAX_TABS", "6")
+    monkeypatch.setenv("DRICHSEARCH_TAB_MEMORY_MB", "beaucoup")
+    monkeypatch.setenv("DRICHSEARCH_TAB_FREEZE", "2.5")
+    assert tabs.budgets_from_env() == {"max_live": 6, "memory_mb": tabs.MEMORY_BUDGET_MB, "freeze_after": 2.5}
+
+
+def test_tab_pages_are_tracked_by_the_profile(manager):
+    tab = manager.open()
+    assert tab.page in manager.profile._pages
+    assert tab.page.parent() is tab.view
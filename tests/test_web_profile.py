@@ -0,0 +1,88 @@
+import pytest
+
+pytest.importorskip("PyQt5.QtWebEngineWidgets", exc_type=ImportError)
+from PyQt5 import sip  # noqa: E402
+from PyQt5.QtCore import QUrl  # noqa: E402
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineView  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from ui import web_profile  # noqa: E402
+from ui.web_profile import BrowserProfile  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def profile(app, tmp_path):
+    return BrowserProfile(str(tmp_path), persistent=False)
+
+
+class FakePage:
+    """Page dont `runJavaScript` répond avec le bilan `stats` du chargement."""
+
+    def __init__(self, url, stats):
+        self._url = QUrl(url)
+        self.stats = stats
+        self.scripts = 0
+
+    def url(self):
+        return self._url
+
+    def runJavaScript(self, code, callback):
+        self.scripts += 1
+        callback(self.stats)
+
+
+def test_measures_cache_hits_of_web_pages(profile):
+    measured = []
+    profile.measured.connect(measured.append)
+    profile._measure(FakePage("https://python.org/", {"resources": 4, "hits": 3, "transferred": 2048, "cached": 8192}))
+    profile._measure(FakePage("https://docs.python.org/", {"resources": 4, "hits": 1, "transferred": 1024, "cached": None}))
+    assert profile.stats == {"pages": 2, "resources": 8, "hits": 4, "bytes_transferred": 3072, "bytes_cached": 8192}
+    assert profile.hit_rate == 0.5
+    assert measured[0] == {"resources": 4, "hits": 3, "transferred": 2048, "cached": 8192, "url": "https://python.org/"}
+    assert profile.summary().startswith("Cache web: 4/8 ressources servies localement (50%) sur 2 pages")
+
+
+def test_results_shell_and_failed_scripts_are_ignored(profile):
+    shell = FakePage("about:blank", {"resources": 1})
+    profile._measure(shell)
+    profile._measure(FakePage("https://python.org/", None))
+    assert shell.scripts == 0
+    assert profile.stats["pages"] == 0 and profile.hit_rate == 0.0
+
+
+def test_shared_profile_reads_environment(app, monkeypatch):
+    created = []
+
+    class Recorder(BrowserProfile):
+        def __init__(self, **kwargs):
+            created.append(kwargs)
+            super().__init__(**dict(kwargs, persistent=False))
+    monkeypatch.setattr(web_profile, "BrowserProfile", Recorder)
+    monkeypatch.setattr(web_profile, "_profile", None)
+    monkeypatch.setenv("DRICHSEARCH_WEB_PROFILE", "off")
+    monkeypatch.setenv("DRICHSEARCH_WEB_CACHE_MB", "beaucoup")
+    profile = web_profile.get_browser_profile()
+    assert web_profile.get_browser_profile() is profile
+    assert len(created) == 1
+    assert created[0]["cache_mb"] == web_profile.WEB_CACHE_MB
+    assert created[0]["persistent"] is False
+
+
+def test_shutdown_deletes_pages_before_the_profile(profile):
+    view = QWebEngineView()
+    attached = QWebEnginePage(profile.profile, view)
+    view.setPage(attached)
+    detached = QWebEnginePage(profile.profile)
+    gone = QWebEnginePage(profile.profile)
+    for page in (attached, detached, gone):
+        profile.track(page)
+    sip.delete(gone)
+    assert gone not in profile._pages
+    profile.shutdown()
+    assert sip.isdeleted(view) and sip.isdeleted(attached) and sip.isdeleted(detached)
+    assert sip.isdeleted(profile.profile)
+    assert profile._pages == []
@@ -0,0 +1,166 @@
+import hashlib
+import os
+import sys
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QIcon, QImage, QPainter, QPixmap, QPixmapCache, QGuiApplication
+from PyQt5.QtSvg import QSvgRenderer
+from services.cache import default_cache_dir
+
+
+# Taille par défaut des icônes de boutons et du menu des moteurs (pixels logiques)
+ICON_SIZE = 16
+WINDOW_ICON_SIZES = (16, 32, 64, 256)
+
+# Feuille de style unique de l'application (appliquée une fois par main.py).
+# Les widgets choisissent leur variante via la propriété dynamique `role`.
+APP_STYLESHEET = """
+QWidget { background-color: #121212; color: #eaeaea; }
+QLineEdit { background-color: #1e1e1e; color: #eaeaea; border: 1px solid #3a3a3a; border-radius: 10px; padding: 6px 10px; }
+QLineEdit:focus { border: 1px solid #4285F4; }
+QTextEdit { background-color: #1e1e1e; color: #eaeaea; border: 1px solid #3a3a3a; border-radius: 8px; }
+QComboBox { background-color: #1e1e1e; color: #eaeaea; border: 1px solid #3a3a3a; border-radius: 8px; padding: 4px 8px; }
+QComboBox QAbstractItemView { background-color: #1e1e1e; color: #eaeaea; selection-background-color: #2a2a2a; }
+QPushButton { background-color: #262626; color: #eaeaea; border: 1px solid #3a3a3a; border-radius: 10px; padding: 6px; }
+QPushButton:hover { background-color: #2e2e2e; }
+QPushButton:pressed { background-color: #333333; }
+QSplitter::handle { background-color: #2a2a2a; }
+QToolTip { background-color: #262626; color: #eaeaea; border: 1px solid #3a3a3a; }
+QLineEdit[role="search"] { border: 1px solid #dddddd; border-radius: 10px; padding: 6px 10px; }
+QLineEdit[role="search"]:focus { border: 1px solid #4285F4; }
+QPushButton[role="icon"] { border: 1px solid #dddddd; border-radius: 10px; padding: 6px; }
+QPushButton[role="icon"]:hover { background-color: #f2f2f2; }
+QPushButton[role="icon"]:pressed { background-color: #e6e6e6; }
+QLabel[role="separator"] { color: #bbbbbb; padding: 0 4px; font-weight: 600; }
+QLabel[role="status"] { color: #9a9a9a; font-style: italic; padding: 2px 4px; }
+QListView { background-color: #1e1e1e; color: #eaeaea; border: 1px solid #3a3a3a; border-radius: 8px; }
+"""
+
+
+def resource_path(*paths: str) -> str:
+    """
+    Résout un chemin de ressource compatible exécution normale et binaire PyInstaller.
+    Utilise sys._MEIPASS quand présent.
+    """
+    base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.dirname(__file__)))
+    return os.path.join(base_path, *paths)
+
+
+def asset_path(rel_path: str) -> str:
+    """Résout un chemin d'asset depuis une chaîne relative (ex: "assets/search.svg")."""
+    if not rel_path:
+        return ""
+    return resource_path(*rel_path.split("/"))
+
+
+class AssetRegistry:
+    """
+    Registre des icônes de l'interface.
+
+    Les chemins sont résolus une seule fois; chaque SVG est rastérisé à la taille
+    demandée et au ratio de pixels de l'écran, puis gardé dans `QPixmapCache`.
+    Avec `persist`, les rasters sont aussi écrits en PNG sous `cache_dir`
+    (clé: chemin, taille, ratio, date et taille du fichier source), ce qui évite
+    tout rendu SVG aux lancements suivants.
+    À utiliser depuis le thread GUI uniquement (QPixmap).
+    """
+
+    def __init__(self, cache_dir: str = None, persist: bool = True):
+        self.cache_dir = cache_dir if cache_dir is not None else os.path.join(default_cache_dir(), "icons")
+        self.persist = persist
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "renders": 0}
+        self._paths = {}
+        self._icons = {}
+
+    def path(self, rel_path: str) -> str:
+        """Chemin absolu de l'asset, ou "" s'il n'existe pas (résultat mémorisé)."""
+        resolved = self._paths.get(rel_path)
+        if resolved is None:
+            resolved = asset_path(rel_path)
+            if not (resolved and os.path.exists(resolved)):
+                resolved = ""
+            self._paths[rel_path] = resolved
+        return resolved
+
+    def pixmap(self, rel_path: str, size: int = ICON_SIZE, dpr: float = None) -> QPixmap:
+        """Pixmap carrée de `size` pixels logiques (QPixmap nulle si l'asset est absent)."""
+        source = self.path(rel_path)
+        if not source:
+            return QPixmap()
+        dpr = dpr or self._device_pixel_ratio()
+        key = f"drich:{rel_path}:{size}@{dpr:g}"
+        cached = QPixmapCache.find(key)
+        if cached is not None and not cached.isNull():
+            self.stats["memory_hits"] += 1
+            return cached
+
+        disk_path = self._disk_path(source, rel_path, size, dpr)
+        pixmap = QPixmap()
+        if disk_path and os.path.exists(disk_path) and pixmap.load(disk_path, "PNG"):
+            self.stats["disk_hits"] += 1
+        else:
+            pixmap = self._render(source, size, dpr)
+            self.stats["renders"] += 1
+            if disk_path and not pixmap.isNull():
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    pixmap.save(disk_path, "PNG")
+                except OSError:
+                    pass
+        pixmap.setDevicePixelRatio(dpr)
+        QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    def icon(self, rel_path: str, sizes=(ICON_SIZE,)) -> QIcon:
+        """QIcon construite à partir des pixmaps pré-rendues (partagée entre les widgets)."""
+        key = (rel_path, tuple(sizes))
+        icon = self._icons.get(key)
+        if icon is None:
+            icon = QIcon()
+            for size in sizes:
+                pixmap = self.pixmap(rel_path, size)
+                if not pixmap.isNull():
+                    icon.addPixmap(pixmap)
+            self._icons[key] = icon
+        return icon
+
+    def _disk_path(self, source: str, rel_path: str, size: int, dpr: float) -> str:
+        if not self.persist:
+            return ""
+        try:
+            info = os.stat(source)
+        except OSError:
+            return ""
+        signature = f"{rel_path}|{size}|{dpr:g}|{info.st_mtime_ns}|{info.st_size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(signature.encode("utf-8")).hexdigest() + ".png")
+
+    def _render(self, source: str, size: int, dpr: float) -> QPixmap:
+        pixels = max(1, round(size * dpr))
+        if not source.lower().endswith(".svg"):
+            pixmap = QPixmap(source)
+            if pixmap.isNull():
+                return pixmap
+            return pixmap.scaled(pixels, pixels, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        renderer = QSvgRenderer(source)
+        if not renderer.isValid():
+            return QPixmap()
+        image = QImage(pixels, pixels, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        renderer.render(painter)
+        painter.end()
+        return QPixmap.fromImage(image)
+
+    def _device_pixel_ratio(self) -> float:
+        app = QGuiApplication.instance()
+        return app.devicePixelRatio() if app is not None else 1.0
+
+
+_registry = None
+
+
+def get_asset_registry() -> AssetRegistry:
+    """Registre partagé (persistance désactivable via DRICHSEARCH_ICON_CACHE=0)."""
+    global _registry
+    if _registry is None:
+        _registry = AssetRegistry(persist=os.environ.get("DRICHSEARCH_ICON_CACHE") != "0")
+    return _registry
@@ -0,0 +1,270 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from html import escape
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize
+from PyQt5.QtGui import QTextDocument, QAbstractTextDocumentLayout, QPalette
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QStyle, QApplication, QMenu, QAbstractItemView
+from services.cache import default_cache_dir
+
+
+# Messages gardés en mémoire; les plus anciens sont archivés sur disque
+MAX_MESSAGES = 200
+
+RoleRole = Qt.UserRole + 1
+HtmlRole = Qt.UserRole + 2
+KeyRole = Qt.UserRole + 3
+
+
+class ChatHistoryModel(QAbstractListModel):
+    """
+    Historique du panneau modèle: une ligne par message {role, text, html}.
+
+    Au-delà de `max_messages`, les messages les plus anciens quittent la mémoire et
+    sont ajoutés à un fichier JSONL de session (`spill_path`); `load_older()` les
+    recharge en tête de liste à la demande. Le fichier est supprimé par `close()`.
+    Pendant que l'utilisateur lit l'historique (`hold_history(True)`, posé par la vue
+    dès qu'elle quitte le bas), aucun message n'est évincé: la fenêtre dépasse alors
+    `max_messages` et n'est ramenée à cette taille qu'au retour en bas de la liste.
+    Chaque message porte un identifiant et une version (incrémentée à chaque
+    modification) qui servent de clé au cache de rendu du délégué.
+    """
+
+    def __init__(self, max_messages: int = MAX_MESSAGES, spill_path: str = None, parent=None):
+        super().__init__(parent)
+        self.max_messages = max_messages
+        self.spill_path = spill_path or os.path.join(
+            default_cache_dir(), "chat", f"session-{os.getpid()}-{int(time.time())}.jsonl"
+        )
+        self._messages = []
+        self._first = 0  # indice global du premier message en mémoire
+        self._offsets = []  # position dans le fichier de chaque message archivé
+        self._next_id = 0
+        self._held = False  # éviction suspendue (voir hold_history)
+
+    # --- QAbstractListModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._messages)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self._messages[index.row()]
+        if role == Qt.DisplayRole:
+            return message["text"] if not message["html"] else _plain_text(message["text"])
+        if role == RoleRole:
+            return message["role"]
+        if role == HtmlRole:
+            return message_html(message)
+        if role == KeyRole:
+            return (message["id"], message["version"])
+        return None
+
+    # --- Historique ---
+
+    @property
+    def archived(self) -> int:
+        """Nombre de messages plus anciens que ceux en mémoire (disponibles via `load_older`)."""
+        return self._first
+
+    def append(self, role: str, text: str, html: bool = True) -> int:
+        row = len(self._messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._messages.append({"id": self._new_id(), "version": 0, "role": role, "text": text, "html": html})
+        self.endInsertRows()
+        self._trim()
+        return len(self._messages) - 1
+
+    def replace_last(self, text: str, html: bool = True):
+        if not self._messages:
+            return
+        message = self._messages[-1]
+        message.update(text=text, html=html, version=message["version"] + 1)
+        index = self.index(len(self._messages) - 1)
+        self.dataChanged.emit(index, index)
+
+    def hold_history(self, held: bool):
+        """
+        Suspend (`True`) ou rétablit l'éviction des messages les plus anciens. Au
+        rétablissement, la fenêtre est ramenée à `max_messages`.
+        """
+        if held == self._held:
+            return
+        self._held = held
+        if not held:
+            self._trim()
+
+    def load_older(self, count: int = 50) -> int:
+        """
+        Recharge jusqu'à `count` messages archivés en tête de liste; retourne le nombre
+        chargé. La fenêtre peut alors dépasser `max_messages`: elle n'est réduite qu'au
+        prochain ajout ou au rétablissement de l'éviction (voir `hold_history`).
+        """
+        count = min(count, self._first)
+        if count <= 0:
+            return 0
+        start = self._first - count
+        older = []
+        with open(self.spill_path, "r", encoding="utf-8") as file:
+            file.seek(self._offsets[start])
+            for _ in range(count):
+                message = json.loads(file.readline())
+                message.update(id=self._new_id(), version=0)
+                older.append(message)
+        self.beginInsertRows(QModelIndex(), 0, count - 1)
+        self._messages[:0] = older
+        self._first = start
+        self.endInsertRows()
+        return count
+
+    def close(self):
+        """Supprime l'archive de session."""
+        try:
+            os.remove(self.spill_path)
+        except OSError:
+            pass
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def _trim(self):
+        excess = len(self._messages) - self.max_messages
+        if excess <= 0 or self._held:
+            return
+        # Les messages déjà archivés (rechargés par load_older) ne sont pas réécrits
+        to_write = [m for i, m in enumerate(self._messages[:excess]) if self._first + i >= len(self._offsets)]
+        if to_write:
+            os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as file:
+                for message in to_write:
+                    self._offsets.append(file.tell())
+                    file.write(json.dumps({key: message[key] for key in ("role", "text", "html")}, ensure_ascii=False) + "\n")
+        self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+        del self._messages[:excess]
+        self._first += excess
+        self.endRemoveRows()
+
+
+def message_html(message: dict) -> str:
+    text = message["text"] if message["html"] else escape(message["text"]).replace("\n", "<br>")
+    return f"<b>{escape(message['role'])}:</b> {text}"
+
+
+def _plain_text(html: str) -> str:
+    document = QTextDocument()
+    document.setHtml(html)
+    return document.toPlainText()
+
+
+class ChatDelegate(QStyledItemDelegate):
+    """
+    Rendu d'un message en texte riche. Seules les lignes visibles sont peintes;
+    les documents mis en page sont gardés dans un petit cache LRU, et les hauteurs
+    (demandées pour toutes les lignes par la vue) dans un dictionnaire par message.
+    """
+
+    PADDING = 6
+    CACHE_SIZE = 64
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._documents = OrderedDict()
+        self._heights = {}
+
+    def _document(self, index, width: int) -> QTextDocument:
+        key = (index.data(KeyRole), width)
+        document = self._documents.get(key)
+        if document is not None:
+            self._documents.move_to_end(key)
+            return document
+        document = QTextDocument()
+        document.setDocumentMargin(0)
+        document.setHtml(index.data(HtmlRole))
+        document.setTextWidth(width)
+        self._documents[key] = document
+        while len(self._documents) > self.CACHE_SIZE:
+            self._documents.popitem(last=False)
+        return document
+
+    def _text_width(self, option) -> int:
+        view = self.parent()
+        width = view.viewport().width() if view is not None else option.rect.width()
+        return max(50, width - 2 * self.PADDING)
+
+    def sizeHint(self, option, index):
+        width = self._text_width(option)
+        message_id, version = index.data(KeyRole)
+        cached = self._heights.get(message_id)
+        if cached is not None and cached[0] == version and cached[1] == width:
+            height = cached[2]
+        else:
+            height = int(self._document(index, width).size().height())
+            self._heights[message_id] = (version, width, height)
+            if len(self._heights) > 4 * MAX_MESSAGES:
+                self._heights.clear()
+        return QSize(width + 2 * self.PADDING, height + 2 * self.PADDING)
+
+    def paint(self, painter, option, index):
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        document = self._document(index, self._text_width(option))
+        painter.save()
+        painter.translate(option.rect.left() + self.PADDING, option.rect.top() + self.PADDING)
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.Text, option.palette.color(QPalette.Text))
+        document.documentLayout().draw(painter, context)
+        painter.restore()
+
+
+class ChatView(QListView):
+    """
+    Liste virtualisée des messages (remplace un QTextEdit qui re-mettait en page tout
+    l'historique à chaque ajout). Reste collée en bas si l'utilisateur y était;
+    arrivée en haut, recharge les messages archivés. Clic droit: copier le message.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setItemDelegate(ChatDelegate(self))
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setResizeMode(QListView.Adjust)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setWordWrap(True)
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self._show_menu)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        self._follow = True
+
+    def setModel(self, model):
+        super().setModel(model)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.dataChanged.connect(self._on_rows_inserted)
+
+    def _on_rows_inserted(self, *args):
+        if self._follow:
+            self.scrollToBottom()
+
+    def _on_scrolled(self, value):
+        bar = self.verticalScrollBar()
+        self._follow = value >= bar.maximum() - 4
+        model = self.model()
+        if model is not None and hasattr(model, "hold_history"):
+            # Pas d'éviction sous les yeux de l'utilisateur: la vue sauterait
+            model.hold_history(not self._follow)
+        if value == bar.minimum() and model is not None and getattr(model, "archived", 0):
+            # Garder la position visuelle: le haut de la liste s'allonge
+            before = bar.maximum()
+            model.load_older()
+            self.doItemsLayout()
+            bar.setValue(bar.maximum() - before)
+
+    def _show_menu(self, pos):
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return
+        menu = QMenu(self)
+        menu.addAction("Copier", lambda: QApplication.clipboard().setText(index.data(Qt.DisplayRole)))
+        menu.exec_(self.viewport().mapToGlobal(pos))
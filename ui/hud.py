@@ -0,0 +1,91 @@
+from PyQt5.QtCore import Qt, QTimer, QRectF
+from PyQt5.QtGui import QColor, QFont, QPainter
+from PyQt5.QtWidgets import QWidget
+from services import tracing
+
+
+# Couleur des barres par étape (préfixe du nom du span)
+_COLORS = {
+    "engine": QColor(90, 90, 90),
+    "fetch": QColor(66, 133, 244),
+    "parse": QColor(251, 188, 5),
+    "cache": QColor(52, 168, 83),
+    "render": QColor(171, 71, 188),
+    "model": QColor(234, 67, 53),
+}
+_DEFAULT_COLOR = QColor(160, 160, 160)
+
+
+class TraceHud(QWidget):
+    """
+    Surcouche semi-transparente affichant la chronologie des dernières requêtes
+    (une ligne par requête, une barre par span, échelle commune).
+    Ne fait rien tant qu'elle est masquée; rafraîchie toutes les `refresh_ms` sinon.
+    """
+
+    ROW_HEIGHT = 22
+    LABEL_WIDTH = 170
+    PADDING = 8
+
+    def __init__(self, parent=None, rows: int = 8, refresh_ms: int = 500):
+        super().__init__(parent)
+        self.rows = rows
+        self._timelines = []
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setFont(QFont("Menlo", 9))
+        self.resize(560, self.PADDING * 2 + self.ROW_HEIGHT * (rows + 1))
+        self._timer = QTimer(self)
+        self._timer.setInterval(refresh_ms)
+        self._timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self._timer.stop()
+            self.hide()
+        else:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self._timer.start()
+
+    def refresh(self):
+        self._timelines = tracing.recent_requests(self.rows)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 190))
+        painter.setPen(QColor(235, 235, 235))
+        x0 = self.PADDING + self.LABEL_WIDTH
+        width = self.width() - x0 - self.PADDING
+        if not self._timelines:
+            painter.drawText(self.PADDING, self.PADDING + 14, "Aucune requête tracée")
+            return
+
+        # Échelle commune: la requête la plus longue occupe toute la largeur
+        spans_by_row = []
+        longest = 100_000.0  # au moins 100 ms
+        for timeline in self._timelines:
+            spans = [s for s in timeline["spans"] if s["ph"] == "X"]
+            spans.sort(key=lambda s: s["name"] != "engine")
+            end = max((s["ts"] + s["dur"] - timeline["start"] for s in spans), default=0.0)
+            spans_by_row.append((timeline, spans, end))
+            longest = max(longest, end)
+        painter.drawText(x0, self.PADDING + 14, f"0 — {longest / 1000:.0f} ms")
+
+        for row, (timeline, spans, end) in enumerate(spans_by_row, start=1):
+            y = self.PADDING + row * self.ROW_HEIGHT
+            painter.setPen(QColor(235, 235, 235))
+            label = painter.fontMetrics().elidedText(timeline["label"], Qt.ElideRight, self.LABEL_WIDTH - 50)
+            painter.drawText(self.PADDING, y + 14, label)
+            painter.drawText(self.PADDING + self.LABEL_WIDTH - 48, y + 14, f"{end / 1000:.0f}ms")
+            painter.setPen(Qt.NoPen)
+            for span in spans:
+                color = _COLORS.get(span["name"].split(".")[0], _DEFAULT_COLOR)
+                left = x0 + width * (span["ts"] - timeline["start"]) / longest
+                bar = max(1.0, width * span["dur"] / longest)
+                # Les spans englobants (engine) sont dessinés plus fins, derrière les étapes
+                inset = 8 if span["name"] == "engine" else 3
+                painter.setBrush(color)
+                painter.drawRect(QRectF(left, y + inset, bar, self.ROW_HEIGHT - 2 * inset))
@@ -0,0 +1,23 @@
+from PyQt5.QtCore import pyqtSignal
+from services.render import is_web_url
+from ui.tabs import TabPage
+
+
+class ResultsPage(TabPage):
+    """
+    Page de la vue de résultats: relaie les commandes `drich:<commande>` que le
+    script de la page écrit dans la console (ex: "more" pour la page suivante,
+    "open <url>" pour ouvrir un résultat dans un nouvel onglet).
+    Seule la coquille locale (chargée par `setHtml`, donc sans URL http(s)) peut
+    commander l'application: une page web affichée dans la même vue (moteur
+    externe) ne le peut pas, même en écrivant le préfixe dans sa console.
+    Module importé uniquement à la construction de la page de résultats (QtWebEngine).
+    """
+    command = pyqtSignal(str)
+    PREFIX = "drich:"
+
+    def javaScriptConsoleMessage(self, level, message, line, source):
+        if message.startswith(self.PREFIX) and not is_web_url(self.url().toString()):
+            self.command.emit(message[len(self.PREFIX):])
+            return
+        super().javaScriptConsoleMessage(level, message, line, source)
@@ -0,0 +1,296 @@
+import os
+import time
+from PyQt5.QtCore import Qt, QObject, QTimer, QUrl
+from PyQt5.QtWidgets import QTabWidget, QTabBar, QStackedWidget, QLabel
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineView
+from services import tracing
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Onglets gardés en mémoire au plus (onglet épinglé compris), mémoire totale des
+# processus de rendu (Mio), et délai avant gel d'un onglet en arrière-plan (s)
+MAX_LIVE_TABS = 4
+MEMORY_BUDGET_MB = 1024
+FREEZE_AFTER = 30.0
+# Période de vérification des budgets (ms)
+CHECK_INTERVAL_MS = 5000
+
+Active = QWebEnginePage.LifecycleState.Active
+Frozen = QWebEnginePage.LifecycleState.Frozen
+Discarded = QWebEnginePage.LifecycleState.Discarded
+
+
+class TabPage(QWebEnginePage):
+    """
+    Page d'un onglet: les ouvertures de fenêtre (target=_blank, clic milieu)
+    créent un onglet via `opener(arrière-plan)`, qui retourne la nouvelle page.
+    """
+    opener = None
+
+    def createWindow(self, kind):
+        if self.opener is None:
+            return None
+        return self.opener(kind == QWebEnginePage.WebBrowserBackgroundTab)
+
+
+class BrowserTab:
+    """Un onglet: sa vue, et pour un onglet écarté, l'URL et l'instantané à réafficher."""
+
+    def __init__(self, view: QWebEngineView, pinned: bool = False):
+        self.view = view
+        self.pinned = pinned
+        self.url = ""
+        self.snapshot = None
+        self.hidden_since = None
+        self.last_active = time.monotonic()
+        self.container = QStackedWidget()
+        self.placeholder = QLabel()
+        self.placeholder.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        self.container.addWidget(view)
+        self.container.addWidget(self.placeholder)
+
+    @property
+    def page(self) -> QWebEnginePage:
+        return self.view.page()
+
+    @property
+    def state(self):
+        return self.page.lifecycleState()
+
+
+class TabManager(QObject):
+    """
+    Onglets de navigation et leur cycle de vie.
+
+    Un onglet en arrière-plan depuis `freeze_after` secondes est gelé (JavaScript
+    et minuteurs suspendus, mémoire conservée). Au-delà de `max_live` onglets vivants
+    ou de `memory_mb` Mio pour l'ensemble des processus de rendu, les onglets les moins
+    récemment vus sont écartés (`Discarded`: le processus de rendu est libéré).
+    Un onglet écarté garde son URL et un instantané, affiché tant que la page se
+    recharge lorsqu'on revient dessus. L'onglet épinglé (résultats) n'est jamais gelé
+    ni écarté.
+    """
+
+    def __init__(self, profile: "BrowserProfile", max_live: int = MAX_LIVE_TABS, memory_mb: int = MEMORY_BUDGET_MB,
+                 freeze_after: float = FREEZE_AFTER, parent=None):
+        super().__init__(parent)
+        self.profile = profile
+        self.max_live = max_live
+        self.memory_mb = memory_mb
+        self.freeze_after = freeze_after
+        self.stats = {"frozen": 0, "discarded": 0, "restored": 0}
+        self._tabs = []
+        self.widget = QTabWidget()
+        self.widget.setDocumentMode(True)
+        self.widget.setTabsClosable(True)
+        self.widget.setMovable(True)
+        self.widget.tabCloseRequested.connect(self.close_tab)
+        self.widget.currentChanged.connect(self._on_current_changed)
+        self.widget.tabBar().tabBarClicked.connect(lambda index: self._snapshot(self.current_tab()))
+        self._timer = QTimer(self)
+        self._timer.setInterval(CHECK_INTERVAL_MS)
+        self._timer.timeout.connect(self.enforce)
+        self._timer.start()
+
+    # --- Onglets ---
+
+    def add_pinned(self, view: QWebEngineView, title: str) -> BrowserTab:
+        """Ajoute l'onglet épinglé (non fermable), en première position."""
+        tab = self._add(view, title, pinned=True, background=False)
+        self.widget.tabBar().setTabButton(0, QTabBar.RightSide, None)
+        return tab
+
+    def open(self, url: str = "", background: bool = False) -> BrowserTab:
+        """Ouvre `url` dans un nouvel onglet (au premier plan sauf `background`)."""
+        view = QWebEngineView()
+        page = TabPage(self.profile.profile, view)
+        self.profile.track(page)
+        view.setPage(page)
+        tab = self._add(view, "Nouvel onglet", pinned=False, background=background)
+        if url:
+            view.setUrl(QUrl(url))
+        return tab
+
+    def close_tab(self, index: int):
+        tab = self._tab_at(index)
+        if tab is None or tab.pinned:
+            return
+        self._tabs.remove(tab)
+        self.widget.removeTab(index)
+        tab.container.deleteLater()
+
+    def show_pinned(self):
+        for tab in self._tabs:
+            if tab.pinned:
+                self.widget.setCurrentWidget(tab.container)
+                return
+
+    def current_tab(self) -> BrowserTab:
+        return self._tab_at(self.widget.currentIndex())
+
+    def current_view(self) -> QWebEngineView:
+        tab = self.current_tab()
+        return tab.view if tab is not None else None
+
+    def _add(self, view, title, pinned, background) -> BrowserTab:
+        tab = BrowserTab(view, pinned)
+        view.page().opener = self._open_for_page
+        view.titleChanged.connect(lambda text, t=tab: self._set_title(t, text))
+        view.iconChanged.connect(lambda icon, t=tab: self._set_icon(t, icon))
+        view.urlChanged.connect(lambda url, t=tab: setattr(t, "url", url.toString()))
+        view.loadFinished.connect(lambda ok, t=tab: self._on_load_finished(t, ok))
+        self._tabs.append(tab)
+        index = self.widget.addTab(tab.container, title)
+        if background:
+            tab.hidden_since = time.monotonic()
+        else:
+            self.widget.setCurrentIndex(index)
+        self.enforce()
+        return tab
+
+    def _open_for_page(self, background: bool) -> QWebEnginePage:
+        return self.open(background=background).page
+
+    def _tab_at(self, index: int) -> BrowserTab:
+        container = self.widget.widget(index)
+        for tab in self._tabs:
+            if tab.container is container:
+                return tab
+        return None
+
+    def _set_title(self, tab, text):
+        index = self.widget.indexOf(tab.container)
+        if index >= 0 and not tab.pinned:
+            self.widget.setTabText(index, text if len(text) <= 24 else text[:23] + "…")
+            self.widget.setTabToolTip(index, text)
+
+    def _set_icon(self, tab, icon):
+        index = self.widget.indexOf(tab.container)
+        if index >= 0 and not tab.pinned:
+            self.widget.setTabIcon(index, icon)
+
+    # --- Cycle de vie ---
+
+    def _on_current_changed(self, index: int):
+        now = time.monotonic()
+        current = self._tab_at(index)
+        for tab in self._tabs:
+            if tab is current:
+                tab.hidden_since = None
+                tab.last_active = now
+            elif tab.hidden_since is None:
+                tab.hidden_since = now
+        if current is not None and current.state != Active:
+            self._restore(current)
+        self.enforce()
+
+    def _on_load_finished(self, tab, ok):
+        if tab.container.currentWidget() is tab.placeholder:
+            # Onglet restauré: la page rechargée remplace l'instantané
+            tab.container.setCurrentWidget(tab.view)
+        elif ok and tab is self.current_tab():
+            # Instantané une fois la page peinte, s'il s'agit toujours de l'onglet affiché
+            QTimer.singleShot(500, lambda: self._snapshot(tab) if tab is self.current_tab() else None)
+
+    def _snapshot(self, tab):
+        if tab is None or tab.pinned or tab.container.currentWidget() is not tab.view:
+            return
+        tab.snapshot = tab.view.grab()
+
+    def _restore(self, tab):
+        discarded = tab.state == Discarded
+        tracing.instant("tab.restore", url=tab.url, discarded=discarded)
+        if discarded and tab.snapshot is not None and not tab.page.url().isEmpty():
+            # L'instantané reste affiché jusqu'à la fin du rechargement
+            tab.placeholder.setPixmap(tab.snapshot)
+            tab.container.setCurrentWidget(tab.placeholder)
+        else:
+            tab.container.setCurrentWidget(tab.view)
+        tab.page.setLifecycleState(Active)
+        if discarded:
+            self.stats["restored"] += 1
+
+    def enforce(self):
+        """Gèle les onglets en arrière-plan depuis longtemps, écarte les plus anciens hors budget."""
+        now = time.monotonic()
+        background = [tab for tab in self._tabs if not tab.pinned and tab.hidden_since is not None]
+        for tab in background:
+            if tab.state == Active and now - tab.hidden_since >= self.freeze_after:
+                tab.page.setLifecycleState(Frozen)
+                if tab.state == Frozen:
+                    self.stats["frozen"] += 1
+                    tracing.instant("tab.freeze", url=tab.url)
+
+        live = [tab for tab in self._tabs if tab.state != Discarded]
+        candidates = sorted((tab for tab in background if tab.state != Discarded), key=lambda tab: tab.last_active)
+        while candidates and len(live) > self.max_live:
+            tab = candidates.pop(0)
+            self._discard(tab)
+            live.remove(tab)
+        if candidates and self.memory_mb:
+            # Un seul onglet par vérification: le processus libéré met un moment à disparaître
+            memory = renderer_memory_mb(live)
+            if memory is not None and memory > self.memory_mb:
+                self._discard(candidates[0])
+
+    def _discard(self, tab):
+        tab.url = tab.page.url().toString() or tab.url
+        tab.page.setLifecycleState(Discarded)
+        if tab.state == Discarded:
+            self.stats["discarded"] += 1
+            tracing.instant("tab.discard", url=tab.url)
+
+
+def renderer_memory_mb(tabs) -> float:
+    """
+    Mémoire résidente (Mio) des processus de rendu des onglets (un processus peut
+    être partagé par plusieurs onglets), ou None si elle n'est pas mesurable ici.
+    """
+    pids = {tab.page.renderProcessPid() for tab in tabs} - {0}
+    total = 0
+    for pid in pids:
+        rss = _process_rss(pid)
+        if rss is None:
+            return None
+        total += rss
+    return total / (1024 * 1024)
+
+
+def _process_rss(pid: int):
+    """RSS (octets) du processus `pid`: 0 s'il n'existe plus, None si elle n'est pas mesurable."""
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.NoSuchProcess:
+            return 0
+        except psutil.Error:
+            return None
+    if not os.path.isdir("/proc"):
+        # Sans psutil ni /proc (macOS, Windows), l'absence de /proc/<pid> ne prouve rien
+        return None
+    try:
+        with open(f"/proc/{pid}/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def budgets_from_env() -> dict:
+    """Budgets surchargeables: DRICHSEARCH_MAX_TABS, DRICHSEARCH_TAB_MEMORY_MB (0: sans limite), DRICHSEARCH_TAB_FREEZE."""
+    budgets = {"max_live": MAX_LIVE_TABS, "memory_mb": MEMORY_BUDGET_MB, "freeze_after": FREEZE_AFTER}
+    for key, name, cast in (
+        ("max_live", "DRICHSEARCH_MAX_TABS", int),
+        ("memory_mb", "DRICHSEARCH_TAB_MEMORY_MB", int),
+        ("freeze_after", "DRICHSEARCH_TAB_FREEZE", float),
+    ):
+        try:
+            budgets[key] = cast(os.environ.get(name, budgets[key]))
+        except ValueError:
+            pass
+    return budgets
@@ -0,0 +1,146 @@
+import os
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile, QWebEngineSettings
+from services import tracing
+from services.cache import default_cache_dir
+
+
+# Taille maximale du cache HTTP sur disque (Mio), surchargeable via DRICHSEARCH_WEB_CACHE_MB
+WEB_CACHE_MB = 256
+
+# Bilan des ressources de la page chargée, via l'API Performance du navigateur:
+# une ressource sans octet transféré mais avec un corps décodé vient du cache HTTP.
+_PERFORMANCE_JS = """
+(function () {
+    var entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+    var stats = {resources: 0, hits: 0, transferred: 0, cached: 0};
+    entries.forEach(function (entry) {
+        if (!entry.decodedBodySize) { return; }
+        stats.resources += 1;
+        if (entry.transferSize === 0) {
+            stats.hits += 1;
+            stats.cached += entry.decodedBodySize;
+        } else {
+            stats.transferred += entry.transferSize;
+        }
+    });
+    return stats;
+})();
+"""
+
+
+class BrowserProfile(QObject):
+    """
+    Profil QtWebEngine partagé par toutes les vues de l'application.
+
+    Contrairement au profil par défaut (hors ligne, rien n'est gardé), il conserve
+    sous `storage_dir` le cache HTTP sur disque (limité à `cache_mb` Mio), les cookies
+    et le stockage local: une page revisitée après un redémarrage est servie localement.
+    Avec `persistent=False`, le profil est hors ligne (cache en mémoire seulement).
+
+    `track(page)` mesure, à chaque chargement de la page, les ressources servies
+    depuis le cache; les totaux sont dans `stats` et chaque bilan est émis par `measured`.
+    Les pages suivies (et leurs vues) sont détruites avant le profil à la fermeture:
+    Chromium refuse de libérer un profil encore utilisé par une page.
+    """
+    measured = pyqtSignal(dict)
+
+    def __init__(self, storage_dir: str = None, cache_mb: int = WEB_CACHE_MB, persistent: bool = True, parent=None):
+        super().__init__(parent)
+        self.storage_dir = storage_dir or os.path.join(default_cache_dir(), "web")
+        self.persistent = persistent
+        self.stats = {"pages": 0, "resources": 0, "hits": 0, "bytes_transferred": 0, "bytes_cached": 0}
+        if persistent:
+            # Un profil nommé est persistant; il doit survivre à toutes ses pages
+            self.profile = QWebEngineProfile("drichsearch", QApplication.instance())
+            self.profile.setPersistentStoragePath(os.path.join(self.storage_dir, "storage"))
+            self.profile.setCachePath(os.path.join(self.storage_dir, "cache"))
+            self.profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+            self.profile.setHttpCacheMaximumSize(cache_mb * 1024 * 1024)
+            self.profile.setPersistentCookiesPolicy(QWebEngineProfile.AllowPersistentCookies)
+        else:
+            self.profile = QWebEngineProfile(QApplication.instance())
+            self.profile.setHttpCacheType(QWebEngineProfile.MemoryHttpCache)
+        settings = self.profile.settings()
+        settings.setAttribute(QWebEngineSettings.DnsPrefetchEnabled, True)
+        self._pages = []
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.stats["hits"] / self.stats["resources"] if self.stats["resources"] else 0.0
+
+    def track(self, page):
+        """Suit `page` (créée sur ce profil): mesure du cache à chaque chargement, destruction à la fermeture."""
+        self._pages.append(page)
+        page.destroyed.connect(lambda obj=None, page=page: self._forget(page))
+        page.loadFinished.connect(lambda ok: ok and self._measure(page))
+
+    def _forget(self, page):
+        if page in self._pages:
+            self._pages.remove(page)
+
+    def shutdown(self):
+        """Détruit les vues et pages suivies, puis le profil (appelé par `aboutToQuit`)."""
+        for page in list(self._pages):
+            if sip.isdeleted(page):
+                continue
+            view = page.view()
+            # La page est enfant de sa vue: détruire la vue emporte la page
+            sip.delete(view if view is not None and page.parent() is view else page)
+        self._pages = []
+        if not sip.isdeleted(self.profile):
+            sip.delete(self.profile)
+
+    def _measure(self, page):
+        url = page.url().toString()
+        if not url.startswith(("http:", "https:")):
+            return  # coquille de résultats (setHtml): rien à mesurer
+        page.runJavaScript(_PERFORMANCE_JS, lambda stats: self._record(url, stats))
+
+    def _record(self, url: str, stats):
+        if not isinstance(stats, dict):
+            return
+        page_stats = {key: int(stats.get(key) or 0) for key in ("resources", "hits", "transferred", "cached")}
+        self.stats["pages"] += 1
+        self.stats["resources"] += page_stats["resources"]
+        self.stats["hits"] += page_stats["hits"]
+        self.stats["bytes_transferred"] += page_stats["transferred"]
+        self.stats["bytes_cached"] += page_stats["cached"]
+        tracing.instant("web.cache", url=url, **page_stats)
+        self.measured.emit(dict(page_stats, url=url))
+
+    def clear_http_cache(self):
+        self.profile.clearHttpCache()
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (
+            f"Cache web: {stats['hits']}/{stats['resources']} ressources servies localement "
+            f"({self.hit_rate:.0%}) sur {stats['pages']} pages, "
+            f"{stats['bytes_cached'] / 1024:.0f} Kio évités, {stats['bytes_transferred'] / 1024:.0f} Kio transférés"
+        )
+
+
+_profile = None
+
+
+def get_browser_profile() -> BrowserProfile:
+    """
+    Profil partagé, créé au premier appel (thread GUI, après QApplication).
+    DRICHSEARCH_WEB_PROFILE=off: profil hors ligne; DRICHSEARCH_WEB_CACHE_MB: taille du cache disque.
+    """
+    global _profile
+    if _profile is None:
+        try:
+            cache_mb = int(os.environ.get("DRICHSEARCH_WEB_CACHE_MB", WEB_CACHE_MB))
+        except ValueError:
+            cache_mb = WEB_CACHE_MB
+        _profile = BrowserProfile(
+            cache_mb=cache_mb,
+            persistent=os.environ.get("DRICHSEARCH_WEB_PROFILE") != "off",
+            parent=QApplication.instance(),
+        )
+    return _profile
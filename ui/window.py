@@ -1,9 +1,17 @@
 import os
 import sys
 import json
-import re
-from services.search import scrape_duckduckgo, scrape_yahoo, generate_results_html
-from services.model import ModelWorker
+import html
+from services.render import generate_results_shell, is_web_url
+from services.model import ModelWorker, get_client_manager
+from services.dispatch import SearchWorker, AsyncSearchWorker
+from services.scheduler import RequestScheduler
+from services.prefetch import Prefetcher
+from services.cache import cached_scraper
+from services.engines import get_registry, enabled_engines, fuse_results
+from services.pagination import ResultPager
+from services.formatter import format_model_text, StreamFormatter
+from ui.chat import ChatHistoryModel, ChatView
 from PyQt5.QtWidgets import (
     QMainWindow,
     QVBoxLayout,
@@ -14,33 +22,140 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QMessageBox,
     QStackedWidget,
-    QTextEdit,
     QSplitter,
     QLabel,
+    QShortcut,
+    QApplication,
 )
-from PyQt5.QtGui import QIcon, QFont, QMovie
-from PyQt5.QtCore import Qt, QUrl, QObject, pyqtSignal, QThread
-from PyQt5.QtWebEngineWidgets import QWebEngineView
+from PyQt5.QtGui import QFont, QMovie, QKeySequence
+from PyQt5.QtCore import Qt, QUrl, QObject, pyqtSignal, QTimer
+from services import startup, tracing
+from services.cache import default_cache_dir, normalize_query
+from ui.hud import TraceHud
+from ui.assets import get_asset_registry, resource_path, asset_path, WINDOW_ICON_SIZES
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    MERGED_COLUMN = "Méta-recherche"
+    # Délai après le premier affichage avant la construction différée (ms)
+    IDLE_DELAY_MS = 300
+    # Intervalle minimal entre deux rafraîchissements de la réponse streamée (ms)
+    STREAM_REFRESH_MS = 50
+
+    def __init__(self, lazy: bool = True):
+        """
+        `lazy`: n'affiche d'abord que la page d'accueil; QtWebEngine, la page de résultats
+        et la connexion au modèle sont préparés au premier usage ou une fois l'UI au repos.
+        """
         super().__init__()
+        self._lazy = lazy
+        self.results_page = None
         self.setWindowTitle("Drichsearch")
         self.setGeometry(300, 200, 1500, 800)
         
         # Définir le logo de l'application (support PyInstaller via _MEIPASS)
-        svg_path = self._resource_path("assets", "logo.svg")
-        png_path = self._resource_path("assets", "logo.png")
-        app_icon = QIcon(svg_path)
-        if app_icon.isNull() and os.path.exists(png_path):
-            app_icon = QIcon(png_path)
+        assets = get_asset_registry()
+        app_icon = assets.icon("assets/logo.svg", WINDOW_ICON_SIZES)
+        if app_icon.isNull():
+            app_icon = assets.icon("assets/logo.png", WINDOW_ICON_SIZES)
         self.setWindowIcon(app_icon)
 
         self.stack = QStackedWidget()  # Stack pour changer de page
         self.setCentralWidget(self.stack)
 
+        # Page de résultats persistante (voir _push_results_js)
+        self._results_shell_ready = False
+        self._results_shell_loading = False
+        self._pending_results_js = []
+        self._shell_span = None
+        # Chronologie de traçage de la recherche en cours (None si le traçage est désactivé)
+        self._search_trace = None
+
+        # Planificateur: une seule recherche active (les précédentes sont annulées),
+        # un seul appel modèle à la fois (les suivants attendent leur tour)
+        self._scheduler = RequestScheduler(self)
+        self._scheduler.add_lane("search", max_concurrent=2, supersede=True)
+        self._scheduler.add_lane("model", max_concurrent=1)
+        self._scheduler.add_lane("prefetch", max_concurrent=1, supersede=True)
+        # Pages suivantes des résultats: une seule à la fois, annulée par une nouvelle recherche
+        self._scheduler.add_lane("pages", max_concurrent=1, supersede=True)
+        self._pager = None
+        self._page_buffer = None
+        self._page_generation = None
+        self._more_wanted = False
+
+        # Réponse du modèle en cours de streaming: les fragments reçus entre deux
+        # rafraîchissements sont regroupés en une seule mise à jour du panneau
+        self._stream = None
+        self._stream_timer = QTimer(self)
+        self._stream_timer.setSingleShot(True)
+        self._stream_timer.setInterval(self.STREAM_REFRESH_MS)
+        self._stream_timer.timeout.connect(self._refresh_stream)
+
+        # Résultats de la recherche affichée, transmis au modèle comme contexte
+        # (désactivable: DRICHSEARCH_RAG=0), voir services/context.py
+        # (rattachés à la génération et à la requête de la recherche qui les a produits)
+        self._context_results = {}
+        self._context_generation = None
+        self._context_query = ""
+        self._rag = os.environ.get("DRICHSEARCH_RAG") != "0"
+
+        # Backend de recherche asyncio/httpx (opt-in: DRICHSEARCH_ASYNC=1), voir services/asearch.py
+        self._async_search = os.environ.get("DRICHSEARCH_ASYNC") == "1"
+
+        # Préchargement spéculatif pendant la saisie (opt-in: DRICHSEARCH_PREFETCH=1)
+        self._prefetcher = None
+        if os.environ.get("DRICHSEARCH_PREFETCH") == "1":
+            self._prefetcher = Prefetcher(self._scheduler, get_registry, self._prefetch_engines, parent=self)
+
         self.init_ui()
+        self._init_tracing()
+
+        if not lazy:
+            # Connexion au modèle en arrière-plan: seule la toute première requête peut l'attendre
+            get_client_manager().warm_up()
+        QTimer.singleShot(self.IDLE_DELAY_MS, self._finish_startup)
+
+    def _finish_startup(self):
+        """Travail différé du démarrage, exécuté une fois la page d'accueil affichée."""
+        get_client_manager().warm_up()
+        self._ensure_results_page()
+        if startup.enabled():
+            print(startup.report(), file=sys.stderr)
+
+    def _init_tracing(self):
+        """
+        Traçage (DRICHSEARCH_TRACE=1): F12 affiche la chronologie des dernières requêtes,
+        Ctrl+Maj+T exporte la trace au format Chrome (aussi écrite à la fermeture
+        si DRICHSEARCH_TRACE_FILE est défini).
+        """
+        self._trace_hud = None
+        if not tracing.enabled():
+            return
+        self._trace_hud = TraceHud(self)
+        self._trace_hud.move(self.width() - self._trace_hud.width() - 12, 12)
+        QShortcut(QKeySequence("F12"), self, self._trace_hud.toggle)
+        QShortcut(QKeySequence("Ctrl+Shift+T"), self, self.export_trace)
+        if os.environ.get("DRICHSEARCH_TRACE_FILE"):
+            QApplication.instance().aboutToQuit.connect(self.export_trace)
+
+    def export_trace(self):
+        path = os.environ.get("DRICHSEARCH_TRACE_FILE") or os.path.join(default_cache_dir(), "trace.json")
+        try:
+            count = tracing.export_chrome_trace(path)
+        except OSError as e:
+            print(f"Export de la trace impossible: {e}", file=sys.stderr)
+            return
+        print(f"Trace exportée ({count} événements): {path}", file=sys.stderr)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._trace_hud is not None:
+            self._trace_hud.move(self.width() - self._trace_hud.width() - 12, 12)
+
+    def _ensure_results_page(self):
+        if self.results_page is None:
+            self._build_results_page()
 
     def init_ui(self):
         # Charger les moteurs de recherche depuis le JSON
@@ -48,6 +163,7 @@ class MainWindow(QMainWindow):
         if not search_engines:
             QMessageBox.critical(self, "Erreur", "Aucun moteur de recherche trouvé.")
             return
+        self._search_engines = search_engines
 
         # Page d'accueil
         self.home_page = QWidget()
@@ -57,12 +173,10 @@ class MainWindow(QMainWindow):
         self.stack.addWidget(self.home_page)
 
         # Menu déroulant pour les moteurs de recherche
+        assets = get_asset_registry()
         self.search_engine_selector = QComboBox()
         for engine in search_engines:
-            logo_rel = engine.get("logo", "")
-            logo_path = self._asset_path(logo_rel) if logo_rel else ""
-            icon = QIcon(logo_path) if logo_path and os.path.exists(logo_path) else QIcon()
-            self.search_engine_selector.addItem(icon, engine["name"], engine["url"])
+            self.search_engine_selector.addItem(assets.icon(engine.get("logo", "")), engine["name"], engine["url"])
         home_layout.addWidget(self.search_engine_selector, alignment=Qt.AlignCenter)
 
         # Barre de recherche + bouton
@@ -74,26 +188,33 @@ class MainWindow(QMainWindow):
         self.search_bar.setFont(QFont("Arial", 14))
         self.search_bar.setFixedWidth(400)
         self.search_bar.setFixedHeight(40)
-        self.search_bar.setStyleSheet(
-            "QLineEdit { border: 1px solid #dddddd; border-radius: 10px; padding: 6px 10px; }"
-            "QLineEdit:focus { border: 1px solid #4285F4; }"
-        )
+        self.search_bar.setProperty("role", "search")
         self.search_bar.returnPressed.connect(self.search)
+        if self._prefetcher is not None:
+            self.search_bar.textEdited.connect(self._prefetcher.on_text_edited)
         search_layout.addWidget(self.search_bar)
 
-        search_button = QPushButton(QIcon(self._asset_path("assets/search.svg")), "")
+        search_button = QPushButton(assets.icon("assets/search.svg"), "")
         search_button.setFixedSize(40, 40)
-        search_button.setStyleSheet(
-            "QPushButton { border: 1px solid #dddddd; border-radius: 10px; padding: 6px; }"
-            "QPushButton:hover { background-color: #f2f2f2; }"
-            "QPushButton:pressed { background-color: #e6e6e6; }"
-        )
+        search_button.setProperty("role", "icon")
         search_button.clicked.connect(self.search)
         search_layout.addWidget(search_button)
 
         home_layout.addLayout(search_layout)
+        startup.mark("page d'accueil construite")
+
+        if not self._lazy:
+            self._build_results_page()
+
+    def _build_results_page(self):
+        # Import différé: charger QtWebEngine coûte cher au démarrage
+        from PyQt5.QtWebEngineWidgets import QWebEngineView
+        from ui.results_page import ResultsPage
+        from ui.web_profile import get_browser_profile
+        from ui.tabs import TabManager, budgets_from_env
 
         # Page de résultats
+        assets = get_asset_registry()
         self.results_page = QWidget()
         results_layout = QVBoxLayout()
         self.results_page.setLayout(results_layout)
@@ -105,27 +226,19 @@ class MainWindow(QMainWindow):
         controls_layout = QHBoxLayout()
         controls_layout.setSpacing(6)
 
-        prev_button = QPushButton(QIcon(self._asset_path("assets/precedent.svg")), "")
+        prev_button = QPushButton(assets.icon("assets/precedent.svg"), "")
         prev_button.setFixedSize(40, 40)
-        prev_button.setStyleSheet(
-            "QPushButton { border: 1px solid #dddddd; border-radius: 10px; padding: 6px; }"
-            "QPushButton:hover { background-color: #f2f2f2; }"
-            "QPushButton:pressed { background-color: #e6e6e6; }"
-        )
+        prev_button.setProperty("role", "icon")
         prev_button.clicked.connect(self.go_back)
         controls_layout.addWidget(prev_button)
 
         sep = QLabel("|")
-        sep.setStyleSheet("color: #bbbbbb; padding: 0 4px; font-weight: 600;")
+        sep.setProperty("role", "separator")
         controls_layout.addWidget(sep)
 
-        next_button = QPushButton(QIcon(self._asset_path("assets/next.svg")), "")
+        next_button = QPushButton(assets.icon("assets/next.svg"), "")
         next_button.setFixedSize(40, 40)
-        next_button.setStyleSheet(
-            "QPushButton { border: 1px solid #dddddd; border-radius: 10px; padding: 6px; }"
-            "QPushButton:hover { background-color: #f2f2f2; }"
-            "QPushButton:pressed { background-color: #e6e6e6; }"
-        )
+        next_button.setProperty("role", "icon")
         next_button.clicked.connect(self.go_forward)
         controls_layout.addWidget(next_button)
 
@@ -136,21 +249,17 @@ class MainWindow(QMainWindow):
         self.results_search_bar.setPlaceholderText("Rechercher")
         self.results_search_bar.setFont(QFont("Arial", 12))
         self.results_search_bar.setFixedHeight(40)
-        self.results_search_bar.setStyleSheet(
-            "QLineEdit { border: 1px solid #dddddd; border-radius: 10px; padding: 6px 10px; }"
-            "QLineEdit:focus { border: 1px solid #4285F4; }"
-        )
+        self.results_search_bar.setProperty("role", "search")
         self.results_search_bar.returnPressed.connect(self.search_from_results)
+        self.results_search_bar.textEdited.connect(self._on_results_query_edited)
+        if self._prefetcher is not None:
+            self.results_search_bar.textEdited.connect(self._prefetcher.on_text_edited)
         nav_layout.addWidget(self.results_search_bar)
 
         # Bouton reload
-        reload_button = QPushButton(QIcon(self._asset_path("assets/reload.svg")), "")
+        reload_button = QPushButton(assets.icon("assets/reload.svg"), "")
         reload_button.setFixedSize(40, 40)
-        reload_button.setStyleSheet(
-            "QPushButton { border: 1px solid #dddddd; border-radius: 10px; padding: 6px; }"
-            "QPushButton:hover { background-color: #f2f2f2; }"
-            "QPushButton:pressed { background-color: #e6e6e6; }"
-        )
+        reload_button.setProperty("role", "icon")
         reload_button.clicked.connect(self.reload_page)
         nav_layout.addWidget(reload_button)
 
@@ -158,21 +267,42 @@ class MainWindow(QMainWindow):
 
         splitter = QSplitter(Qt.Horizontal)
         self.results_view = QWebEngineView()
-        splitter.addWidget(self.results_view)
+        # Profil persistant partagé (cache HTTP disque, cookies): voir ui/web_profile.py
+        profile = get_browser_profile()
+        results_page = ResultsPage(profile.profile, self.results_view)
+        profile.track(results_page)
+        if os.environ.get("DRICHSEARCH_WEB_STATS") == "1":
+            QApplication.instance().aboutToQuit.connect(lambda: print(profile.summary(), file=sys.stderr))
+        results_page.command.connect(self._on_results_command)
+        self.results_view.setPage(results_page)
+        self.results_view.loadFinished.connect(self._on_results_load_finished)
+        # Onglets: la comparaison reste épinglée, les résultats ouverts s'ajoutent à côté
+        self.tabs = TabManager(profile, parent=self, **budgets_from_env())
+        self.tabs.add_pinned(self.results_view, "Résultats")
+        QShortcut(QKeySequence("Ctrl+W"), self.results_page, lambda: self.tabs.close_tab(self.tabs.widget.currentIndex()))
+        splitter.addWidget(self.tabs.widget)
 
         self.model_panel = QWidget()
         model_layout = QVBoxLayout()
         self.model_panel.setLayout(model_layout)
 
-        self.model_history = QTextEdit()
-        self.model_history.setReadOnly(True)
+        # Historique virtualisé: seuls les messages visibles sont mis en page (voir ui/chat.py)
+        self.chat_model = ChatHistoryModel(parent=self)
+        QApplication.instance().aboutToQuit.connect(self.chat_model.close)
+        self.model_history = ChatView()
+        self.model_history.setModel(self.chat_model)
         model_layout.addWidget(self.model_history)
 
+        # Statuts de la requête en cours: affichés ici, jamais ajoutés à l'historique
+        self.model_status = QLabel()
+        self.model_status.setProperty("role", "status")
+        model_layout.addWidget(self.model_status)
+
         # Loader (spinner) pour la génération du modèle
         self.model_loader = QLabel()
         self.model_loader.setAlignment(Qt.AlignCenter)
-        loader_path = self._asset_path("assets/loader.gif")
-        if os.path.exists(loader_path):
+        loader_path = assets.path("assets/loader.gif")
+        if loader_path:
             self._loader_movie = QMovie(loader_path)
             self.model_loader.setMovie(self._loader_movie)
         else:
@@ -185,18 +315,11 @@ class MainWindow(QMainWindow):
         self.model_input = QLineEdit()
         self.model_input.setPlaceholderText("Demander au modèle...")
         self.model_input.setFixedHeight(40)
-        self.model_input.setStyleSheet(
-            "QLineEdit { border: 1px solid #dddddd; border-radius: 10px; padding: 6px 10px; }"
-            "QLineEdit:focus { border: 1px solid #4285F4; }"
-        )
+        self.model_input.setProperty("role", "search")
         self.model_input.returnPressed.connect(self.on_model_prompt_send)
-        send_btn = QPushButton(QIcon(self._asset_path("assets/send.svg")), "")
+        send_btn = QPushButton(assets.icon("assets/send.svg"), "")
         send_btn.setFixedSize(40, 40)
-        send_btn.setStyleSheet(
-            "QPushButton { border: 1px solid #dddddd; border-radius: 10px; padding: 6px; }"
-            "QPushButton:hover { background-color: #f2f2f2; }"
-            "QPushButton:pressed { background-color: #e6e6e6; }"
-        )
+        send_btn.setProperty("role", "icon")
         send_btn.clicked.connect(self.on_model_prompt_send)
         model_input_layout.addWidget(self.model_input)
         model_input_layout.addWidget(send_btn)
@@ -208,14 +331,22 @@ class MainWindow(QMainWindow):
         results_layout.addWidget(splitter)
 
         self.stack.addWidget(self.results_page)
+        startup.mark("page de résultats construite")
 
     def search(self):
         """
         Méthode déclenchée lors d'une recherche.
-        Utilise le moteur sélectionné ou le mode Personnalisé (DuckDuckGo + Yahoo).
+        Utilise le moteur sélectionné, le mode Personnalisé (une colonne par moteur scrapé)
+        ou la méta-recherche (une liste fusionnée).
         """
         query = self.search_bar.text().strip()
         selected_engine = self.search_engine_selector.currentData()
+        engine_config = self._search_engines[self.search_engine_selector.currentIndex()]
+
+        self._ensure_results_page()
+        if self._prefetcher is not None:
+            # Les requêtes déjà en vol sont partagées avec la recherche (voir cached_scraper)
+            self._prefetcher.cancel()
 
         if query:
             try:
@@ -223,24 +354,21 @@ class MainWindow(QMainWindow):
                 self.results_search_bar.setEnabled(False)
                 self.results_search_bar.setPlaceholderText("Chargement...")
                 
-                # Si "Personnalisé" est sélectionné, scraper DuckDuckGo et Yahoo
-                if selected_engine == "custom":
-                    ddg_results = scrape_duckduckgo(query)
-                    yahoo_results = scrape_yahoo(query)
-                    html = generate_results_html(ddg_results, yahoo_results, "DuckDuckGo", "Yahoo")
-                else:
-                    # Sinon, utiliser le moteur sélectionné
-                    search_url = f"{selected_engine}{query}"
-                    self.results_view.setUrl(QUrl(search_url))
-                    self.stack.setCurrentWidget(self.results_page)
-                    self.results_search_bar.setEnabled(True)
-                    self.results_search_bar.setPlaceholderText("Rechercher")
+                # "Personnalisé" / méta-recherche: scraper les moteurs configurés en parallèle
+                if selected_engine in ("custom", "meta"):
+                    engines = engine_config.get("engines") or enabled_engines()
+                    self._run_search_in_background(query, engines, merge=selected_engine == "meta")
                     return
-                
-                # Afficher les résultats personnalisés
-                self.results_view.setHtml(html)
+
+                # Sinon, utiliser le moteur sélectionné. Une recherche scrapée encore en
+                # cours ne doit plus réécrire la page: elle est annulée et devient périmée.
+                search_url = f"{selected_engine}{query}"
+                self._scheduler.cancel_all("search")
+                self._reset_pagination()
+                self._clear_context()
+                self.results_view.setUrl(QUrl(search_url))
+                self.tabs.show_pinned()
                 self.stack.setCurrentWidget(self.results_page)
-                
                 self.results_search_bar.setEnabled(True)
                 self.results_search_bar.setPlaceholderText("Rechercher")
             except Exception as e:
@@ -250,6 +378,221 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.warning(self, "Attention", "Le champ de recherche est vide.")
 
+    def _run_search_in_background(self, query, engines, merge=False):
+        """
+        Lance les scrapers dans un worker dédié: l'UI reste réactive
+        et la latence totale est celle du moteur le plus lent.
+        Chaque colonne est remplie dès que son moteur a répondu; en mode fusion,
+        la liste unique est recalculée à chaque arrivée.
+        """
+        registry = get_registry()
+        engines = [name for name in engines if name in registry]
+        self._search_merge = merge
+        self._search_weights = {name: registry[name].weight for name in engines}
+        self._search_partial = {}
+        self._clear_context()
+        columns = [self.MERGED_COLUMN] if merge else engines
+        self._reset_pagination()
+        self._pager = ResultPager(query, registry, engines, merge, self._search_weights)
+        self._push_results_js(f"drichResults.reset({json.dumps(columns)})")
+        self.tabs.show_pinned()
+        self.stack.setCurrentWidget(self.results_page)
+
+        self._search_trace = tracing.begin_request(f"recherche: {query}")
+        if self._async_search:
+            worker = AsyncSearchWorker(
+                query,
+                {name: registry[name] for name in engines},
+                deadline=15.0,
+                trace_id=self._search_trace,
+            )
+        else:
+            worker = SearchWorker(
+                query,
+                {name: cached_scraper(name, registry[name]) for name in engines},
+                deadline=15.0,
+                trace_id=self._search_trace,
+            )
+        worker.engine_finished.connect(lambda name, results, w=worker: self._on_engine_results(w, name, results))
+        worker.finished.connect(lambda results, w=worker: self._on_search_finished(w, results))
+        self._scheduler.submit("search", worker)
+
+    def _on_engine_results(self, worker, name, results):
+        # Ignorer les réponses d'une recherche remplacée depuis
+        if not self._scheduler.is_current("search", worker.generation):
+            return
+        self._keep_context(worker, name, results)
+        if self._search_merge:
+            self._search_partial[name] = results
+            self._render_merged(self._search_partial)
+            return
+        with tracing.span("render", request=self._search_trace, engine=name):
+            code = f"drichResults.render({json.dumps(name)}, {json.dumps(results)})"
+        self._push_results_js(code)
+
+    def _keep_context(self, worker, name, results):
+        if self._context_generation != worker.generation:
+            self._context_results = {}
+            self._context_generation = worker.generation
+            self._context_query = worker.query
+        self._context_results[name] = results
+
+    def _clear_context(self):
+        self._context_results = {}
+        self._context_generation = None
+        self._context_query = ""
+
+    def _on_results_query_edited(self, text):
+        # Requête modifiée: les résultats affichés ne décrivent plus la question en cours
+        if normalize_query(text) != normalize_query(self._context_query):
+            self._clear_context()
+
+    def _search_context(self):
+        """
+        Résultats à joindre à la question du modèle: ceux de la recherche affichée, seulement
+        s'ils viennent de la recherche en cours et que sa requête n'a pas changé depuis.
+        """
+        if not self._rag or self._context_generation is None:
+            return None
+        if not self._scheduler.is_current("search", self._context_generation):
+            return None
+        return dict(self._context_results)
+
+    def _on_search_finished(self, worker, results):
+        if not self._scheduler.is_current("search", worker.generation):
+            return
+        for name, engine_results in results.items():
+            self._keep_context(worker, name, engine_results)
+        if self._search_merge:
+            shown = self._render_merged(results)
+        else:
+            shown = None
+            # Moteurs hors délai: afficher une colonne vide plutôt qu'un chargement infini
+            for name, engine_results in results.items():
+                if not engine_results:
+                    self._push_results_js(f"drichResults.render({json.dumps(name)}, [])")
+        if self._pager is not None:
+            self._pager.mark_shown(results, shown)
+            if self._pager.has_more:
+                self._push_results_js("drichResults.enableMore(true)")
+                # Une page d'avance: la page 1 est chargée avant d'être demandée
+                self._fetch_page(1)
+
+        self.results_search_bar.setEnabled(True)
+        self.results_search_bar.setPlaceholderText("Rechercher")
+
+    def _prefetch_engines(self):
+        """Moteurs à précharger pour l'entrée sélectionnée (aucun pour un moteur externe)."""
+        engine_config = self._search_engines[self.search_engine_selector.currentIndex()]
+        if engine_config.get("url") not in ("custom", "meta"):
+            return []
+        return engine_config.get("engines") or enabled_engines()
+
+    def _render_merged(self, results_by_engine):
+        with tracing.span("render", request=self._search_trace, engine=self.MERGED_COLUMN):
+            fused = fuse_results(results_by_engine, self._search_weights, limit=20)
+            code = f"drichResults.render({json.dumps(self.MERGED_COLUMN)}, {json.dumps(fused)})"
+        self._push_results_js(code)
+        return fused
+
+    def _reset_pagination(self):
+        if self._page_generation is not None:
+            self._scheduler.cancel("pages", self._page_generation)
+        self._pager = None
+        self._page_buffer = None
+        self._page_generation = None
+        self._more_wanted = False
+
+    def _fetch_page(self, page):
+        """Charge la page `page` en arrière-plan; elle est gardée en réserve jusqu'à ce que l'utilisateur la demande."""
+        pager = self._pager
+        worker = SearchWorker(pager.query, pager.scrapers_for(page), deadline=15.0, trace_id=self._search_trace)
+        worker.finished.connect(lambda results, w=worker, p=pager: self._on_page_fetched(w, p, page, results))
+        self._page_generation = self._scheduler.submit("pages", worker)
+
+    def _on_page_fetched(self, worker, pager, page, results):
+        if pager is not self._pager or not self._scheduler.is_current("pages", worker.generation):
+            return
+        self._page_generation = None
+        self._page_buffer = (page, pager.accept(page, results))
+        if self._more_wanted:
+            self._show_buffered_page()
+
+    def _on_results_command(self, command):
+        name, _, argument = command.partition(" ")
+        if name == "open":
+            if is_web_url(argument):
+                self.tabs.open(argument)
+            return
+        if name != "more" or self._pager is None:
+            return
+        if self._page_buffer is not None:
+            self._show_buffered_page()
+        else:
+            # Page pas encore arrivée: elle sera affichée dès réception
+            self._more_wanted = True
+
+    def _show_buffered_page(self):
+        page, fresh = self._page_buffer
+        self._page_buffer = None
+        self._more_wanted = False
+        with tracing.span("render", request=self._search_trace, page=page):
+            for name, results in fresh.items():
+                column = self.MERGED_COLUMN if name is None else name
+                self._push_results_js(f"drichResults.append({json.dumps(column)}, {json.dumps(results)})")
+        has_more = self._pager.has_more
+        self._push_results_js(f"drichResults.moreDone({json.dumps(has_more)})")
+        if has_more:
+            self._fetch_page(page + 1)
+
+    def _push_results_js(self, code, replayed=False):
+        """
+        Exécute `code` dans la page de résultats persistante.
+        Si la vue affiche autre chose (lien ouvert, moteur externe), la page
+        est rechargée une fois puis les appels en attente sont rejoués dans l'ordre.
+        Un appel n'est rejoué qu'une fois; un script qui échoue (résultat None) est abandonné.
+        """
+        if not self._results_shell_ready:
+            self._pending_results_js.append((code, replayed))
+            self._load_results_shell()
+            return
+        guarded = f"(function () {{ if (!window.drichResults) {{ return false; }} {code}; return true; }})()"
+        # Mesure jusqu'au retour du moteur JS (exécution du script dans la page)
+        span = tracing.span("render.js", request=self._search_trace)
+
+        def on_done(ok, code=code):
+            span.end()
+            if ok is None:
+                # Exception dans le script: le rejouer échouerait de la même façon
+                print(f"Script de résultats en échec, ignoré: {code[:80]}", file=sys.stderr)
+            elif ok is False:
+                if replayed:
+                    print(f"Page de résultats absente après rechargement, appel ignoré: {code[:80]}", file=sys.stderr)
+                    return
+                self._results_shell_ready = False
+                self._pending_results_js.append((code, True))
+                self._load_results_shell()
+
+        self.results_view.page().runJavaScript(guarded, on_done)
+
+    def _load_results_shell(self):
+        if self._results_shell_loading:
+            return
+        self._results_shell_loading = True
+        self._shell_span = tracing.span("render.shell", request=self._search_trace)
+        self.results_view.setHtml(generate_results_shell())
+
+    def _on_results_load_finished(self, ok):
+        if not self._results_shell_loading:
+            return
+        self._results_shell_loading = False
+        self._shell_span.end()
+        self._results_shell_ready = ok
+        pending, self._pending_results_js = self._pending_results_js, []
+        if ok:
+            for code, replayed in pending:
+                self._push_results_js(code, replayed)
+
     def search_from_results(self):
         """
         Méthode pour chercher depuis la page de résultats.
@@ -259,42 +602,76 @@ class MainWindow(QMainWindow):
         self.search()
 
     def append_model_message(self, role, text):
-        self.model_history.append(f"<b>{role}:</b> {text}")
+        """Ajoute un message (HTML) à l'historique."""
+        self.chat_model.append(role, text)
 
     def on_model_prompt_send(self):
         prompt = self.model_input.text().strip()
         if not prompt:
             return
         self.model_input.setEnabled(False)
-        self.append_model_message("Vous", prompt)
+        self.append_model_message("Vous", html.escape(prompt))
         self.model_input.clear()
         self._run_model_in_background(prompt)
 
     def _run_model_in_background(self, prompt):
-        self._model_thread = QThread()
-        # Utilise le worker basé sur votre Espace Gradio (voir services/model.py)
-        self._worker = ModelWorker(
+        # Utilise le worker basé sur votre Espace Gradio (voir services/model.py).
+        # Les résultats déjà affichés servent de contexte au lieu d'une seconde recherche web.
+        worker = ModelWorker(
             prompt=prompt,
             use_web_search=True,
             max_length=200,
-            temperature=0.7
+            temperature=0.7,
+            stream=True,
+            trace_id=tracing.begin_request(f"modèle: {prompt}"),
+            # Sans résultats exploitables, l'Espace garde sa propre recherche web
+            context=self._search_context(),
         )
-        self._worker.moveToThread(self._model_thread)
-        self._model_thread.started.connect(self._worker.run)
-        self._worker.finished.connect(self._on_model_response)
-        self._worker.error.connect(self._on_model_error)
+        self._stream = None
+        self._stream_timer.stop()
+        worker.partial.connect(self._model_slot(worker, self._on_model_chunk))
+        worker.finished.connect(self._model_slot(worker, self._on_model_response))
+        worker.error.connect(self._model_slot(worker, self._on_model_error))
         # Optionnel: écoute des messages de progression du worker
-        if hasattr(self._worker, "progress"):
-            self._worker.progress.connect(self._on_model_progress)
-        self._worker.finished.connect(self._model_thread.quit)
-        self._worker.finished.connect(self._worker.deleteLater)
-        self._model_thread.finished.connect(self._model_thread.deleteLater)
+        worker.progress.connect(self._model_slot(worker, self._on_model_progress))
 
         # Afficher le loader
         self.model_loader.setVisible(True)
         if self._loader_movie is not None:
             self._loader_movie.start()
-        self._model_thread.start()
+        self._scheduler.submit("model", worker)
+
+    def _model_slot(self, worker, slot):
+        """Enveloppe un slot du panneau modèle: ignoré si la requête a été annulée entre-temps."""
+        def call(*args):
+            if self._scheduler.is_current("model", worker.generation):
+                slot(*args)
+        return call
+
+    def _on_model_chunk(self, chunk):
+        """
+        Ajoute un fragment streamé à la fin de la réponse en cours. Les lignes
+        complètes sont formatées une seule fois (`StreamFormatter`), et le panneau
+        n'est rafraîchi qu'au plus tous les `STREAM_REFRESH_MS`.
+        """
+        if self._stream is None:
+            # Premier fragment: la réponse commence, le loader n'est plus utile
+            if self._loader_movie is not None:
+                self._loader_movie.stop()
+            self.model_loader.setVisible(False)
+            self.model_status.clear()
+            self.chat_model.append("Modèle", "")
+            self._stream = StreamFormatter()
+            self._stream_chunks = []
+        self._stream_chunks.append(chunk)
+        self._stream.feed(chunk)
+        if not self._stream_timer.isActive():
+            self._stream_timer.start()
+
+    def _refresh_stream(self):
+        """Affiche la réponse streamée reçue jusqu'ici, ligne en cours comprise."""
+        if self._stream is not None:
+            self.chat_model.replace_last(self._stream.preview())
 
     def _on_model_response(self, text):
         # Masquer le loader
@@ -302,8 +679,20 @@ class MainWindow(QMainWindow):
             self._loader_movie.stop()
         self.model_loader.setVisible(False)
 
-        formatted = self._format_model_text(text)
-        self.append_model_message("Modèle", formatted)
+        self.model_status.clear()
+
+        self._stream_timer.stop()
+        if self._stream is not None:
+            if text == "".join(self._stream_chunks):
+                # Réponse identique au flux: seule la dernière ligne reste à formater
+                self._stream.finish()
+                formatted = self._stream.html
+            else:
+                formatted = format_model_text(text)
+            self.chat_model.replace_last(formatted)
+            self._stream = None
+        else:
+            self.append_model_message("Modèle", format_model_text(text))
         self.model_input.setEnabled(True)
 
     def _on_model_error(self, err):
@@ -311,58 +700,39 @@ class MainWindow(QMainWindow):
         if self._loader_movie is not None:
             self._loader_movie.stop()
         self.model_loader.setVisible(False)
+        self.model_status.clear()
+        self._stream_timer.stop()
+        self._stream = None
         QMessageBox.critical(self, "Erreur", err)
         self.model_input.setEnabled(True)
 
     def _on_model_progress(self, msg):
-        # Affiche les status dans l'historique pour feedback utilisateur
-        self.append_model_message("Statut", msg)
-
-    def _format_model_text(self, text: str) -> str:
-        """
-        Formate le texte du modèle pour un rendu plus lisible dans QTextEdit (HTML).
-        - Convertit les URLs // en https://
-        - Ajoute des retours à la ligne entre les éléments de résultats
-        - Transforme l'en-tête des résultats de recherche
-        """
-        if not text:
-            return ""
-
-        # Normaliser les URLs commençant par //
-        text = re.sub(r"\(//", "(https://", text)
-        text = re.sub(r'\shref=\"//', ' href="https://', text)
-
-        # Titre des résultats de recherche
-        text = text.replace("🔍 **Résultats de recherche :**", "<h3>🔍 Résultats de recherche</h3>")
-
-        # Insérer des sauts de ligne avant les items numérotés en gras **1. ...**, **2. ...**
-        text = re.sub(r"\*\*(\d+\.)\s*", r"<br><b>\1 </b>", text)
-
-        # Remplacer les doubles espaces sans signification (collages) par un espace simple
-        text = re.sub(r"(?<!\S)([A-Za-zÀ-ÿ])(?=\S)", r"\1", text)  # minimal
-
-        return text
-
+        # Statut transitoire: remplace le précédent, hors de l'historique
+        self.model_status.setText(msg)
 
     def reload_page(self):
         """
-        Relance la recherche actuelle.
+        Relance la recherche actuelle (ou recharge la page de l'onglet courant).
         """
+        tab = self.tabs.current_tab()
+        if tab is not None and not tab.pinned:
+            tab.view.reload()
+            return
         query = self.results_search_bar.text().strip()
         if query:
             self.search()
 
     def go_back(self):
         """
-        Retour à la page précédente dans l'historique du navigateur.
+        Retour à la page précédente dans l'historique de l'onglet courant.
         """
-        self.results_view.back()
+        self.tabs.current_view().back()
 
     def go_forward(self):
         """
-        Aller à la page suivante dans l'historique du navigateur.
+        Aller à la page suivante dans l'historique de l'onglet courant.
         """
-        self.results_view.forward()
+        self.tabs.current_view().forward()
 
     def load_search_engines(self):
         """
@@ -374,7 +744,7 @@ class MainWindow(QMainWindow):
             if not os.path.exists(json_path):
                 QMessageBox.critical(self, "Erreur", f"Le fichier {json_path} est introuvable.")
                 return []
-            with open(json_path, "r") as file:
+            with open(json_path, "r", encoding="utf-8") as file:
                 return json.load(file)
         except json.JSONDecodeError:
             QMessageBox.critical(self, "Erreur", "Erreur json format.")
@@ -388,15 +758,10 @@ class MainWindow(QMainWindow):
         Résout un chemin de ressource compatible exécution normale et binaire PyInstaller.
         Utilise sys._MEIPASS quand présent.
         """
-        base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.dirname(__file__)))
-        return os.path.join(base_path, *paths)
+        return resource_path(*paths)
 
     def _asset_path(self, rel_path: str) -> str:
         """
         Résout un chemin d'asset depuis une chaîne relative (ex: "assets/search.svg").
         """
-        if not rel_path:
-            return ""
-        # Normaliser le séparateur et déléguer à _resource_path
-        parts = rel_path.split("/")
-        return self._resource_path(*parts)
+        return asset_path(rel_path)